@@ -0,0 +1,255 @@
+"""
+分析流程效能基準測試
+
+使用離線的 SyntheticProvider 產生決定性股價，分別量測每個階段：
+資料抓取、各個 _calculate_* 指標、_generate_signal、_calculate_ranking_score、
+不同規模的 compare()、參數掃描、回測以及 generate_html_report()。
+結果輸出為 JSON，可與其他 commit 的結果比較以找出效能退化。
+
+使用方式:
+    python benchmarks/bench_pipeline.py --output bench.json
+    python benchmarks/bench_pipeline.py --sizes 50,500 --baseline bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT_DIR, 'scripts'), ROOT_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from backtest import load_closes, run_backtest  # noqa: E402
+from indicators import wilder_rsi  # noqa: E402
+from main import StockAnalyzer  # noqa: E402
+from providers import SyntheticProvider  # noqa: E402
+
+DEFAULT_SIZES = [50, 500, 5000]
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, number: int = 1) -> Dict[str, Any]:
+    """
+    量測函式的單次執行時間
+
+    Args:
+        fn: 要量測的函式（無參數）
+        repeat: 重複量測次數
+        number: 每次量測內連續呼叫次數
+
+    Returns:
+        dict: 單次呼叫的 min / median / mean 秒數與量測次數
+    """
+    timings = []
+    for _ in range(repeat):
+        # 流程中的 print() 不列入量測
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            timings.append((time.perf_counter() - start) / number)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'runs': repeat * number
+    }
+
+
+def make_analyzer() -> StockAnalyzer:
+    """建立使用合成資料、不連網的分析器"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        config = StockAnalyzer({'data_source': 'synthetic'})._default_config()
+        config['data_source'] = 'synthetic'
+        config['logging']['quiet'] = True
+        return StockAnalyzer(config)
+
+
+def run_benchmarks(sizes: Optional[List[int]] = None, repeat: int = 5) -> Dict[str, Any]:
+    """
+    執行所有階段的基準測試
+
+    Args:
+        sizes: compare() 的股票數量（預設 50 / 500 / 5000）
+        repeat: 每個階段的重複次數（大規模 compare 會自動減少）
+
+    Returns:
+        dict: {'meta': 執行環境資訊, 'results': 各階段量測結果}
+    """
+    from generate_report import generate_html_report
+
+    sizes = sizes or DEFAULT_SIZES
+    analyzer = make_analyzer()
+    provider = SyntheticProvider()
+    tickers = [f"{1000 + i}.TW" for i in range(max(sizes))]
+    frame = provider.fetch(tickers[0], "6mo")
+
+    results = {}
+
+    results['fetch.provider'] = measure(lambda: provider.fetch(tickers[0], "6mo"), repeat, 20)
+    results['fetch.concurrent_50'] = measure(lambda: analyzer._fetch_all(tickers[:50], "6mo"), repeat)
+
+    results['indicator.rsi'] = measure(lambda: analyzer._calculate_rsi(frame), repeat, 20)
+    results['indicator.macd'] = measure(lambda: analyzer._calculate_macd(frame), repeat, 20)
+    results['indicator.bollinger'] = measure(lambda: analyzer._calculate_bollinger(frame), repeat, 20)
+
+    indicators = {
+        'RSI': analyzer._calculate_rsi(frame),
+        'MACD': analyzer._calculate_macd(frame),
+    }
+    results['signal.generate'] = measure(
+        lambda: analyzer._generate_signal(tickers[0], frame, indicators), repeat, 200
+    )
+
+    analysis = {'indicators': indicators}
+    for method in ("momentum", "rsi", "composite"):
+        results[f'ranking.{method}'] = measure(
+            lambda: analyzer._calculate_ranking_score(analysis, method), repeat, 1000
+        )
+
+    for size in sizes:
+        runs = repeat if size <= 500 else max(1, repeat // 5)
+        results[f'compare.{size}'] = measure(lambda: analyzer.compare(tickers[:size]), runs)
+
+    # 50 檔 x 100 組參數的掃描，對照 compare.50 的耗時
+    sweep_size = min(max(sizes), 50)
+    grid = {'RSI': {'period': [6, 9, 12, 14, 21]},
+            'MACD': {'fast_period': [8, 12], 'slow_period': [21, 26]},
+            'Bollinger': {'std_dev': [1.5, 2, 2.5, 3, 3.5]}}
+    results[f'sweep.{sweep_size}x100'] = measure(
+        lambda: analyzer.sweep(tickers[:sweep_size], grid, indicators=["RSI", "MACD", "Bollinger"]),
+        max(1, repeat // 5)
+    )
+
+    backtest_size = min(max(sizes), 500)
+    closes = load_closes(provider, tickers[:backtest_size], "5y")
+    results[f'backtest.{backtest_size}x5y'] = measure(
+        lambda: run_backtest(closes, 'momentum', top_n=10), max(1, repeat // 5)
+    )
+    results[f'indicator.rsi_wilder_{backtest_size}x5y'] = measure(
+        lambda: wilder_rsi(closes.to_numpy(), 14), max(1, repeat // 5)
+    )
+
+    report_size = min(max(sizes), 500)
+    with contextlib.redirect_stdout(io.StringIO()):
+        report_input = analyzer.compare(tickers[:report_size])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, 'index.html')
+        results[f"report.html_{report_size}"] = measure(
+            lambda: generate_html_report(report_input, output_path), repeat
+        )
+        results[f"report.html_{report_size}_paged"] = measure(
+            lambda: generate_html_report(report_input, output_path, page_size=100), repeat
+        )
+        results[f"report.html_{report_size}_table"] = measure(
+            lambda: generate_html_report(report_input, output_path, layout='table'), repeat
+        )
+
+    return {'meta': environment(sizes, repeat), 'results': results}
+
+
+def environment(sizes: List[int], repeat: int) -> Dict[str, Any]:
+    """收集可用於跨 commit 比較的執行環境資訊"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import numpy
+    import pandas
+
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'machine': platform.machine(),
+        'sizes': sizes,
+        'repeat': repeat
+    }
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.2
+) -> List[Dict[str, Any]]:
+    """
+    比較兩次基準測試結果（以 median 為準）
+
+    Args:
+        current: 本次 run_benchmarks() 結果
+        baseline: 先前儲存的結果
+        threshold: 視為退化的變慢比例（0.2 = 慢 20%）
+
+    Returns:
+        list: 每個共同階段的 {stage, baseline, current, ratio, regression}
+    """
+    rows = []
+    for stage, now in current['results'].items():
+        before = baseline['results'].get(stage)
+        if before is None:
+            continue
+        ratio = now['median'] / before['median'] if before['median'] else float('inf')
+        rows.append({
+            'stage': stage,
+            'baseline': before['median'],
+            'current': now['median'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='StockAnalyzer 效能基準測試')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='compare() 股票數量，逗號分隔')
+    parser.add_argument('--repeat', type=int, default=5, help='每階段重複次數')
+    parser.add_argument('--output', help='輸出 JSON 路徑')
+    parser.add_argument('--baseline', help='與先前的 JSON 結果比較')
+    parser.add_argument('--threshold', type=float, default=0.2, help='退化門檻（比例）')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    report = run_benchmarks(sizes, args.repeat)
+
+    print(f"{'階段':<24} {'median (ms)':>12} {'min (ms)':>12}")
+    print("-" * 50)
+    for stage, stats in report['results'].items():
+        print(f"{stage:<24} {stats['median'] * 1000:>12.3f} {stats['min'] * 1000:>12.3f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] 結果已寫入：{args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_results(report, baseline, args.threshold)
+        print(f"\n與 {baseline['meta'].get('commit')} 比較：")
+        for row in rows:
+            flag = '  <-- 退化' if row['regression'] else ''
+            print(f"  {row['stage']:<24} x{row['ratio']:.2f}{flag}")
+        if any(row['regression'] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
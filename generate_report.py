@@ -1,93 +1,54 @@
 """
 股票分析報告生成器
 將分析結果轉換為美觀的 HTML 報告（TradingView 風格 - 雙欄布局）
+
+頁面樣板在模組載入時切成固定片段，表格列由產生器逐列格式化後以
+writelines() 直接寫入檔案，不在記憶體中組出整頁字串；股票數量很多時
+可用 page_size 分成多個頁面檔案（index.html、index-2.html、...）。
+
+指定 manifest_path 時以內容雜湊增量生成：manifest 記錄每支股票輸入
+（最新股價、指標數值、訊號、分數）與設定、樣板的雜湊，只重新生成輸入
+有變動的頁面，全部未變動時不寫任何檔案。
+
+import 本模組不會載入分析器（pandas / numpy）或讀取股票清單，
+只產生報告時（generate_html_report）維持快速啟動；main() 才載入分析器。
 """
 import sys
 import os
+import hashlib
+import html
+import json
+from collections import Counter, deque
 from datetime import datetime
-
-# 設定編碼
-if sys.platform == 'win32':
-    os.system('chcp 65001 > nul')
-
-sys.path.append('scripts')
-from main import StockAnalyzer
-from stock_list import GIFT_STOCKS, STOCK_NAMES
-
-def generate_html_report(analysis_result, output_path='docs/index.html'):
-    """生成 HTML 報告 - 雙欄布局（SELL | BUY）"""
-
-    # 提取數據
-    ranked_stocks = analysis_result['ranked_stocks']
-
-    # 分組：SELL 和 BUY
-    sell_stocks = [s for s in ranked_stocks if s['analysis']['signal']['action'] == 'SELL']
-    buy_stocks = [s for s in ranked_stocks if s['analysis']['signal']['action'] == 'BUY']
-
-    # 更新時間
-    update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-    # 生成 SELL 股票列表
-    sell_rows = []
-    for i, stock in enumerate(sell_stocks, 1):
-        ticker = stock['ticker'].replace('.TW', '')
-        name = STOCK_NAMES.get(stock['ticker'], '未知')
-        analysis = stock['analysis']
-        score = stock['score']
-        price = analysis['current_price']
-        rsi = analysis['indicators']['RSI']['value']
-        macd_signal = analysis['indicators']['MACD']['signal']
-
-        # MACD 中文
-        macd_map = {'buy': '黃金交叉', 'sell': '死亡交叉', 'bullish': '多頭', 'bearish': '空頭', 'neutral': '中性'}
-        macd_cn = macd_map.get(macd_signal, macd_signal)
-
-        row = f"""
-                        <tr>
-                            <td class="rank">{i}</td>
-                            <td class="stock"><span class="ticker">{ticker}</span> <span class="name">{name}</span></td>
-                            <td class="price">{price:.2f}</td>
-                            <td class="score negative" title="計分：RSI-50 + MACD加分(-25~+25)">{score:.1f}</td>
-                            <td>{rsi:.1f}</td>
-                            <td>{macd_cn}</td>
-                            <td class="signal-sell">SELL</td>
-                        </tr>"""
-        sell_rows.append(row)
-
-    # 生成 BUY 股票列表
-    buy_rows = []
-    for i, stock in enumerate(buy_stocks, 1):
-        ticker = stock['ticker'].replace('.TW', '')
-        name = STOCK_NAMES.get(stock['ticker'], '未知')
-        analysis = stock['analysis']
-        score = stock['score']
-        price = analysis['current_price']
-        rsi = analysis['indicators']['RSI']['value']
-        macd_signal = analysis['indicators']['MACD']['signal']
-
-        # MACD 中文
-        macd_map = {'buy': '黃金交叉', 'sell': '死亡交叉', 'bullish': '多頭', 'bearish': '空頭', 'neutral': '中性'}
-        macd_cn = macd_map.get(macd_signal, macd_signal)
-
-        row = f"""
-                        <tr>
-                            <td class="rank">{i}</td>
-                            <td class="stock"><span class="ticker">{ticker}</span> <span class="name">{name}</span></td>
-                            <td class="price">{price:.2f}</td>
-                            <td class="score positive" title="計分：RSI-50 + MACD加分(-25~+25)">{score:.1f}</td>
-                            <td>{rsi:.1f}</td>
-                            <td>{macd_cn}</td>
-                            <td class="signal-buy">BUY</td>
-                        </tr>"""
-        buy_rows.append(row)
-
-    # 完整 HTML
-    html = f"""<!DOCTYPE html>
+from itertools import islice
+
+import stock_list
+
+# scripts/ 不是套件：其中的模組以頂層名稱互相 import（from indicators import ...），
+# 也可直接執行 python scripts/main.py，改成套件須改寫全部 import。generate_html_report()
+# 與 main() 都用到這些模組，所以載入時把 scripts/ 附加在 sys.path 最後（不遮蔽既有模組）；
+# 位置以本檔為準，不受目前工作目錄影響
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+
+# MACD 訊號中文（legacy 結果用訊號名稱，compact 結果用 macd_signal_codes() 的代碼）
+MACD_LABELS = {'buy': '黃金交叉', 'sell': '死亡交叉', 'bullish': '多頭', 'bearish': '空頭', 'neutral': '中性'}
+MACD_CODE_LABELS = {3: '黃金交叉', -3: '死亡交叉', 1: '多頭', -1: '空頭', 0: '中性'}
+
+# 兩個欄位：(訊號, 欄位標題, 徽章樣式, 分數樣式, 無資料訊息)
+SIDES = (
+    ('SELL', '賣出訊號', 'sell', 'negative', '無賣出訊號'),
+    ('BUY', '買入訊號', 'buy', 'positive', '無買入訊號'),
+)
+
+PAGE_HEAD = """<!DOCTYPE html>
 <html lang="zh-TW">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>台股技術分析 - {update_time}</title>
+    <title>台股技術分析 - {update_time}{page_title}</title>
     <style>
         * {{
             margin: 0;
@@ -274,12 +235,34 @@ def generate_html_report(analysis_result, output_path='docs/index.html'):
             font-size: 11px;
         }}
 
+        .pages {{
+            display: flex;
+            justify-content: center;
+            gap: 6px;
+            padding: 16px 24px;
+            border-top: 1px solid #e0e3eb;
+            font-size: 13px;
+        }}
+
+        .pages a, .pages span {{
+            padding: 4px 10px;
+            border-radius: 4px;
+            color: #787b86;
+            text-decoration: none;
+        }}
+
+        .pages span {{
+            background: #f0f3fa;
+            color: #131722;
+            font-weight: 600;
+        }}
+
         @media (max-width: 1024px) {{
             .two-column {{
                 grid-template-columns: 1fr;
             }}
         }}
-    </style>
+{extra_style}    </style>
 </head>
 <body>
     <div class="container">
@@ -287,13 +270,17 @@ def generate_html_report(analysis_result, output_path='docs/index.html'):
             <h1>台股技術分析篩選器</h1>
             <div class="update-time">更新時間：{update_time}</div>
         </header>
+"""
 
-        <div class="two-column">
-            <!-- SELL 欄位 -->
+COLUMNS_OPEN = """
+        <div class="two-column">"""
+
+COLUMN_HEAD = """
+            <!-- {action} 欄位 -->
             <div class="column">
                 <div class="column-header">
-                    <span class="column-title">賣出訊號</span>
-                    <span class="badge sell">{len(sell_stocks)} 支</span>
+                    <span class="column-title">{title}</span>
+                    <span class="badge {badge}">{count} 支</span>
                 </div>
                 <table>
                     <thead>
@@ -308,75 +295,662 @@ def generate_html_report(analysis_result, output_path='docs/index.html'):
                         </tr>
                     </thead>
                     <tbody>
-{''.join(sell_rows) if sell_rows else '<tr><td colspan="7" style="text-align:center;padding:40px;color:#787b86;">無賣出訊號</td></tr>'}
-                    </tbody>
-                </table>
-            </div>
+"""
 
-            <!-- BUY 欄位 -->
-            <div class="column">
-                <div class="column-header">
-                    <span class="column-title">買入訊號</span>
-                    <span class="badge buy">{len(buy_stocks)} 支</span>
-                </div>
-                <table>
-                    <thead>
+ROW = """
                         <tr>
-                            <th>#</th>
-                            <th>商品</th>
-                            <th>股價</th>
-                            <th>分數</th>
-                            <th>RSI</th>
-                            <th>MACD</th>
-                            <th>建議</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-{''.join(buy_rows) if buy_rows else '<tr><td colspan="7" style="text-align:center;padding:40px;color:#787b86;">無買入訊號</td></tr>'}
+                            <td class="rank">{rank}</td>
+                            <td class="stock"><span class="ticker">{ticker}</span> <span class="name">{name}</span></td>
+                            <td class="price">{price:.2f}</td>
+                            <td class="score {score_class}" title="計分：RSI-50 + MACD加分(-25~+25)">{score:.1f}</td>
+                            <td>{rsi:.1f}</td>
+                            <td>{macd}</td>
+                            <td class="signal-{badge}">{action}</td>
+                        </tr>"""
+
+EMPTY_ROW = '<tr><td colspan="7" style="text-align:center;padding:40px;color:#787b86;">{}</td></tr>'
+
+COLUMN_FOOT = """
                     </tbody>
                 </table>
             </div>
-        </div>
+"""
 
+PAGE_FOOT = """        </div>
+{pages}
         <footer>
             本報告由 GitHub Actions 自動生成 | 僅供參考，不構成投資建議 | 資料來源：Yahoo Finance
         </footer>
     </div>
-</body>
+{scripts}</body>
 </html>"""
 
-    # 寫入檔案
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
 
-    print(f"[OK] 報告已生成：{output_path}")
+# 版面：columns 為 SELL | BUY 雙欄（可分頁）；table 為含 HOLD 的單頁互動表格
+LAYOUTS = ('columns', 'table')
+TABLE_ACTIONS = ('BUY', 'SELL', 'HOLD')
+
+# 互動表格：資料以欄位式 JSON 內嵌（#report-data），前端只繪出可見範圍的列，
+# 排序、篩選與搜尋都在瀏覽器完成，頁面大小與股票數量幾乎無關
+TABLE_STYLE = """
+        .toolbar {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            gap: 12px;
+            padding: 12px 24px;
+            border-bottom: 1px solid #e0e3eb;
+            background: #f7f8fa;
+            font-size: 13px;
+        }
+
+        .filters {
+            display: flex;
+        }
+
+        .filters button {
+            border: 1px solid #e0e3eb;
+            background: #ffffff;
+            color: #131722;
+            border-radius: 4px;
+            padding: 4px 10px;
+            margin-right: 6px;
+            cursor: pointer;
+        }
+
+        .filters button.active {
+            background: #131722;
+            color: #ffffff;
+        }
+
+        #search {
+            border: 1px solid #e0e3eb;
+            border-radius: 4px;
+            padding: 6px 10px;
+            width: 220px;
+        }
+
+        .grid-row {
+            display: grid;
+            grid-template-columns: 70px minmax(200px, 2fr) repeat(4, 1fr) 80px;
+            align-items: center;
+            height: 36px;
+            padding: 0 24px;
+            font-size: 13px;
+            border-bottom: 1px solid #f5f5f5;
+        }
+
+        .grid-head {
+            color: #787b86;
+            font-size: 11px;
+            font-weight: 500;
+            background: #fafafa;
+            border-bottom: 1px solid #e0e3eb;
+        }
+
+        .grid-head span {
+            cursor: pointer;
+            user-select: none;
+        }
+
+        .grid-head span.sorted::after {
+            content: ' \\25B2';
+        }
+
+        .grid-head span.sorted.desc::after {
+            content: ' \\25BC';
+        }
+
+        .viewport {
+            height: 70vh;
+            overflow-y: auto;
+            position: relative;
+        }
+
+        .viewport .rows {
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+        }
+
+        .signal-hold {
+            color: #787b86;
+        }
+"""
+
+TABLE_BODY = """
+        <div class="table-report">
+            <div class="toolbar">
+                <div class="filters">
+                    <button data-action="-1" class="active">全部 <b></b></button>
+                    <button data-action="0">買入 <b></b></button>
+                    <button data-action="1">賣出 <b></b></button>
+                    <button data-action="2">觀望 <b></b></button>
+                </div>
+                <div>顯示 <b id="shown"></b> 支 <input id="search" type="search" placeholder="搜尋代碼或名稱"></div>
+            </div>
+            <div class="grid-row grid-head">
+                <span data-key="rank" class="sorted">#</span>
+                <span data-key="ticker">商品</span>
+                <span data-key="price">股價</span>
+                <span data-key="score">分數</span>
+                <span data-key="rsi">RSI</span>
+                <span data-key="macd">MACD</span>
+                <span data-key="action">建議</span>
+            </div>
+            <div class="viewport" id="viewport"><div id="spacer"></div><div class="rows" id="rows"></div></div>
+        </div>
+"""
+
+TABLE_SCRIPT = """
+<script>
+(function () {
+    var data = JSON.parse(document.getElementById('report-data').textContent);
+    var ROW_HEIGHT = 36, OVERSCAN = 8, n = data.ticker.length;
+    var viewport = document.getElementById('viewport'), spacer = document.getElementById('spacer');
+    var rows = document.getElementById('rows'), search = document.getElementById('search');
+    var state = {action: -1, query: '', key: 'rank', desc: false}, order = [], first = -1, last = -1;
+    var haystack = data.ticker.map(function (t, i) { return (t + ' ' + data.name[i]).toLowerCase(); });
+    var escapes = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'};
+
+    function esc(text) { return String(text).replace(/[&<>"]/g, function (c) { return escapes[c]; }); }
+    function fixed(value, digits) { return value === null ? '-' : value.toFixed(digits); }
+    function value(key, i) { return key === 'rank' ? i : key === 'ticker' ? data.ticker[i] : data[key][i]; }
+
+    function update() {
+        var query = state.query.toLowerCase(), picked = [];
+        for (var i = 0; i < n; i++) {
+            if (state.action >= 0 && data.action[i] !== state.action) continue;
+            if (query && haystack[i].indexOf(query) < 0) continue;
+            picked.push(i);
+        }
+        var key = state.key, sign = state.desc ? -1 : 1;
+        picked.sort(function (a, b) {
+            var x = value(key, a), y = value(key, b);
+            if (x === y) return a - b;
+            if (x === null) return 1;
+            if (y === null) return -1;
+            return (x < y ? -1 : 1) * sign;
+        });
+        order = picked;
+        spacer.style.height = order.length * ROW_HEIGHT + 'px';
+        document.getElementById('shown').textContent = order.length;
+        render(true);
+    }
+
+    function render(force) {
+        var top = viewport.scrollTop;
+        var start = Math.max(0, Math.floor(top / ROW_HEIGHT) - OVERSCAN);
+        var end = Math.min(order.length, Math.ceil((top + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+        if (!force && start === first && end === last) return;
+        first = start;
+        last = end;
+        var html = [];
+        for (var k = start; k < end; k++) {
+            var i = order[k], action = data.actions[data.action[i]], score = data.score[i];
+            html.push('<div class="grid-row"><span class="rank">' + (i + 1) + '</span>' +
+                '<span class="stock"><span class="ticker">' + esc(data.ticker[i].replace(/\\.TW$/, '')) +
+                '</span> <span class="name">' + esc(data.name[i] || '未知') + '</span></span>' +
+                '<span class="price">' + fixed(data.price[i], 2) + '</span>' +
+                '<span class="score ' + (score >= 0 ? 'positive' : 'negative') + '">' + fixed(score, 1) + '</span>' +
+                '<span>' + fixed(data.rsi[i], 1) + '</span><span>' + data.macd_labels[data.macd[i]] + '</span>' +
+                '<span class="signal-' + action.toLowerCase() + '">' + action + '</span></div>');
+        }
+        rows.style.transform = 'translateY(' + start * ROW_HEIGHT + 'px)';
+        rows.innerHTML = html.join('');
+    }
+
+    var buttons = document.querySelectorAll('.filters button');
+    Array.prototype.forEach.call(buttons, function (button) {
+        var action = Number(button.getAttribute('data-action'));
+        button.querySelector('b').textContent = action < 0 ? n :
+            data.action.filter(function (a) { return a === action; }).length;
+        button.addEventListener('click', function () {
+            Array.prototype.forEach.call(buttons, function (b) { b.classList.toggle('active', b === button); });
+            state.action = action;
+            viewport.scrollTop = 0;
+            update();
+        });
+    });
+
+    var heads = document.querySelectorAll('.grid-head span');
+    Array.prototype.forEach.call(heads, function (head) {
+        head.addEventListener('click', function () {
+            var key = head.getAttribute('data-key');
+            // 數值欄第一次點擊由大到小，文字與名次由小到大
+            state.desc = key === state.key ? !state.desc : ['price', 'score', 'rsi'].indexOf(key) >= 0;
+            state.key = key;
+            Array.prototype.forEach.call(heads, function (h) {
+                h.classList.toggle('sorted', h === head);
+                h.classList.toggle('desc', h === head && state.desc);
+            });
+            update();
+        });
+    });
+
+    search.addEventListener('input', function () {
+        state.query = search.value.trim();
+        viewport.scrollTop = 0;
+        update();
+    });
+    viewport.addEventListener('scroll', function () { render(false); });
+    window.addEventListener('resize', function () { render(true); });
+    update();
+})();
+</script>
+"""
+
+
+def report_rows(ranked_stocks, action):
+    """
+    依排名順序產生某個訊號的報告列 (代碼, 股價, 分數, RSI, MACD 中文)
+
+    Args:
+        ranked_stocks: compare() 的 ranked_stocks（dict 列表），
+                       或 compare(..., compact=True) 的 CompareResults
+        action: 'BUY'、'SELL' 或 'HOLD'
+
+    Yields:
+        tuple: 每支股票一列
+    """
+    if hasattr(ranked_stocks, 'records'):
+        # compact 結果直接讀欄位，不重建每支股票的分析 dict
+        from indicators import macd_signal_codes
+
+        records = ranked_stocks.records
+        records = records[records['action'] == action]
+        codes = macd_signal_codes(records['macd_hist'], records['macd_prev_hist']).tolist()
+        yield from zip(
+            records['ticker'].tolist(), records['price'].tolist(), records['score'].tolist(),
+            records['rsi'].tolist(), [MACD_CODE_LABELS[code] for code in codes]
+        )
+        return
+
+    for stock in ranked_stocks:
+        analysis = stock['analysis']
+        if analysis['signal']['action'] != action:
+            continue
+        indicators = analysis['indicators']
+        macd_signal = indicators['MACD']['signal']
+        yield (stock['ticker'], analysis['current_price'], stock['score'],
+               indicators['RSI']['value'], MACD_LABELS.get(macd_signal, macd_signal))
+
+
+def table_data(ranked_stocks):
+    """
+    互動表格的欄位式資料（依排名順序，所有訊號含 HOLD）
+
+    訊號與 MACD 以索引表示（對應 actions / macd_labels），數值四捨五入，
+    NaN 轉為 None（JSON null）。
+
+    Returns:
+        dict: actions, macd_labels, ticker, name, price, score, rsi, action, macd
+    """
+    if hasattr(ranked_stocks, 'records'):
+        from indicators import macd_signal_codes
+
+        records = ranked_stocks.records
+        codes = macd_signal_codes(records['macd_hist'], records['macd_prev_hist']).tolist()
+        rows = zip(records['ticker'].tolist(), records['action'].tolist(),
+                   records['price'].tolist(), records['score'].tolist(), records['rsi'].tolist(),
+                   [MACD_CODE_LABELS[code] for code in codes])
+    else:
+        rows = []
+        for stock in ranked_stocks:
+            analysis = stock['analysis']
+            indicators = analysis['indicators']
+            macd_signal = indicators['MACD']['signal']
+            rows.append((stock['ticker'], analysis['signal']['action'], analysis['current_price'],
+                         stock['score'], indicators['RSI']['value'],
+                         MACD_LABELS.get(macd_signal, macd_signal)))
+
+    names = stock_list.load_stocks()[1]
+    actions = {action: index for index, action in enumerate(TABLE_ACTIONS)}
+    macd_labels = {label: index for index, label in enumerate(MACD_CODE_LABELS.values())}
+
+    def number(value, digits):
+        # NaN / None 以 JSON null 表示
+        return None if value is None or value != value else round(value, digits)
+
+    columns = {key: [] for key in ('ticker', 'name', 'price', 'score', 'rsi', 'action', 'macd')}
+    for ticker, action, price, score, rsi, macd in rows:
+        columns['ticker'].append(ticker)
+        columns['name'].append(names.get(ticker, ''))
+        columns['price'].append(number(price, 2))
+        columns['score'].append(number(score, 1))
+        columns['rsi'].append(number(rsi, 1))
+        columns['action'].append(actions.get(action, actions['HOLD']))
+        columns['macd'].append(macd_labels.setdefault(macd, len(macd_labels)))
+    return {'actions': list(TABLE_ACTIONS), 'macd_labels': list(macd_labels), **columns}
+
+
+def action_counts(ranked_stocks):
+    """各訊號的股票數（只讀訊號欄位）"""
+    if hasattr(ranked_stocks, 'records'):
+        return Counter(ranked_stocks.records['action'].tolist())
+    return Counter(stock['analysis']['signal']['action'] for stock in ranked_stocks)
+
+
+def page_paths(output_path, pages):
+    """分頁檔名：第 1 頁為 output_path，其後為 <名稱>-2<副檔名>、<名稱>-3<副檔名>..."""
+    stem, ext = os.path.splitext(output_path)
+    return [output_path] + [f"{stem}-{page}{ext}" for page in range(2, pages + 1)]
+
+
+def _format_rows(rows, action, score_class, badge):
+    """把 (名次, 報告列) 格式化為 <tr> 字串"""
+    names = {ticker: html.escape(name) for ticker, name in stock_list.load_stocks()[1].items()}
+    for rank, (ticker, price, score, rsi, macd) in rows:
+        # 代碼可能來自自訂股票池，與名稱同樣跳脫
+        yield ROW.format(rank=rank, ticker=html.escape(ticker.replace('.TW', '')), name=names.get(ticker, '未知'),
+                         price=price, score_class=score_class, score=score, rsi=rsi, macd=macd,
+                         badge=badge, action=action)
+
+
+def _render_page(columns, counts, update_time, page, paths, page_size):
+    """依序產生一個頁面的 HTML 片段；columns 為各欄位共用的 (名次, 報告列) 迭代器"""
+    pages = len(paths)
+    yield PAGE_HEAD.format(update_time=update_time, extra_style='',
+                           page_title=f" ({page}/{pages})" if pages > 1 else "")
+    yield COLUMNS_OPEN
+
+    for action, title, badge, score_class, empty in SIDES:
+        yield COLUMN_HEAD.format(action=action, title=title, badge=badge, count=counts[action])
+        if counts[action]:
+            yield from _format_rows(islice(columns[action], page_size), action, score_class, badge)
+        else:
+            yield EMPTY_ROW.format(empty)
+        yield COLUMN_FOOT
+
+    links = ''
+    if pages > 1:
+        links = '        <nav class="pages">' + ''.join(
+            f'<span>{number}</span>' if number == page
+            else f'<a href="{html.escape(os.path.basename(path))}">{number}</a>'
+            for number, path in enumerate(paths, 1)
+        ) + '</nav>\n'
+    yield PAGE_FOOT.format(pages=links, scripts='')
+
+
+def _render_table_page(ranked_stocks, update_time):
+    """依序產生互動表格頁面的 HTML 片段"""
+    yield PAGE_HEAD.format(update_time=update_time, extra_style=TABLE_STYLE, page_title='')
+    yield TABLE_BODY
+    # 內嵌 JSON 中的 "</" 跳脫，避免提早結束 <script>
+    data = json.dumps(table_data(ranked_stocks), ensure_ascii=False, separators=(',', ':'))
+    yield '<script type="application/json" id="report-data">'
+    yield data.replace('</', '<\\/')
+    yield '</script>\n'
+    # 前端程式放在 </body> 之前
+    yield PAGE_FOOT.format(pages='', scripts=TABLE_SCRIPT)
+
+
+def _digest(*parts):
+    """內容雜湊（blake2b，32 個十六進位字元）"""
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(str(part).encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+# 樣板指紋：樣板改變時所有頁面重新生成
+TEMPLATE_DIGEST = _digest(PAGE_HEAD, COLUMNS_OPEN, COLUMN_HEAD, ROW, EMPTY_ROW, COLUMN_FOOT, PAGE_FOOT,
+                          TABLE_STYLE, TABLE_BODY, TABLE_SCRIPT)
+MANIFEST_VERSION = 1
+
+
+def input_digests(ranked_stocks):
+    """
+    每支股票輸入的雜湊：最新股價、RSI / MACD 數值與訊號、買賣訊號與分數
+
+    Returns:
+        list: 依排名順序的 (代碼, 訊號, 雜湊)
+    """
+    if hasattr(ranked_stocks, 'records'):
+        from indicators import macd_signal_codes
+
+        records = ranked_stocks.records
+        codes = macd_signal_codes(records['macd_hist'], records['macd_prev_hist']).tolist()
+        rows = zip(
+            records['ticker'].tolist(), records['action'].tolist(), records['price'].tolist(),
+            records['score'].tolist(), records['rsi'].tolist(), records['macd_line'].tolist(),
+            records['macd_signal'].tolist(), records['macd_hist'].tolist(),
+            [MACD_CODE_LABELS[code] for code in codes]
+        )
+    else:
+        rows = []
+        for stock in ranked_stocks:
+            analysis = stock['analysis']
+            indicators = analysis['indicators']
+            macd = indicators['MACD']
+            rows.append((stock['ticker'], analysis['signal']['action'], analysis['current_price'],
+                         stock['score'], indicators['RSI']['value'], macd['macd_line'],
+                         macd['signal_line'], macd['histogram'],
+                         MACD_LABELS.get(macd['signal'], macd['signal'])))
+    return [(row[0], row[1], _digest(*row)) for row in rows]
+
+
+def page_digests(inputs, counts, pages, page_size, config_digest):
+    """各頁的雜湊：設定、頁數、徽章數字，以及該頁每一欄各列的輸入雜湊（依名次）"""
+    hashers = {}
+    positions = Counter()
+    for ticker, action, digest in inputs:
+        if action not in counts:
+            continue
+        page = positions[action] // page_size if page_size else 0
+        positions[action] += 1
+        hasher = hashers.setdefault((page, action), hashlib.blake2b(digest_size=16))
+        hasher.update(digest.encode('ascii'))
+
+    sides = [action for action, *_ in SIDES]
+    return [
+        _digest(config_digest, pages, page, *(counts[action] for action in sides),
+                *(hashers[(page, action)].hexdigest() if (page, action) in hashers else ''
+                  for action in sides))
+        for page in range(pages)
+    ]
+
+
+def load_manifest(path):
+    """讀取 manifest；不存在、損毀或版本不符時回傳空 dict"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == MANIFEST_VERSION else {}
+
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def data_export_due(previous, manifest_path, data_dir):
+    """
+    是否需要寫出機器可讀資料：只由 manifest 決定
+
+    manifest 與生成報告前（previous）不同表示報告內容有變動；資料目錄還沒有
+    latest.json 時（第一次輸出）也要寫出。不以當日分區是否存在判斷，因為 CI
+    不保留日期分區，否則每次執行都會改寫帶有時間戳記的 latest.* 而產生提交。
+    """
+    return load_manifest(manifest_path) != previous or not os.path.exists(os.path.join(data_dir, 'latest.json'))
+
+
+def generate_html_report(analysis_result, output_path='docs/index.html', page_size=None,
+                         manifest_path=None, config=None, layout='columns'):
+    """
+    生成 HTML 報告 - 雙欄布局（SELL | BUY）或互動表格
+
+    Args:
+        analysis_result: compare() 的結果（ranked_stocks 可為 dict 列表或 CompareResults）
+        output_path: 報告路徑（分頁時為第 1 頁）
+        page_size: 每頁每欄最多幾列；None 表示全部放在同一頁（table 版面不分頁）
+        manifest_path: 增量生成用的 manifest 路徑；None 表示每次都重新生成
+        config: 分析設定（例如 analyzer.config），變動時重新生成所有頁面
+        layout: 'columns'（雙欄）或 'table'（含 HOLD、可排序篩選的單頁表格）
+
+    Returns:
+        str: output_path
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"未知的報告版面: {layout}（可用: {', '.join(LAYOUTS)}）")
+    table = layout == 'table'
+    if table:
+        page_size = None
+    ranked_stocks = analysis_result['ranked_stocks']
+    update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    # 先只計數（決定徽章數字與頁數），再逐列輸出
+    counts = action_counts(ranked_stocks)
+    counts = {action: counts[action] for action in (TABLE_ACTIONS if table else
+                                                    [action for action, *_ in SIDES])}
+    largest = max(counts.values())
+    pages = max(1, -(-largest // page_size)) if page_size else 1
+    paths = page_paths(output_path, pages)
+
+    # 與上次相同輸入的頁面略過不寫
+    unchanged = set()
+    if manifest_path:
+        previous = load_manifest(manifest_path)
+        config_digest = _digest(
+            TEMPLATE_DIGEST, json.dumps(config or {}, sort_keys=True, default=repr),
+            analysis_result.get('ranking_method'), page_size, layout,
+            json.dumps(stock_list.load_stocks()[1], sort_keys=True)
+        )
+        inputs = input_digests(ranked_stocks)
+        if table:
+            # 單頁包含所有股票，名次跨訊號：依排名順序雜湊全部輸入
+            digests = [_digest(config_digest, *(digest for _, _, digest in inputs))]
+        else:
+            digests = page_digests(inputs, counts, pages, page_size, config_digest)
+        old_pages = {page['path']: page['digest'] for page in previous.get('pages', [])}
+        unchanged = {path for path, digest in zip(paths, digests)
+                     if old_pages.get(os.path.basename(path)) == digest and os.path.exists(path)}
+
+        if len(unchanged) == len(paths) and len(old_pages) == len(paths):
+            print(f"[OK] 報告內容未變更，略過生成：{output_path}")
+            return output_path
+
+        # 頁數變少時移除多出來的舊頁面
+        directory = os.path.dirname(output_path)
+        names = {os.path.basename(path) for path in paths}
+        for name in old_pages:
+            if name not in names and os.path.exists(os.path.join(directory, name)):
+                os.remove(os.path.join(directory, name))
+
+    if table and output_path not in unchanged:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.writelines(_render_table_page(ranked_stocks, update_time))
+
+    # 各欄位的列在所有頁面間接續（名次也接續）
+    columns = {action: enumerate(report_rows(ranked_stocks, action), 1) for action, *_ in SIDES}
+    for page, path in enumerate([] if table else paths, 1):
+        if path in unchanged:
+            for action in columns:
+                deque(islice(columns[action], page_size or largest), maxlen=0)
+            continue
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(_render_page(columns, counts, update_time, page, paths, page_size or largest))
+
+    if manifest_path:
+        save_manifest(manifest_path, {
+            'version': MANIFEST_VERSION,
+            'config': config_digest,
+            'updated': update_time,
+            'pages': [{'path': os.path.basename(path), 'digest': digest}
+                      for path, digest in zip(paths, digests)],
+            'tickers': {ticker: digest for ticker, _, digest in inputs}
+        })
+
+    written = len(paths) - len(unchanged)
+    detail = f"（共 {pages} 頁，重新生成 {written} 頁）" if pages > 1 else ""
+    print(f"[OK] 報告已生成：{output_path}{detail}")
     return output_path
 
 
 def main():
     """主程序"""
+    import importlib.util
+    import logging
+    from main import StockAnalyzer
+    from results import EXPORT_FORMATS, export_results, prune_partitions
+
+    # 設定編碼
+    if sys.platform == 'win32':
+        os.system('chcp 65001 > nul')
+
     print("=" * 70)
     print("開始生成股票分析報告（雙欄布局）")
     print("=" * 70)
 
-    # 建立分析器
-    analyzer = StockAnalyzer()
+    # 建立分析器；股價快取放在專案的 .cache/ohlcv（workflow 以 actions/cache 保留）
+    config = StockAnalyzer()._default_config()
+    config['cache'].update(enabled=True, directory=os.path.join(ROOT_DIR, '.cache', 'ohlcv'))
+    analyzer = StockAnalyzer(config)
 
-    print(f"\n正在分析 {len(GIFT_STOCKS)} 支股票...")
+    # REPORT_UNIVERSE 選擇股票池（預設為 data/stocks.json 的清單）
+    tickers = stock_list.get_universe(os.environ.get('REPORT_UNIVERSE', stock_list.DEFAULT_UNIVERSE))
+    print(f"\n正在分析 {len(tickers)} 支股票...")
     print("這可能需要 10-15 秒，請稍候...\n")
 
-    # 執行分析
+    # 執行分析（compact 結果同時供 HTML 報告與資料輸出使用，不重新計算）
     result = analyzer.compare(
-        GIFT_STOCKS,
+        tickers,
         rank_by="momentum",
-        indicators=["RSI", "MACD"]
+        indicators=["RSI", "MACD"],
+        compact=True
     )
 
     print(f"[OK] 分析完成！成功分析 {len(result['ranked_stocks'])} 支股票")
+    if result['failed']:
+        print(f"[警告] {len(result['failed'])} 支股票下載失敗，未列入報告："
+              f"{', '.join(f['ticker'] for f in result['failed'])}")
 
     # 生成報告
     print("\n正在生成 HTML 報告...")
-    output_path = generate_html_report(result)
+    # REPORT_PAGE_SIZE 設定每頁每欄列數（股票很多時分成多個頁面檔案）
+    page_size = int(os.environ['REPORT_PAGE_SIZE']) if os.environ.get('REPORT_PAGE_SIZE') else None
+    # REPORT_LAYOUT=table 改為單頁互動表格（含 HOLD，可排序、篩選、搜尋）
+    layout = os.environ.get('REPORT_LAYOUT', 'columns')
+    # 以 manifest 記錄輸入雜湊，內容未變更時不重寫報告；manifest 是建置狀態，放在 .cache/ 而非 docs/
+    manifest_path = os.environ.get('REPORT_MANIFEST_PATH', '.cache/report-manifest.json')
+    previous = load_manifest(manifest_path)
+    with analyzer.metrics.timer('report'):
+        output_path = generate_html_report(result, page_size=page_size,
+                                           manifest_path=manifest_path,
+                                           config=analyzer.config, layout=layout)
+
+    # 機器可讀輸出（JSON / CSV / Parquet，依日期分區）：報告內容有變動時才寫出，
+    # 只保留最近 REPORT_DATA_KEEP_DAYS 個日期分區
+    batch = result['ranked_stocks']
+    data_dir = os.environ.get('REPORT_DATA_DIR', 'docs/data')
+    if data_export_due(previous, manifest_path, data_dir):
+        formats = EXPORT_FORMATS
+        if importlib.util.find_spec('pyarrow') is None:
+            formats = tuple(fmt for fmt in formats if fmt != 'parquet')
+            logging.getLogger('stock_analyzer').warning(
+                "[警告] 未安裝 pyarrow，略過 Parquet 輸出（pip install -r requirements.txt）")
+        with analyzer.metrics.timer('export'):
+            export_results(batch, data_dir, formats=formats)
+            pruned = prune_partitions(data_dir, int(os.environ.get('REPORT_DATA_KEEP_DAYS', 30)))
+        print(f"[OK] 資料輸出：{data_dir}（{', '.join(formats)}，日期 {batch.timestamp[:10]}，"
+              f"移除 {len(pruned)} 個過期分區）")
+
+    # 匯出各階段耗時（.prom 副檔名輸出 Prometheus 格式，其餘為 JSON）
+    metrics_path = os.environ.get('METRICS_PATH', '.cache/metrics.json')
+    os.makedirs(os.path.dirname(metrics_path) or '.', exist_ok=True)
+    analyzer.metrics.export(metrics_path)
+    stages = analyzer.metrics.summary(per_ticker=False)['stages']
+    print("[耗時] " + ", ".join(
+        f"{name} {h['sum']:.2f}s" for name, h in stages.items()
+    ))
+    print(f"[OK] 效能指標：{metrics_path}")
 
     print("\n" + "=" * 70)
     print("報告生成完成！")
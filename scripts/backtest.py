@@ -0,0 +1,308 @@
+"""
+Historical Backtester
+
+Replays the BUY/SELL/HOLD signal rules and the momentum / rsi / composite
+rankings of StockAnalyzer day by day over stored price history, to see how
+they would have performed.
+
+The whole universe is handled as one (dates x tickers) Close panel: the
+full indicator series come from indicators.panel_series(), the rules from
+signal_points() / ranking_scores(), and daily portfolio returns, turnover
+and hit rate are array operations over the panel. There is no Python loop
+over days or tickers, so ten years of 2000 tickers run in seconds.
+
+Positions are decided from the close of day t (indicators only use bars
+up to t) and earn the close-to-close return of day t + 1.
+
+Example Usage:
+    closes = load_closes('.cache/ohlcv')              # the OHLCV cache
+    result = run_backtest(closes, strategy='momentum', top_n=20)
+    print(result['summary'])
+    result['equity'].plot()
+"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Any, Union
+import os
+
+from lazy import lazy_import
+from cache import OHLCVCache
+from indicators import panel_series, signal_points, ranking_scores
+from providers import PriceProvider, LocalDirectoryProvider
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+
+STRATEGIES = ('signal', 'momentum', 'rsi', 'composite')
+PERIODS_PER_YEAR = 252
+
+
+def load_closes(
+    source: Union[str, OHLCVCache, PriceProvider],
+    tickers: Optional[List[str]] = None,
+    period: str = 'max'
+) -> pd.DataFrame:
+    """
+    Build a date-aligned Close panel from stored history
+
+    Args:
+        source: An OHLCVCache, any PriceProvider (e.g., LocalDirectoryProvider
+                or SyntheticProvider), or a directory path; a directory of
+                .npz files is read as an OHLCV cache, otherwise as per-ticker
+                CSV/Parquet files
+        tickers: Tickers to load (default: every ticker in the cache or
+                 directory; required for other providers)
+        period: History window passed to providers (the cache always
+                returns everything it has)
+
+    Returns:
+        DataFrame indexed by (tz-naive) date with one Close column per
+        ticker; dates a ticker did not trade are NaN
+    """
+    if isinstance(source, str):
+        names = os.listdir(source) if os.path.isdir(source) else []
+        if any(name.endswith('.npz') for name in names):
+            # Read-only use: never let TTL/size eviction delete history
+            source = OHLCVCache(source, ttl_seconds=float('inf'), max_bytes=float('inf'))
+        else:
+            if tickers is None:
+                tickers = sorted({os.path.splitext(name)[0] for name in names
+                                  if name.endswith(('.csv', '.parquet'))})
+            source = LocalDirectoryProvider(source)
+
+    if isinstance(source, OHLCVCache):
+        if tickers is None:
+            tickers = source.tickers()
+        loaded = (source.load(ticker) for ticker in tickers)
+        frames = [entry[0] if entry is not None else None for entry in loaded]
+    else:
+        if tickers is None:
+            raise ValueError(f"tickers are required to load from {source!r}")
+        frames = [source.fetch(ticker, period) for ticker in tickers]
+
+    columns = {}
+    for ticker, df in zip(tickers, frames):
+        if df is None or df.empty:
+            continue
+        close = df['Close']
+        index = close.index
+        if getattr(index, 'tz', None) is not None:
+            index = index.tz_localize(None)
+        close = pd.Series(close.to_numpy(dtype=np.float64), index=index.normalize())
+        columns[ticker.upper()] = close[~close.index.duplicated(keep='last')]
+
+    if not columns:
+        return pd.DataFrame(dtype=np.float64)
+    return pd.concat(columns, axis=1, sort=True)
+
+
+def strategy_scores(
+    closes: pd.DataFrame,
+    strategy: str = 'signal',
+    rsi_period: int = 14,
+    macd_spans: tuple = (12, 26, 9),
+    rsi_method: str = 'sma'
+) -> np.ndarray:
+    """
+    Daily rule output for every ticker of a Close panel
+
+    Args:
+        closes: Date-aligned Close panel, see load_closes()
+        strategy: "signal" (BUY/SELL points) or a ranking method
+                  ("momentum", "rsi", "composite")
+        rsi_period: RSI rolling window
+        macd_spans: (fast, slow, signal) EMA spans
+        rsi_method: "sma" (rolling means) or "wilder" (Wilder smoothing)
+
+    Returns:
+        (dates x tickers) float array: signal points (>= 1 BUY, <= -1
+        SELL) or ranking scores; NaN where the ticker has no price
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"strategy must be one of {STRATEGIES}, got {strategy!r}")
+
+    # Sessions a listed ticker skipped count as unchanged prices
+    filled = closes.ffill().where(closes.bfill().notna())
+    fast, slow, signal_span = macd_spans
+    params = {
+        'RSI': {'period': rsi_period, 'method': rsi_method},
+        'MACD': {'fast_period': fast, 'slow_period': slow, 'signal_period': signal_span}
+    }
+    series = panel_series(filled, ["RSI", "MACD"], params)
+    rsi, hist, prev_hist = series['rsi'], series['macd_hist'], series['macd_prev_hist']
+
+    if strategy == 'signal':
+        scores = signal_points(rsi, hist, prev_hist).astype(np.float64)
+    else:
+        scores = ranking_scores(strategy, rsi, hist, prev_hist)
+    return np.where(np.isnan(series['price']), np.nan, scores)
+
+
+def target_weights(
+    scores: np.ndarray,
+    strategy: str = 'signal',
+    top_n: int = 10,
+    allow_short: bool = False
+) -> np.ndarray:
+    """
+    Turn daily rule output into portfolio weights
+
+    The signal strategy holds every BUY ticker with equal weight (and
+    shorts every SELL ticker when allow_short is set). Ranking strategies
+    hold the top_n scores with equal weight (and short the bottom top_n).
+    Long-short books are scaled to a gross exposure of 1.
+
+    Args:
+        scores: Output of strategy_scores()
+        strategy: Strategy the scores came from
+        top_n: Tickers per side for ranking strategies
+        allow_short: Also take short positions
+
+    Returns:
+        (dates x tickers) weight array
+    """
+    if strategy == 'signal':
+        longs = scores >= 1
+        shorts = (scores <= -1) if allow_short else np.zeros_like(longs)
+    else:
+        valid = ~np.isnan(scores)
+        longs = _top_mask(np.where(valid, scores, -np.inf), top_n) & valid
+        shorts = (_top_mask(np.where(valid, -scores, -np.inf), top_n) & valid
+                  if allow_short else np.zeros_like(longs))
+
+    positions = longs.astype(np.float64) - shorts.astype(np.float64)
+    gross = np.abs(positions).sum(axis=1, keepdims=True)
+    return np.divide(positions, gross, out=np.zeros_like(positions), where=gross > 0)
+
+
+def run_backtest(
+    closes: pd.DataFrame,
+    strategy: str = 'signal',
+    top_n: int = 10,
+    rebalance: int = 1,
+    allow_short: bool = False,
+    cost_bps: float = 0.0,
+    rsi_period: int = 14,
+    macd_spans: tuple = (12, 26, 9),
+    rsi_method: str = 'sma'
+) -> Dict[str, Any]:
+    """
+    Backtest a signal or ranking rule over a Close panel
+
+    Args:
+        closes: Date-aligned Close panel, see load_closes()
+        strategy: "signal", "momentum", "rsi" or "composite"
+        top_n: Tickers per side for ranking strategies
+        rebalance: Recompute positions every N trading days (held in between)
+        allow_short: Also short SELL signals / the lowest ranked tickers
+        cost_bps: Transaction cost in basis points of traded weight
+        rsi_period: RSI rolling window
+        macd_spans: (fast, slow, signal) EMA spans
+        rsi_method: "sma" (rolling means) or "wilder" (Wilder smoothing)
+
+    Returns:
+        dict with:
+            summary: total/annual return, annual volatility, Sharpe ratio,
+                     max drawdown, hit rate (share of position-days with a
+                     return in the position's direction), average daily
+                     one-way turnover, average positions, and the
+                     equal-weight universe return for comparison
+            returns: Daily strategy returns (after costs), by date
+            equity: Growth of 1 invested at the first date
+            benchmark: Daily returns of the equal-weight universe
+            turnover: Daily one-way turnover
+    """
+    if rebalance < 1:
+        raise ValueError(f"rebalance must be >= 1, got {rebalance}")
+
+    scores = strategy_scores(closes, strategy, rsi_period, macd_spans, rsi_method)
+    weights = target_weights(scores, strategy, top_n, allow_short)
+    if rebalance > 1:
+        weights = weights[(np.arange(len(weights)) // rebalance) * rebalance]
+
+    values = closes.ffill().to_numpy()
+    moves = np.full_like(values, np.nan)
+    if len(values) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moves[1:] = values[1:] / values[:-1] - 1
+
+    # Weights decided at the close of day t earn the move of day t + 1
+    held = weights[:-1]
+    next_moves = moves[1:]
+    traded = np.abs(np.diff(weights, axis=0, prepend=np.zeros((1, weights.shape[1]))))[:-1]
+    costs = traded.sum(axis=1) * cost_bps / 10000.0
+    gross_returns = np.nansum(held * next_moves, axis=1)
+
+    dates = closes.index[1:]
+    returns = pd.Series(gross_returns - costs, index=dates, name=strategy)
+    equity = (1 + returns).cumprod().rename('equity')
+    benchmark = pd.Series(_nanmean_rows(next_moves), index=dates, name='benchmark')
+    turnover = pd.Series(traded.sum(axis=1) / 2, index=dates, name='turnover')
+
+    in_position = (held != 0) & ~np.isnan(next_moves)
+    hits = in_position & (np.sign(held) * next_moves > 0)
+
+    return {
+        'summary': _summarize(returns, equity, benchmark, turnover, hits, in_position,
+                              strategy, top_n, rebalance),
+        'returns': returns,
+        'equity': equity,
+        'benchmark': benchmark,
+        'turnover': turnover
+    }
+
+
+def _top_mask(scores: np.ndarray, n: int) -> np.ndarray:
+    """Row-wise mask of the n largest values (ties broken arbitrarily)"""
+    mask = np.zeros(scores.shape, dtype=bool)
+    n = min(n, scores.shape[1])
+    if n <= 0 or not scores.size:
+        return mask
+    picked = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    np.put_along_axis(mask, picked, True, axis=1)
+    return mask
+
+
+def _nanmean_rows(values: np.ndarray) -> np.ndarray:
+    counts = (~np.isnan(values)).sum(axis=1)
+    sums = np.nansum(values, axis=1)
+    return np.divide(sums, counts, out=np.zeros(len(values)), where=counts > 0)
+
+
+def _summarize(
+    returns: pd.Series,
+    equity: pd.Series,
+    benchmark: pd.Series,
+    turnover: pd.Series,
+    hits: np.ndarray,
+    in_position: np.ndarray,
+    strategy: str,
+    top_n: int,
+    rebalance: int
+) -> Dict[str, Any]:
+    days = len(returns)
+    total = float(equity.iloc[-1] - 1) if days else 0.0
+    years = days / PERIODS_PER_YEAR
+    volatility = float(returns.std(ddof=0)) if days else 0.0
+    drawdown = equity / equity.cummax() - 1 if days else pd.Series(dtype=float)
+    position_days = int(in_position.sum())
+
+    return {
+        'strategy': strategy,
+        'top_n': top_n if strategy != 'signal' else None,
+        'rebalance': rebalance,
+        'start': str(returns.index[0].date()) if days else None,
+        'end': str(returns.index[-1].date()) if days else None,
+        'days': days,
+        'total_return': total,
+        'annual_return': float((1 + total) ** (1 / years) - 1) if years and total > -1 else 0.0,
+        'annual_volatility': float(volatility * np.sqrt(PERIODS_PER_YEAR)),
+        'sharpe': float(returns.mean() / volatility * np.sqrt(PERIODS_PER_YEAR)) if volatility else 0.0,
+        'max_drawdown': float(drawdown.min()) if days else 0.0,
+        'hit_rate': float(hits.sum() / position_days) if position_days else 0.0,
+        'turnover': float(turnover.mean()) if days else 0.0,
+        'avg_positions': float(in_position.sum(axis=1).mean()) if days else 0.0,
+        'benchmark_return': float((1 + benchmark).prod() - 1) if days else 0.0
+    }
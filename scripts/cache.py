@@ -0,0 +1,373 @@
+"""
+On-disk OHLCV Cache
+
+Stores one columnar .npz file per ticker (date index plus one float64 array
+per OHLCV column) and refreshes it incrementally: once a ticker is cached,
+later requests only download the bars after the last stored date and
+append them. Files that have not been used for ttl_seconds are dropped,
+and the least recently used files are evicted when the cache grows beyond
+max_bytes.
+
+The cache is opt-in (config['cache']['enabled']); without an explicit
+directory it lives in the user cache directory, see default_cache_dir().
+
+Example Usage:
+    cache = OHLCVCache(default_cache_dir())
+    provider = CachedProvider(YahooProvider(), cache)
+    df = provider.fetch("2330.TW", "6mo")
+    print(cache.stats())
+"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Any, Tuple
+import os
+import threading
+import time
+
+from lazy import lazy_import
+from providers import PriceProvider, period_start
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+
+def default_cache_dir() -> str:
+    """
+    Per-user OHLCV cache directory ($XDG_CACHE_HOME or ~/.cache)
+
+    Returns:
+        <cache home>/stock-analyzer/ohlcv, independent of the working directory
+    """
+    home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(home, 'stock-analyzer', 'ohlcv')
+
+
+class OHLCVCache:
+    """
+    Per-ticker OHLCV files with TTL and size-based eviction
+
+    Each file also records when it was last refreshed from upstream
+    ('fetched_at') and the earliest date the stored history is known to
+    cover ('covers_from'), so callers can decide whether a cached series
+    can serve a request without hitting the network.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_seconds: float = 30 * 86400,
+        max_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        Args:
+            directory: Directory holding the cache files
+            ttl_seconds: Drop files not read or written for this long
+            max_bytes: Evict least recently used files above this total size
+        """
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.refreshes = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size = None
+
+        os.makedirs(directory, exist_ok=True)
+        self.evict()
+
+    def path_for(self, ticker: str) -> str:
+        """Return the cache file path for a ticker"""
+        safe = ticker.upper().replace(os.sep, '_').replace('/', '_')
+        return os.path.join(self.directory, f"{safe}.npz")
+
+    def tickers(self) -> List[str]:
+        """Return the (upper-cased) tickers that have a cache file, sorted"""
+        return sorted(
+            entry.name[:-len('.npz')] for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.endswith('.npz')
+        )
+
+    def load(self, ticker: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        Read a cached series
+
+        Args:
+            ticker: Stock symbol
+
+        Returns:
+            tuple: (DataFrame, metadata dict) or None if not cached
+        """
+        path = self.path_for(ticker)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = [str(c) for c in data['columns']]
+                tz = str(data['tz'])
+                index = pd.to_datetime(data['index'], utc=bool(tz))
+                if tz:
+                    index = index.tz_convert(tz)
+                df = pd.DataFrame(
+                    {c: data[f"col_{i}"] for i, c in enumerate(columns)},
+                    index=index
+                )
+                meta = {
+                    'fetched_at': float(data['fetched_at']),
+                    'covers_from': pd.Timestamp(int(data['covers_from']), tz='UTC')
+                }
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return None
+
+        # Touch the file so size-based eviction sees it as recently used
+        os.utime(path)
+        return df, meta
+
+    def store(
+        self,
+        ticker: str,
+        df: pd.DataFrame,
+        covers_from: pd.Timestamp,
+        fetched_at: Optional[float] = None
+    ) -> None:
+        """
+        Write a ticker's full cached series (atomically replaces the old file)
+
+        Args:
+            ticker: Stock symbol
+            df: DataFrame with OHLCV data indexed by date
+            covers_from: Earliest date the stored history is complete from
+            fetched_at: Epoch seconds of the upstream fetch (default: now)
+        """
+        path = self.path_for(ticker)
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else ''
+        if tz:
+            index = index.tz_convert('UTC').tz_localize(None)
+        if covers_from.tzinfo is None:
+            covers_from = covers_from.tz_localize('UTC')
+
+        arrays = {
+            'index': index.values.astype('datetime64[ns]').astype(np.int64),
+            'tz': np.array(tz),
+            'columns': np.array(list(df.columns), dtype=str),
+            'fetched_at': np.array(time.time() if fetched_at is None else fetched_at),
+            'covers_from': np.array(covers_from.tz_convert('UTC').value),
+        }
+        for i, column in enumerate(df.columns):
+            arrays[f"col_{i}"] = df[column].to_numpy(dtype=np.float64)
+
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is not None:
+                self._size += os.path.getsize(path) - old_size
+            over_budget = self._size is not None and self._size > self.max_bytes
+
+        if over_budget:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired files, then least recently used files over max_bytes
+
+        Returns:
+            Number of files removed
+        """
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # removed by another process sharing the directory
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        removed = 0
+        kept = []
+        for mtime, size, path in entries:
+            if now - mtime > self.ttl_seconds:
+                removed += self._remove(path)
+            else:
+                kept.append((mtime, size, path))
+
+        kept.sort()
+        total = sum(size for _, size, _ in kept)
+        while kept and total > self.max_bytes:
+            _, size, path = kept.pop(0)
+            total -= size
+            removed += self._remove(path)
+
+        with self._lock:
+            self._size = total
+            self.evictions += removed
+        return removed
+
+    def record(self, outcome: str, count: int = 1) -> None:
+        """Count a lookup outcome: 'hits', 'refreshes' or 'misses'"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + count)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache counters
+
+        Returns:
+            Dict with hits (served from disk), refreshes (only the missing
+            tail downloaded), misses (full download), evictions, hit_rate
+            and the current size in bytes
+        """
+        with self._lock:
+            requests = self.hits + self.refreshes + self.misses
+            return {
+                'hits': self.hits,
+                'refreshes': self.refreshes,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.refreshes) / requests if requests else 0.0,
+                'size_bytes': self._size or 0
+            }
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+
+class CachedProvider(PriceProvider):
+    """
+    PriceProvider wrapper that serves history from an OHLCVCache
+
+    A request is served from disk when the cached series covers the
+    requested period and was refreshed within refresh_seconds; otherwise
+    only the bars from the last stored date onwards are fetched and merged
+    (the last stored bar is re-fetched because it may have been a partial
+    intraday bar). Uncached tickers fall back to a full fetch.
+    """
+
+    name = 'cached'
+
+    def __init__(
+        self,
+        provider: PriceProvider,
+        cache: OHLCVCache,
+        refresh_seconds: float = 3600
+    ):
+        self.provider = provider
+        self.cache = cache
+        self.refresh_seconds = refresh_seconds
+        self.remote = provider.remote
+
+    def fetch(
+        self,
+        ticker: str,
+        period: str,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        df = self._lookup(ticker, period, timeout)
+        if df is not None:
+            return df
+
+        df = self.provider.fetch(ticker, period, timeout=timeout)
+        return self._store_full(ticker, period, df)
+
+    def fetch_many(
+        self,
+        tickers: List[str],
+        period: str,
+        timeout: Optional[float] = None
+    ) -> Dict[str, pd.DataFrame]:
+        frames = {}
+        missing = []
+        for ticker in tickers:
+            df = self._lookup(ticker, period, timeout)
+            if df is None:
+                missing.append(ticker)
+            else:
+                frames[ticker] = df
+
+        # Only the uncached tickers go out in the bulk request
+        if missing:
+            fetched = self.provider.fetch_many(missing, period, timeout=timeout)
+            for ticker in missing:
+                df = fetched.get(ticker)
+                if df is None:
+                    self.cache.record('misses')
+                else:
+                    frames[ticker] = self._store_full(ticker, period, df)
+        return frames
+
+    def _lookup(
+        self,
+        ticker: str,
+        period: str,
+        timeout: Optional[float]
+    ) -> Optional[pd.DataFrame]:
+        """Serve a request from the cache (refreshing the tail if stale), or None"""
+        cached = self.cache.load(ticker)
+
+        if cached is not None:
+            df, meta = cached
+            start = period_start(period, df.index[-1]) if len(df) else None
+            covered = start is not None and \
+                meta['covers_from'] <= self._as_utc(start)
+
+            if covered:
+                if time.time() - meta['fetched_at'] < self.refresh_seconds:
+                    self.cache.record('hits')
+                else:
+                    df = self._refresh_tail(ticker, df, meta, timeout)
+                    self.cache.record('refreshes')
+                start = period_start(period, df.index[-1])
+                return df[df.index > start]
+        return None
+
+    def _store_full(self, ticker: str, period: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Count a miss and store a freshly downloaded full period"""
+        self.cache.record('misses')
+        if not df.empty:
+            start = period_start(period, df.index[-1])
+            if start is not None:
+                self.cache.store(ticker, df, self._as_utc(start))
+        return df
+
+    def fetch_since(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        return self.provider.fetch_since(ticker, start, timeout=timeout)
+
+    def _refresh_tail(
+        self,
+        ticker: str,
+        df: pd.DataFrame,
+        meta: Dict[str, Any],
+        timeout: Optional[float]
+    ) -> pd.DataFrame:
+        """Fetch bars from the last cached date onwards and append them"""
+        last_date = df.index[-1]
+        tail = self.provider.fetch_since(ticker, last_date.normalize(), timeout=timeout)
+
+        if not tail.empty:
+            tail = tail[list(df.columns.intersection(tail.columns))]
+            df = pd.concat([df[df.index < tail.index[0]], tail])
+
+        self.cache.store(ticker, df, meta['covers_from'])
+        return df
+
+    @staticmethod
+    def _as_utc(ts: pd.Timestamp) -> pd.Timestamp:
+        return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+    def __repr__(self) -> str:
+        return f"{self.name}({self.provider})"
@@ -0,0 +1,998 @@
+"""
+Technical Indicator Engine
+
+Shared indicator helpers for StockAnalyzer:
+
+    - *_result(): turn raw indicator values into the result dicts returned
+      by analyze() (signal label + Chinese interpretation), and the
+      indicator results into the trading signal
+    - INDICATORS registry: every indicator (RSI, MACD, Bollinger, SMA, ATR,
+      KD, OBV) declares its inputs, parameters and outputs, and computes on
+      a SeriesGraph that shares intermediates (diffs, EMAs, rolling windows)
+      between indicators and parameter sets
+    - ohlcv_panels() / compute_panel(): vectorized cross-sectional engine
+      that computes the indicators for every ticker of (bars x tickers)
+      price panels in single pandas operations
+    - indicator_series() / indicator_frame(): the same engine for one
+      ticker, returning whole indicator series instead of the last value
+    - wilder_rsi(): Wilder-smoothed RSI kernel on NumPy arrays (numba-compiled
+      when numba is installed), used for config['indicators']['RSI']['method']
+      == "wilder"
+    - signal_points() / ranking_scores(): the signal and ranking rules for
+      whole arrays of indicator values (used by compact results and the
+      backtester)
+
+Example Usage:
+    indicators = ["RSI", "MACD", "KD"]
+    panels = ohlcv_panels(tickers, frames, required_inputs(indicators))
+    results = compute_panel(panels, indicators, {'RSI': {'period': 9}})
+    print(results[0]['RSI']['value'], results[0]['KD']['k'])
+"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Any, Callable, Tuple, Union
+import functools
+
+from lazy import lazy_import
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+
+# Result builders (shared by the per-ticker and panel code paths)
+
+def rsi_result(value: float) -> Dict[str, Any]:
+    """Build the RSI result dict from the latest RSI value"""
+    if value < 30:
+        signal = 'oversold'
+        interpretation = f'RSI at {value:.1f} - 超賣訊號,可能反彈'
+    elif value > 70:
+        signal = 'overbought'
+        interpretation = f'RSI at {value:.1f} - 超買訊號,可能回調'
+    else:
+        signal = 'neutral'
+        interpretation = f'RSI at {value:.1f} - 中性區域'
+
+    return {
+        'value': float(value),
+        'signal': signal,
+        'interpretation': interpretation
+    }
+
+
+def macd_result(
+    macd_line: float,
+    signal_line: float,
+    histogram: float,
+    prev_histogram: float
+) -> Dict[str, Any]:
+    """Build the MACD result dict from the latest two histogram values"""
+    if histogram > 0 and prev_histogram <= 0:
+        signal = 'buy'
+        interpretation = 'MACD 黃金交叉 - 看漲訊號'
+    elif histogram < 0 and prev_histogram >= 0:
+        signal = 'sell'
+        interpretation = 'MACD 死亡交叉 - 看跌訊號'
+    elif histogram > 0:
+        signal = 'bullish'
+        interpretation = 'MACD 在訊號線上方 - 多頭趨勢'
+    else:
+        signal = 'bearish'
+        interpretation = 'MACD 在訊號線下方 - 空頭趨勢'
+
+    return {
+        'macd_line': float(macd_line),
+        'signal_line': float(signal_line),
+        'histogram': float(histogram),
+        'signal': signal,
+        'interpretation': interpretation
+    }
+
+
+def bollinger_result(
+    price: float,
+    upper: float,
+    middle: float,
+    lower: float
+) -> Dict[str, Any]:
+    """Build the Bollinger result dict from the latest band values"""
+    if price >= upper:
+        position = 'upper'
+        interpretation = '價格觸及上軌 - 可能超買'
+    elif price <= lower:
+        position = 'lower'
+        interpretation = '價格觸及下軌 - 可能超賣'
+    else:
+        position = 'middle'
+        interpretation = '價格在布林通道內 - 正常波動'
+
+    return {
+        'upper_band': float(upper),
+        'middle_band': float(middle),
+        'lower_band': float(lower),
+        'current_price': float(price),
+        'position': position,
+        'interpretation': interpretation
+    }
+
+
+def sma_result(price: float, sma: float, period: int) -> Dict[str, Any]:
+    """Build the SMA result dict from the latest price and moving average"""
+    if price > sma:
+        signal = 'bullish'
+        interpretation = f'價格在 {period} 日均線之上 - 多頭趨勢'
+    elif price < sma:
+        signal = 'bearish'
+        interpretation = f'價格在 {period} 日均線之下 - 空頭趨勢'
+    else:
+        signal = 'neutral'
+        interpretation = f'價格在 {period} 日均線附近'
+
+    return {
+        'value': float(sma),
+        'current_price': float(price),
+        'signal': signal,
+        'interpretation': interpretation
+    }
+
+
+def atr_result(price: float, atr: float) -> Dict[str, Any]:
+    """Build the ATR result dict from the latest price and average true range"""
+    percent = atr / price * 100
+    if percent >= 3:
+        signal = 'high_volatility'
+        interpretation = f'ATR 為股價的 {percent:.1f}% - 波動劇烈'
+    elif percent <= 1:
+        signal = 'low_volatility'
+        interpretation = f'ATR 為股價的 {percent:.1f}% - 波動平緩'
+    else:
+        signal = 'normal'
+        interpretation = f'ATR 為股價的 {percent:.1f}% - 正常波動'
+
+    return {
+        'value': float(atr),
+        'percent': float(percent),
+        'signal': signal,
+        'interpretation': interpretation
+    }
+
+
+def kd_result(k: float, d: float, prev_k: float, prev_d: float) -> Dict[str, Any]:
+    """Build the KD (stochastic oscillator) result dict from the latest two K/D values"""
+    if k > d and prev_k <= prev_d:
+        signal = 'buy'
+        interpretation = f'K {k:.1f} 向上穿越 D {d:.1f} - KD 黃金交叉'
+    elif k < d and prev_k >= prev_d:
+        signal = 'sell'
+        interpretation = f'K {k:.1f} 向下穿越 D {d:.1f} - KD 死亡交叉'
+    elif k > 80:
+        signal = 'overbought'
+        interpretation = f'K {k:.1f} - 高檔超買區'
+    elif k < 20:
+        signal = 'oversold'
+        interpretation = f'K {k:.1f} - 低檔超賣區'
+    else:
+        signal = 'neutral'
+        interpretation = f'K {k:.1f} / D {d:.1f} - 中性區域'
+
+    return {
+        'k': float(k),
+        'd': float(d),
+        'signal': signal,
+        'interpretation': interpretation
+    }
+
+
+def obv_result(obv: float, obv_sma: float) -> Dict[str, Any]:
+    """Build the OBV result dict from the latest OBV and its moving average"""
+    if obv > obv_sma:
+        signal = 'bullish'
+        interpretation = 'OBV 在均線之上 - 量能推升,資金流入'
+    elif obv < obv_sma:
+        signal = 'bearish'
+        interpretation = 'OBV 在均線之下 - 量能退潮,資金流出'
+    else:
+        signal = 'neutral'
+        interpretation = 'OBV 持平 - 量能無明顯方向'
+
+    return {
+        'value': float(obv),
+        'average': float(obv_sma),
+        'signal': signal,
+        'interpretation': interpretation
+    }
+
+
+def signal_result(price: float, indicators: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the trading signal dict from indicator results
+
+    Strategy: Combined RSI + MACD approach
+    - BUY: RSI oversold or MACD bullish
+    - SELL: RSI overbought or MACD bearish
+    - HOLD: Otherwise
+    """
+    rsi_data = indicators.get('RSI', {})
+    macd_data = indicators.get('MACD', {})
+
+    rsi = rsi_data.get('value', 50)
+    rsi_signal = rsi_data.get('signal', 'neutral')
+    macd_signal = macd_data.get('signal', 'neutral')
+
+    reasoning = []
+    scores = 0  # Positive = bullish, Negative = bearish
+
+    # RSI analysis
+    if rsi_signal == 'oversold':
+        reasoning.append(f"RSI {rsi:.1f} - 超賣,可能反彈")
+        scores += 2
+    elif rsi_signal == 'overbought':
+        reasoning.append(f"RSI {rsi:.1f} - 超買,可能回調")
+        scores -= 2
+    else:
+        reasoning.append(f"RSI {rsi:.1f} - 中性")
+
+    # MACD analysis
+    if macd_signal == 'buy':
+        reasoning.append("MACD 黃金交叉")
+        scores += 3
+    elif macd_signal == 'sell':
+        reasoning.append("MACD 死亡交叉")
+        scores -= 3
+    elif macd_signal == 'bullish':
+        reasoning.append("MACD 多頭排列")
+        scores += 1
+    elif macd_signal == 'bearish':
+        reasoning.append("MACD 空頭排列")
+        scores -= 1
+
+    # Determine final signal
+    if scores >= 3:
+        action = "BUY"
+        confidence = "high"
+    elif scores >= 1:
+        action = "BUY"
+        confidence = "moderate"
+    elif scores <= -3:
+        action = "SELL"
+        confidence = "high"
+    elif scores <= -1:
+        action = "SELL"
+        confidence = "moderate"
+    else:
+        action = "HOLD"
+        confidence = "low"
+
+    return {
+        'action': action,
+        'confidence': confidence,
+        'reasoning': reasoning,
+        'price': price,
+        'score': scores
+    }
+
+
+# Vectorized signal / ranking rules (same rules as signal_result() and
+# StockAnalyzer._calculate_ranking_score(), for arrays of any shape)
+
+def macd_signal_codes(hist: np.ndarray, prev_hist: np.ndarray) -> np.ndarray:
+    """
+    MACD signal labels as integer codes
+
+    Returns:
+        3 = buy, -3 = sell, 1 = bullish, -1 = bearish, 0 = not available
+        (NaN histogram), following macd_result()'s precedence
+    """
+    return np.select(
+        [np.isnan(hist), (hist > 0) & (prev_hist <= 0), (hist < 0) & (prev_hist >= 0), hist > 0],
+        [0, 3, -3, 1],
+        default=-1
+    )
+
+
+def signal_points(
+    rsi: Optional[np.ndarray] = None,
+    hist: Optional[np.ndarray] = None,
+    prev_hist: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Bullish/bearish points of signal_result() for arrays of indicator values
+
+    A missing RSI counts as neutral, a missing MACD as no signal.
+
+    Returns:
+        Integer points; >= 1 is BUY, <= -1 is SELL, |points| >= 3 is high
+        confidence
+    """
+    points = 0
+    if rsi is not None:
+        points = np.select([rsi < 30, rsi > 70], [2, -2], default=0)
+    if hist is not None:
+        points = points + macd_signal_codes(hist, prev_hist)
+    return np.asarray(points)
+
+
+def ranking_scores(
+    method: str,
+    rsi: Optional[np.ndarray] = None,
+    hist: Optional[np.ndarray] = None,
+    prev_hist: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    StockAnalyzer._calculate_ranking_score() for arrays of indicator values
+
+    Args:
+        method: Ranking method ("momentum", "rsi", "composite")
+        rsi: RSI values (missing RSI counts as 50)
+        hist: MACD histogram (missing MACD counts as neutral / zero)
+        prev_hist: Previous MACD histogram
+
+    Returns:
+        Float scores, higher is better
+    """
+    shape = np.shape(rsi if rsi is not None else hist)
+    rsi = np.full(shape, 50.0) if rsi is None else rsi
+
+    if method == "rsi":
+        return np.minimum(rsi, 70)
+
+    if hist is None:
+        codes = np.zeros(shape, dtype=int)
+        hist = np.zeros(shape)
+    else:
+        codes = macd_signal_codes(hist, prev_hist)
+
+    if method == "momentum":
+        bonus = np.select([codes == 3, codes == -3, codes == 1, codes == -1],
+                          [25, -25, 10, -10], default=0)
+        return (rsi - 50) + bonus
+
+    # composite
+    return (rsi * 0.6) + (np.where(np.isnan(hist), 0.0, hist) * 20 * 0.4)
+
+
+# RSI kernels
+
+RSI_METHODS = ('sma', 'wilder')
+
+# Panels narrower than this use the per-column loop even without numba
+_SCALAR_COLUMNS = 8
+
+
+def _wilder_columns(values: np.ndarray, period: int, out: np.ndarray) -> None:
+    """Per-column Wilder RSI loop (compiled with numba when available)"""
+    bars, width = values.shape
+    for j in range(width):
+        prev = np.nan
+        count = 0
+        gain_sum = 0.0
+        loss_sum = 0.0
+        avg_gain = 0.0
+        avg_loss = 0.0
+        for t in range(bars):
+            price = values[t, j]
+            if np.isnan(price):
+                continue
+            if not np.isnan(prev):
+                delta = price - prev
+                gain = delta if delta > 0 else 0.0
+                loss = -delta if delta < 0 else 0.0
+                if count < period:
+                    gain_sum += gain
+                    loss_sum += loss
+                    count += 1
+                    avg_gain = gain_sum / period
+                    avg_loss = loss_sum / period
+                else:
+                    avg_gain = (avg_gain * (period - 1) + gain) / period
+                    avg_loss = (avg_loss * (period - 1) + loss) / period
+                if count == period:
+                    if avg_loss == 0:
+                        out[t, j] = 100.0 if avg_gain > 0 else np.nan
+                    else:
+                        out[t, j] = 100 - (100 / (1 + avg_gain / avg_loss))
+            prev = price
+
+
+def _wilder_vectorized(values: np.ndarray, period: int, out: np.ndarray) -> None:
+    """Wilder RSI as a loop over bars, vectorized across columns"""
+    width = values.shape[1]
+    prev = np.full(width, np.nan)
+    count = np.zeros(width, dtype=np.int64)
+    gain_sum = np.zeros(width)
+    loss_sum = np.zeros(width)
+    avg_gain = np.zeros(width)
+    avg_loss = np.zeros(width)
+
+    for t, price in enumerate(values):
+        moved = ~np.isnan(price) & ~np.isnan(prev)
+        delta = np.where(moved, price - prev, 0.0)
+        gain = np.maximum(delta, 0.0)
+        loss = np.maximum(-delta, 0.0)
+
+        warming = moved & (count < period)
+        gain_sum += np.where(warming, gain, 0.0)
+        loss_sum += np.where(warming, loss, 0.0)
+        count += warming
+        smoothing = moved & ~warming
+        avg_gain = np.where(warming, gain_sum / period,
+                            np.where(smoothing, (avg_gain * (period - 1) + gain) / period, avg_gain))
+        avg_loss = np.where(warming, loss_sum / period,
+                            np.where(smoothing, (avg_loss * (period - 1) + loss) / period, avg_loss))
+
+        ready = moved & (count == period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, np.nan),
+                           100 - (100 / (1 + avg_gain / avg_loss)))
+        out[t] = np.where(ready, rsi, np.nan)
+        prev = np.where(np.isnan(price), prev, price)
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled_wilder_columns() -> Optional[Callable]:
+    """numba-compiled _wilder_columns, or None (numba is imported on first use)"""
+    try:
+        import numba
+    except ImportError:  # optional: pip install numba
+        return None
+    return numba.njit(cache=True)(_wilder_columns)
+
+
+def wilder_rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Wilder-smoothed RSI of a close array (1-D, or 2-D bars x tickers)
+
+    The first average gain/loss is the plain mean of the first `period`
+    close-to-close moves; after that avg = (avg * (period - 1) + move) /
+    period, as shown by most trading platforms. Every column starts at its
+    own first price, so right-aligned panels with NaN padding work, and RSI
+    is NaN until `period` moves are available.
+
+    Runs on contiguous float64 arrays without pandas temporaries: as a
+    compiled loop when numba is installed, otherwise as a NumPy loop over
+    bars vectorized across columns (a plain loop for narrow panels).
+
+    Args:
+        close: Close prices, oldest first
+        period: Smoothing period
+
+    Returns:
+        Float array shaped like close
+    """
+    values = np.ascontiguousarray(close, dtype=np.float64)
+    flat = values.ndim == 1
+    if flat:
+        values = values.reshape(-1, 1)
+
+    out = np.full(values.shape, np.nan)
+    compiled = _compiled_wilder_columns()
+    if compiled is not None:
+        compiled(values, int(period), out)
+    elif values.shape[1] < _SCALAR_COLUMNS:
+        _wilder_columns(values, int(period), out)
+    else:
+        _wilder_vectorized(values, int(period), out)
+    return out[:, 0] if flat else out
+
+
+# Indicator registry and computation graph
+
+class SeriesGraph:
+    """
+    Memoized intermediate series of one price panel
+
+    Indicators request shared building blocks (close diffs, EMAs, rolling
+    windows, ...) from the graph instead of computing them directly; every
+    node is computed once per graph and reused by every indicator and
+    parameter set that asks for it. Nodes are keyed by tuples such as
+    ('ema', 'Close', 12), and input columns ('Close', 'High', ...) by name.
+    """
+
+    def __init__(self, inputs: Dict[str, pd.DataFrame]):
+        """
+        Args:
+            inputs: (bars x tickers) panels keyed by OHLCV column name
+        """
+        self.inputs = inputs
+        self.nodes = {}
+
+    def has(self, column: str) -> bool:
+        """Whether an input column is available"""
+        return column in self.inputs
+
+    def get(self, key) -> pd.DataFrame:
+        """Return a computed node or an input panel"""
+        if key in self.nodes:
+            return self.nodes[key]
+        return self.inputs[key]
+
+    def node(self, key, build: Callable[[], Any]) -> Any:
+        """Return node `key`, computing it with build() the first time"""
+        if key not in self.nodes:
+            self.nodes[key] = build()
+        return self.nodes[key]
+
+    def counts(self, column: str = 'Close') -> np.ndarray:
+        """Number of non-missing bars so far, per row and column"""
+        return self.node(('counts', column),
+                         lambda: self.get(column).notna().cumsum().to_numpy())
+
+    def diff(self, key) -> pd.DataFrame:
+        return self.node(('diff', key), lambda: self.get(key).diff())
+
+    def shift(self, key) -> pd.DataFrame:
+        return self.node(('shift', key), lambda: self.get(key).shift(1))
+
+    def rolling_mean(self, key, window: int) -> pd.DataFrame:
+        return self.node(('mean', key, window),
+                         lambda: self.get(key).rolling(window=window).mean())
+
+    def rolling_std(self, key, window: int) -> pd.DataFrame:
+        return self.node(('std', key, window),
+                         lambda: self.get(key).rolling(window=window).std())
+
+    def rolling_max(self, key, window: int) -> pd.DataFrame:
+        return self.node(('max', key, window),
+                         lambda: self.get(key).rolling(window=window).max())
+
+    def rolling_min(self, key, window: int) -> pd.DataFrame:
+        return self.node(('min', key, window),
+                         lambda: self.get(key).rolling(window=window).min())
+
+    def ema(self, key, span: Optional[float] = None, alpha: Optional[float] = None) -> pd.DataFrame:
+        """Recursive (adjust=False) exponential moving average"""
+        return self.node(('ema', key, span, alpha),
+                         lambda: self.get(key).ewm(span=span, alpha=alpha, adjust=False).mean())
+
+
+class IndicatorSpec:
+    """
+    Registry entry of an indicator
+
+    Args:
+        name: Indicator name used in `indicators` lists and config keys
+        inputs: OHLCV columns the indicator needs
+        params: Parameter defaults (same names as config['indicators'][name])
+        outputs: Keys of the arrays compute() returns
+        columns: Output key -> column name in indicator_frame()
+        compute: fn(graph, **params) -> {output key: (bars x tickers) array}
+        result: fn(values, params) -> result dict, where values maps every
+                output key (plus 'price') to the latest value of one ticker
+    """
+
+    def __init__(
+        self,
+        name: str,
+        inputs: Tuple[str, ...],
+        params: Dict[str, Any],
+        outputs: Tuple[str, ...],
+        columns: Dict[str, str],
+        compute: Callable[..., Dict[str, np.ndarray]],
+        result: Callable[[Dict[str, float], Dict[str, Any]], Dict[str, Any]]
+    ):
+        self.name = name
+        self.inputs = inputs
+        self.params = params
+        self.outputs = outputs
+        self.columns = columns
+        self.compute = compute
+        self.result = result
+
+    def resolve(self, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parameter defaults updated with the known keys of `overrides`"""
+        params = dict(self.params)
+        params.update({k: v for k, v in (overrides or {}).items() if k in params})
+        return params
+
+
+INDICATORS: Dict[str, IndicatorSpec] = {}
+
+
+def register_indicator(spec: IndicatorSpec) -> IndicatorSpec:
+    """Add (or replace) an indicator in the registry"""
+    INDICATORS[spec.name] = spec
+    return spec
+
+
+def required_inputs(indicators: List[str]) -> List[str]:
+    """OHLCV columns needed by a list of indicators (always includes Close)"""
+    columns = ['Close']
+    for name in indicators:
+        spec = INDICATORS.get(name)
+        for column in (spec.inputs if spec else ()):
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def _rsi(graph: SeriesGraph, period: int, method: str) -> Dict[str, np.ndarray]:
+    if method == 'wilder':
+        return {'rsi': graph.node(('rsi_wilder', period),
+                                  lambda: wilder_rsi(graph.get('Close').to_numpy(), period))}
+    if method != 'sma':
+        raise ValueError(f"Unknown RSI method: {method} (expected one of {RSI_METHODS})")
+
+    # Simple moving averages of gains and losses (the original definition)
+    delta = graph.diff('Close')
+    graph.node(('gain', 'Close'), lambda: delta.where(delta > 0, 0))
+    graph.node(('loss', 'Close'), lambda: -delta.where(delta < 0, 0))
+    gain = graph.rolling_mean(('gain', 'Close'), period).to_numpy()
+    loss = graph.rolling_mean(('loss', 'Close'), period).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + gain / loss))
+    # Padding rows count as zero moves above, so mask short histories
+    return {'rsi': np.where(graph.counts() >= period, rsi, np.nan)}
+
+
+def _macd(graph: SeriesGraph, fast_period: int, slow_period: int, signal_period: int) -> Dict[str, np.ndarray]:
+    line_key = ('macd_line', fast_period, slow_period)
+    macd_line = graph.node(
+        line_key,
+        lambda: graph.ema('Close', fast_period) - graph.ema('Close', slow_period)
+    )
+    macd_line = macd_line.to_numpy()
+    signal_line = graph.ema(line_key, signal_period).to_numpy()
+    hist = macd_line - signal_line
+    prev_hist = np.full_like(hist, np.nan)
+    prev_hist[1:] = hist[:-1]
+    enough = graph.counts() >= 2
+    return {
+        'macd_line': np.where(enough, macd_line, np.nan),
+        'macd_signal': np.where(enough, signal_line, np.nan),
+        'macd_hist': np.where(enough, hist, np.nan),
+        'macd_prev_hist': np.where(enough, prev_hist, np.nan)
+    }
+
+
+def _bollinger(graph: SeriesGraph, period: int, std_dev: float) -> Dict[str, np.ndarray]:
+    middle = graph.rolling_mean('Close', period).to_numpy()
+    band = graph.rolling_std('Close', period).to_numpy() * std_dev
+    return {'bb_upper': middle + band, 'bb_middle': middle, 'bb_lower': middle - band}
+
+
+def _sma(graph: SeriesGraph, period: int) -> Dict[str, np.ndarray]:
+    return {'sma': graph.rolling_mean('Close', period).to_numpy()}
+
+
+def _atr(graph: SeriesGraph, period: int) -> Dict[str, np.ndarray]:
+    def true_range():
+        high, low = graph.get('High').to_numpy(), graph.get('Low').to_numpy()
+        prev_close = graph.shift('Close').to_numpy()
+        # fmax ignores the missing previous close of the first bar
+        ranges = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        close = graph.get('Close')
+        return pd.DataFrame(ranges, index=close.index, columns=close.columns)
+
+    graph.node(('true_range',), true_range)
+    atr = graph.ema(('true_range',), alpha=1 / period).to_numpy()  # Wilder smoothing
+    return {'atr': np.where(graph.counts() >= period, atr, np.nan)}
+
+
+def _kd(graph: SeriesGraph, period: int, smoothing: int) -> Dict[str, np.ndarray]:
+    def rsv():
+        lowest = graph.rolling_min('Low', period)
+        highest = graph.rolling_max('High', period)
+        spread = highest - lowest
+        return ((graph.get('Close') - lowest) / spread.where(spread > 0)) * 100
+
+    graph.node(('rsv', period), rsv)
+    k_key = ('kd_k', period, smoothing)
+    k = graph.node(k_key, lambda: graph.ema(('rsv', period), alpha=1 / smoothing))
+    d = graph.ema(k_key, alpha=1 / smoothing)
+    k_values, d_values = k.to_numpy(), d.to_numpy()
+    prev_k = np.full_like(k_values, np.nan)
+    prev_d = np.full_like(d_values, np.nan)
+    prev_k[1:], prev_d[1:] = k_values[:-1], d_values[:-1]
+    return {'kd_k': k_values, 'kd_d': d_values, 'kd_prev_k': prev_k, 'kd_prev_d': prev_d}
+
+
+def _obv(graph: SeriesGraph, period: int) -> Dict[str, np.ndarray]:
+    def obv():
+        flow = np.sign(graph.diff('Close')) * graph.get('Volume')
+        return flow.fillna(0).cumsum().where(graph.get('Close').notna())
+
+    graph.node(('obv',), obv)
+    return {
+        'obv': graph.get(('obv',)).to_numpy(),
+        'obv_sma': graph.rolling_mean(('obv',), period).to_numpy()
+    }
+
+
+def _macd_values(values: Dict[str, float], params: Dict[str, Any]) -> Dict[str, Any]:
+    if np.isnan(values['macd_line']):
+        return {'error': 'Error calculating MACD: not enough data'}
+    return macd_result(values['macd_line'], values['macd_signal'],
+                       values['macd_hist'], values['macd_prev_hist'])
+
+
+register_indicator(IndicatorSpec(
+    'RSI', ('Close',), {'period': 14, 'method': 'sma'}, ('rsi',), {'rsi': 'RSI'},
+    _rsi, lambda values, params: rsi_result(values['rsi'])
+))
+register_indicator(IndicatorSpec(
+    'MACD', ('Close',), {'fast_period': 12, 'slow_period': 26, 'signal_period': 9},
+    ('macd_line', 'macd_signal', 'macd_hist', 'macd_prev_hist'),
+    {'macd_line': 'MACD', 'macd_signal': 'MACD_signal', 'macd_hist': 'MACD_hist'},
+    _macd, _macd_values
+))
+register_indicator(IndicatorSpec(
+    'Bollinger', ('Close',), {'period': 20, 'std_dev': 2}, ('bb_upper', 'bb_middle', 'bb_lower'),
+    {'bb_upper': 'BB_upper', 'bb_middle': 'BB_middle', 'bb_lower': 'BB_lower'},
+    _bollinger,
+    lambda values, params: bollinger_result(values['price'], values['bb_upper'],
+                                            values['bb_middle'], values['bb_lower'])
+))
+register_indicator(IndicatorSpec(
+    'SMA', ('Close',), {'period': 20}, ('sma',), {'sma': 'SMA'},
+    _sma, lambda values, params: sma_result(values['price'], values['sma'], params['period'])
+))
+register_indicator(IndicatorSpec(
+    'ATR', ('High', 'Low', 'Close'), {'period': 14}, ('atr',), {'atr': 'ATR'},
+    _atr, lambda values, params: atr_result(values['price'], values['atr'])
+))
+register_indicator(IndicatorSpec(
+    'KD', ('High', 'Low', 'Close'), {'period': 9, 'smoothing': 3},
+    ('kd_k', 'kd_d', 'kd_prev_k', 'kd_prev_d'), {'kd_k': 'K', 'kd_d': 'D'},
+    _kd,
+    lambda values, params: kd_result(values['kd_k'], values['kd_d'],
+                                     values['kd_prev_k'], values['kd_prev_d'])
+))
+register_indicator(IndicatorSpec(
+    'OBV', ('Close', 'Volume'), {'period': 20}, ('obv', 'obv_sma'), {'obv': 'OBV'},
+    _obv, lambda values, params: obv_result(values['obv'], values['obv_sma'])
+))
+
+
+# Vectorized panel engine
+
+def ohlcv_panels(
+    tickers: List[str],
+    frames: List[pd.DataFrame],
+    columns: List[str] = ('Close',)
+) -> Dict[str, pd.DataFrame]:
+    """
+    Stack per-ticker OHLCV columns into right-aligned (bars x tickers) panels
+
+    Each column holds one ticker's own bar sequence, right-aligned so the
+    last row is every ticker's latest bar; shorter histories are padded
+    with NaN at the top. Aligning by bar position rather than by calendar
+    date keeps rolling windows identical to the per-ticker calculation
+    even when a ticker skipped a session.
+
+    Args:
+        tickers: Column labels (duplicates are allowed)
+        frames: OHLCV DataFrames, same order as tickers
+        columns: OHLCV columns to stack (a frame lacking one gives NaN)
+
+    Returns:
+        {column: DataFrame with a RangeIndex of bar positions and one
+        column per ticker}
+    """
+    length = max((len(df) for df in frames), default=0)
+    panels = {}
+    for column in columns:
+        values = np.full((length, len(frames)), np.nan)
+        for j, df in enumerate(frames):
+            n = len(df)
+            if n and column in df:
+                values[length - n:, j] = df[column].to_numpy(dtype=np.float64)
+        panels[column] = pd.DataFrame(values, columns=list(tickers))
+    return panels
+
+
+def close_panel(tickers: List[str], frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Right-aligned (bars x tickers) Close panel, see ohlcv_panels()"""
+    return ohlcv_panels(tickers, frames)['Close']
+
+
+def panel_series(
+    panel: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+    indicators: List[str],
+    params: Optional[Dict[str, Dict[str, Any]]] = None,
+    graph: Optional[SeriesGraph] = None,
+    errors: Optional[Dict[str, str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Full indicator series for every column of a price panel
+
+    Indicators are evaluated through the registry on one SeriesGraph, so
+    building blocks they share (close diffs, EMAs, rolling windows) are
+    computed once. Every operation runs on the whole panel along the time
+    axis, and row t of each output only depends on rows <= t. Values that
+    cannot be computed yet are NaN, matching the per-ticker calculation
+    on the history up to that row.
+
+    Args:
+        panel: (bars x tickers) Close panel, or a dict of OHLCV panels
+               (see ohlcv_panels()); indicators whose inputs are missing
+               are skipped
+        indicators: Indicator names; unknown names are ignored
+        params: Per-indicator parameters shaped like config['indicators']
+                (missing values fall back to the registry defaults)
+        graph: Graph to evaluate on (pass one to share intermediates
+               across calls, e.g. several parameter sets)
+        errors: If given, an indicator that raises (e.g. a bad parameter)
+                is recorded here as {name: message} and skipped instead
+                of aborting the other indicators
+
+    Returns:
+        Dict of (bars x tickers) float arrays: 'price' plus the outputs of
+        every computed indicator (e.g. 'rsi'; 'macd_line', 'macd_signal',
+        'macd_hist', 'macd_prev_hist'; 'bb_upper', 'bb_middle', 'bb_lower')
+    """
+    if graph is None:
+        graph = SeriesGraph(panel if isinstance(panel, dict) else {'Close': panel})
+    params = params or {}
+
+    series = {'price': graph.get('Close').to_numpy()}
+    for name in indicators:
+        spec = INDICATORS.get(name)
+        if spec is None or not all(graph.has(column) for column in spec.inputs):
+            continue
+        if errors is None:
+            series.update(spec.compute(graph, **spec.resolve(params.get(name))))
+            continue
+        try:
+            series.update(spec.compute(graph, **spec.resolve(params.get(name))))
+        except Exception as e:
+            errors[name] = str(e)
+    return series
+
+
+def panel_arrays(
+    panel: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+    indicators: List[str],
+    params: Optional[Dict[str, Dict[str, Any]]] = None,
+    errors: Optional[Dict[str, str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Latest indicator values for every column of a price panel, as arrays
+
+    Args:
+        panel: (bars x tickers) Close panel or dict of OHLCV panels
+        indicators: Indicator names
+        params: Per-indicator parameters shaped like config['indicators']
+        errors: Optional dict collecting indicators that failed, see
+                panel_series()
+
+    Returns:
+        Dict with the last row of every panel_series() output, one value
+        per panel column
+    """
+    series = panel_series(panel, indicators, params, errors=errors)
+    bars, width = series['price'].shape
+    if not bars:
+        return {key: np.full(width, np.nan) for key in series}
+    return {key: values[-1] for key, values in series.items()}
+
+
+def indicator_series(
+    price_data: pd.DataFrame,
+    indicators: Optional[List[str]] = None,
+    params: Optional[Dict[str, Dict[str, Any]]] = None,
+    errors: Optional[Dict[str, str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Full indicator series of one ticker, as NumPy arrays
+
+    Same engine (and keys) as panel_series(), applied to a single ticker;
+    the last element of every array is what analyze() reports.
+
+    Args:
+        price_data: OHLCV DataFrame (indicators whose columns are missing
+                    are skipped)
+        indicators: Indicator names (default: RSI, MACD and Bollinger)
+        params: Per-indicator parameters shaped like config['indicators']
+        errors: Optional dict collecting indicators that failed, see
+                panel_series()
+
+    Returns:
+        Dict of 1-D float arrays aligned with price_data's rows
+    """
+    indicators = indicators or ["RSI", "MACD", "Bollinger"]
+    # One-column panels with a shared label, so panels align in arithmetic
+    panels = {
+        column: pd.DataFrame({0: price_data[column].to_numpy(dtype=np.float64)})
+        for column in required_inputs(indicators) if column in price_data
+    }
+    series = panel_series(panels, indicators, params, errors=errors)
+    return {key: values[:, 0] for key, values in series.items()}
+
+
+def series_frame(series: Dict[str, np.ndarray], index: pd.Index) -> pd.DataFrame:
+    """
+    Arrange indicator_series() output as one aligned DataFrame
+
+    Columns are Close followed by the columns each computed indicator
+    declares (RSI; MACD, MACD_signal, MACD_hist; BB_upper, BB_middle,
+    BB_lower; SMA; ATR; K, D; OBV).
+    """
+    columns = {'Close': series['price']}
+    for spec in INDICATORS.values():
+        for key, column in spec.columns.items():
+            if key in series:
+                columns[column] = series[key]
+    return pd.DataFrame(columns, index=index)
+
+
+def indicator_frame(
+    price_data: pd.DataFrame,
+    indicators: Optional[List[str]] = None,
+    params: Optional[Dict[str, Dict[str, Any]]] = None
+) -> pd.DataFrame:
+    """
+    Full indicator series of one ticker as a DataFrame indexed like price_data
+
+    See indicator_series() for the arguments and series_frame() for the
+    columns.
+    """
+    return series_frame(indicator_series(price_data, indicators, params), price_data.index)
+
+
+def results_from_arrays(
+    arrays: Dict[str, np.ndarray],
+    indicators: List[str],
+    j: int,
+    params: Optional[Dict[str, Dict[str, Any]]] = None,
+    errors: Optional[Dict[str, str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Build one column's indicator result dicts from panel_arrays() output
+
+    Args:
+        arrays: Output of panel_arrays()
+        indicators: Indicator names, in output order
+        j: Column position
+        params: Per-indicator parameters the arrays were computed with
+        errors: Indicators that failed to compute, as collected by
+                panel_series()
+
+    Returns:
+        {indicator_name: result_dict}, the shape analyze() returns under
+        'indicators'
+    """
+    params = params or {}
+    errors = errors or {}
+    results = {}
+    for name in indicators:
+        spec = INDICATORS.get(name)
+        if spec is None:
+            results[name] = {'error': f'Unknown indicator: {name}'}
+        elif name in errors:
+            results[name] = {'error': f'Error calculating {name}: {errors[name]}'}
+        elif not all(key in arrays for key in spec.outputs):
+            results[name] = {
+                'error': f"Error calculating {name}: requires {', '.join(spec.inputs)} data"
+            }
+        else:
+            values = {key: arrays[key][j] for key in ('price',) + spec.outputs}
+            results[name] = spec.result(values, spec.resolve(params.get(name)))
+    return results
+
+
+def compute_panel(
+    panel: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+    indicators: List[str],
+    params: Optional[Dict[str, Dict[str, Any]]] = None,
+    errors: Optional[Dict[str, str]] = None
+) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Compute indicators for every column of a price panel at once
+
+    Args:
+        panel: (bars x tickers) Close panel or dict of OHLCV panels, see
+               ohlcv_panels()
+        indicators: Indicator names
+        params: Per-indicator parameters shaped like config['indicators']
+        errors: If given, an indicator that fails to compute is recorded
+                here and gets an {'error': ...} entry in every column
+                instead of raising (see panel_series())
+
+    Returns:
+        List with one {indicator_name: result_dict} per panel column, in
+        the same shape analyze() returns under 'indicators'
+    """
+    arrays = panel_arrays(panel, indicators, params, errors)
+    width = len(arrays['price'])
+    return [results_from_arrays(arrays, indicators, j, params, errors) for j in range(width)]
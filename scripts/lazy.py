@@ -0,0 +1,47 @@
+"""
+Lazy Imports
+
+Module proxies that import the real module on first attribute access.
+pandas and numpy (and, through pandas, pyarrow) account for nearly all of
+the start-up time of the entry points, so the scripts/ modules bind them
+through lazy_import(): importing main.py, or running a short job that only
+needs the stock list or a report template, no longer pays for them until
+an analysis actually touches a DataFrame or an array.
+
+Modules using lazy_import() must not touch the proxy at import time, and
+therefore use `from __future__ import annotations` so that annotations such
+as `-> pd.DataFrame` are not evaluated.
+
+Example Usage:
+    from lazy import lazy_import
+    pd = lazy_import('pandas')     # nothing is imported yet
+    df = pd.DataFrame()            # pandas is imported here
+"""
+
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder module that imports `name` when an attribute is first read"""
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        # Later lookups hit the copied namespace directly (no per-call overhead)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Return `name` if it is already imported, otherwise a LazyModule for it
+
+    Args:
+        name: Absolute module name, e.g. "pandas"
+
+    Returns:
+        The module, or a proxy that imports it on first attribute access
+    """
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
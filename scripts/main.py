@@ -9,11 +9,95 @@ Example Usage:
     print(result)
 """
 
-from typing import List, Dict, Optional, Any
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Any, Tuple, Iterator, Union
 from datetime import datetime
-import yfinance as yf
-import pandas as pd
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+import copy
+import heapq
+import logging
+import math
+import os
+import sys
+import time
+
+from lazy import lazy_import
+from providers import create_provider
+from cache import OHLCVCache, CachedProvider, default_cache_dir
+from monitor import MonitorEngine
+from streaming import state_params
+from metrics import MetricsRegistry
+from scheduler import FetchScheduler, ResilientProvider
+from indicators import (
+    signal_result,
+    ohlcv_panels,
+    required_inputs,
+    compute_panel,
+    panel_arrays,
+    indicator_series,
+    series_frame,
+    results_from_arrays,
+    INDICATORS,
+)
+from results import CompareResults, build_records, concat_records, rank_records
+from sweep import parameter_grid, sweep_panels
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+logger = logging.getLogger('stock_analyzer')
+
+
+def _rank_key(score: float) -> float:
+    """Sort key of a ranking score: NaN ranks last (as -inf), like rank_records()"""
+    return -math.inf if math.isnan(score) else score
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """StreamHandler that follows the current sys.stdout (redirect-friendly)"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure_logging(level: Optional[str] = None, quiet: bool = False) -> logging.Logger:
+    """
+    Set up the 'stock_analyzer' logger
+
+    Per-ticker progress is logged at DEBUG, one summary line per compare()
+    at INFO and fetch errors at WARNING. The default level is DEBUG, which
+    reproduces the classic console output; quiet (batch) mode raises it to
+    INFO so only the summaries and problems remain.
+
+    A plain stdout handler is attached only if the application has not
+    configured handlers on the logger itself.
+
+    Args:
+        level: Explicit level name (e.g., "WARNING"); overrides quiet
+        quiet: Batch mode, see above
+
+    Returns:
+        The configured logger
+    """
+    if not logger.handlers:
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+    if level is None:
+        level = 'INFO' if quiet else 'DEBUG'
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    return logger
 
 
 class StockAnalyzer:
@@ -32,16 +116,70 @@ class StockAnalyzer:
         Initialize stock analyzer with optional configuration
 
         Args:
-            config: Optional configuration dict with indicator parameters
+            config: Optional configuration dict with indicator parameters.
+                    config['data_source'] selects the price provider: a name
+                    ("yahoo_finance", "synthetic"), a dict such as
+                    {'type': 'local', 'directory': 'data/prices'}, or a
+                    PriceProvider instance (see providers.py).
+                    config['fetch'] sets concurrency, batching and, for
+                    network providers, the rate limit, retry budget and
+                    circuit breaker (see scheduler.py).
+                    config['cache'] enables the on-disk OHLCV cache for
+                    network providers (off by default; the directory
+                    defaults to the user cache directory, see cache.py).
+                    config['metrics']['export_path'] writes the metrics
+                    summary after every compare() (see metrics.py).
+                    config['logging'] sets the log level or quiet (batch)
+                    mode, see configure_logging()
         """
         self.config = config or self._default_config()
-        print(f"[StockAnalyzer] Initialized with config: {self.config['data_source']}")
+        self.metrics = MetricsRegistry()
+        self.provider = create_provider(self.config['data_source'])
+
+        if self.provider.remote:
+            fetch_config = self.config.get('fetch', {})
+            self.scheduler = FetchScheduler(
+                rate=fetch_config.get('rate_per_second'),
+                burst=fetch_config.get('burst'),
+                max_attempts=fetch_config.get('max_attempts', 3),
+                backoff_base=fetch_config.get('backoff_base', 0.5),
+                backoff_max=fetch_config.get('backoff_max', 8.0),
+                breaker_threshold=fetch_config.get('breaker_threshold', 10),
+                breaker_reset=fetch_config.get('breaker_reset', 30.0),
+                on_retry=lambda: self.metrics.incr('fetch.retries')
+            )
+            self.provider = ResilientProvider(self.provider, self.scheduler)
+        else:
+            self.scheduler = None
+
+        cache_config = self.config.get('cache', {})
+        if cache_config.get('enabled') and self.provider.cacheable:
+            self.cache = OHLCVCache(
+                cache_config.get('directory') or default_cache_dir(),
+                ttl_seconds=cache_config.get('ttl_days', 30) * 86400,
+                max_bytes=cache_config.get('max_mb', 256) * 1024 * 1024
+            )
+            self.provider = CachedProvider(
+                self.provider,
+                self.cache,
+                refresh_seconds=cache_config.get('refresh_minutes', 60) * 60
+            )
+        else:
+            self.cache = None
+
+        # Alerts use the same indicator parameters as analyze() / compare()
+        self.monitor_engine = MonitorEngine(state_params(self.config.get('indicators', {})))
+
+        log_config = self.config.get('logging', {})
+        configure_logging(log_config.get('level'), log_config.get('quiet', False))
+        logger.debug("[StockAnalyzer] Initialized with config: %s", self.provider)
 
     def analyze(
         self,
         ticker: str,
         indicators: Optional[List[str]] = None,
-        period: str = "1y"
+        period: str = "1y",
+        return_series: bool = False
     ) -> Dict[str, Any]:
         """
         Perform technical analysis on a stock
@@ -50,6 +188,9 @@ class StockAnalyzer:
             ticker: Stock symbol (e.g., "AAPL", "MSFT")
             indicators: List of indicators to calculate (default: ["RSI", "MACD"])
             period: Time period for analysis (default: "1y")
+            return_series: Also return the full indicator series of the
+                           window (computed once; the latest values in
+                           'indicators' are read from the same series)
 
         Returns:
             Dict containing:
@@ -58,6 +199,8 @@ class StockAnalyzer:
                 - indicators: Dict of indicator results
                 - signal: Buy/sell/hold recommendation
                 - timestamp: Analysis timestamp
+                - series: DataFrame of the indicator series, indexed by
+                  date (only with return_series=True, see indicator_frame())
 
         Example:
             >>> analyzer = StockAnalyzer()
@@ -67,47 +210,50 @@ class StockAnalyzer:
         """
         indicators = indicators or ["RSI", "MACD"]
 
-        print(f"\n[StockAnalyzer] Analyzing {ticker}...")
-        print(f"  - Indicators: {indicators}")
-        print(f"  - Period: {period}")
+        logger.debug("\n[StockAnalyzer] Analyzing %s...", ticker)
+        logger.debug("  - Indicators: %s", indicators)
+        logger.debug("  - Period: %s", period)
 
-        # Step 1: Fetch real price data using yfinance
+        # Step 1: Fetch price data from the configured provider
         price_data = self._fetch_data(ticker, period)
 
-        # Step 2: Calculate indicators
-        indicator_results = {}
-        for indicator_name in indicators:
-            indicator_results[indicator_name] = self._calculate_indicator(
-                indicator_name,
-                price_data
-            )
+        return self._analyze_data(ticker, price_data, indicators, period,
+                                  return_series=return_series)
 
-        # Step 3: Generate trading signal
-        signal = self._generate_signal(ticker, price_data, indicator_results)
-
-        # Step 4: Get current price
-        current_price = float(price_data['Close'].iloc[-1])
-
-        # Step 5: Compile results
-        result = {
-            'ticker': ticker.upper(),
-            'current_price': current_price,
-            'indicators': indicator_results,
-            'signal': signal,
-            'timestamp': datetime.now().isoformat(),
-            'period': period
-        }
+    def indicator_frame(
+        self,
+        ticker: str,
+        indicators: Optional[List[str]] = None,
+        period: str = "1y"
+    ) -> pd.DataFrame:
+        """
+        Full indicator time series of a stock, for charting and backtesting
 
-        print(f"[StockAnalyzer] Analysis complete for {ticker}")
-        print(f"  → Signal: {signal['action']} (confidence: {signal['confidence']})")
+        Args:
+            ticker: Stock symbol
+            indicators: Indicators to include (default: RSI, MACD, Bollinger)
+            period: Time period for analysis (default: "1y")
 
-        return result
+        Returns:
+            DataFrame indexed by date with columns Close, RSI, MACD,
+            MACD_signal, MACD_hist, BB_upper, BB_middle, BB_lower (for the
+            requested indicators); NaN until an indicator has enough bars
+        """
+        price_data = self._fetch_data(ticker, period)
+        with self.metrics.timer('indicators', ticker.upper()):
+            series = indicator_series(price_data, indicators, self._indicator_params())
+        return series_frame(series, price_data.index)
 
     def compare(
         self,
         tickers: List[str],
         rank_by: str = "momentum",
-        indicators: Optional[List[str]] = None
+        indicators: Optional[List[str]] = None,
+        top_k: Optional[int] = None,
+        keep_analysis: bool = True,
+        workers: Optional[int] = None,
+        executor: str = "thread",
+        compact: bool = False
     ) -> Dict[str, Any]:
         """
         Compare multiple stocks and rank by technical strength
@@ -116,9 +262,29 @@ class StockAnalyzer:
             tickers: List of stock symbols
             rank_by: Ranking method ("momentum", "rsi", "composite")
             indicators: Indicators to use for comparison
+            top_k: Keep only the best N stocks (bounded heap instead of
+                   sorting the whole universe)
+            keep_analysis: If False, drop the per-ticker 'analysis' payload
+                           and keep only the signal action
+            workers: Number of worker processes for executor="process"
+                     (default: os.cpu_count())
+            executor: "thread" runs everything in this process with
+                      threaded fetching; "process" splits the universe into
+                      chunks that are fetched, analyzed and scored in a
+                      process pool (the config, including a provider
+                      instance, must be picklable)
+            compact: Return 'ranked_stocks' as a CompareResults batch (one
+                     NumPy record per ticker, see results.py) instead of
+                     dicts; signals and scores are computed for whole
+                     chunks at once, keep_analysis is ignored and fetch
+                     latency is a column instead of 'fetch_latency'
 
         Returns:
-            Dict containing ranked stocks with scores and analysis
+            Dict containing ranked stocks with scores and analysis, plus
+            per-ticker fetch latency in seconds under 'fetch_latency', the
+            tickers that could not be fetched under 'failed' (a list of
+            {'ticker', 'error'}; they are left out of the ranking) and the
+            stage metrics summary under 'metrics'
 
         Example:
             >>> analyzer = StockAnalyzer()
@@ -127,82 +293,402 @@ class StockAnalyzer:
             >>>     print(f"{stock['ticker']}: {stock['score']}")
         """
         indicators = indicators or ["RSI", "MACD"]
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor}")
 
-        print(f"\n[StockAnalyzer] Comparing {len(tickers)} stocks...")
-        print(f"  - Tickers: {', '.join(tickers)}")
-        print(f"  - Rank by: {rank_by}")
-
-        comparisons = []
-        for ticker in tickers:
-            # Analyze each stock
-            analysis = self.analyze(ticker, indicators, period="6mo")
-
-            # Calculate ranking score
-            score = self._calculate_ranking_score(analysis, rank_by)
+        logger.debug("\n[StockAnalyzer] Comparing %d stocks...", len(tickers))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("  - Tickers: %s", ', '.join(tickers))
+        logger.debug("  - Rank by: %s", rank_by)
 
-            comparisons.append({
-                'ticker': ticker.upper(),
-                'analysis': analysis,
-                'score': score,
-                'rank': 0  # Will be set after sorting
-            })
+        start = time.perf_counter()
+        failed = []
+        latencies = None
 
-        # Sort by score (highest first)
-        comparisons.sort(key=lambda x: x['score'], reverse=True)
+        if compact:
+            if executor == "thread":
+                parts = list(self._iter_records(tickers, rank_by, indicators, failed))
+            else:
+                parts = [part['records'] for part in self._map_chunks(
+                    _compare_chunk_records, tickers, (rank_by, indicators), failed, workers
+                )]
+            records = concat_records(parts)
+            comparisons = CompareResults(
+                rank_records(records, top_k), indicators, rank_by, "6mo",
+                datetime.now().isoformat()
+            )
+        else:
+            if executor == "thread":
+                entries = self.iter_compare(tickers, rank_by, indicators, keep_analysis, failed)
+            else:
+                entries = self._iter_compare_processes(
+                    tickers, rank_by, indicators, keep_analysis, failed, workers
+                )
+            latencies = {}
+
+            def scored():
+                for entry in entries:
+                    latencies[entry['ticker']] = entry.pop('fetch_latency')
+                    entry['rank'] = 0  # Will be set after sorting
+                    yield entry
+
+            if top_k is None:
+                comparisons = list(scored())
+                # Sort by score (highest first)
+                comparisons.sort(key=lambda x: _rank_key(x['score']), reverse=True)
+            else:
+                comparisons = self._top_k(scored(), top_k)
 
-        # Assign ranks
-        for idx, comparison in enumerate(comparisons, 1):
-            comparison['rank'] = idx
+            # Assign ranks
+            for idx, comparison in enumerate(comparisons, 1):
+                comparison['rank'] = idx
 
         result = {
             'ranked_stocks': comparisons,
             'ranking_method': rank_by,
-            'total_analyzed': len(tickers),
-            'timestamp': datetime.now().isoformat()
+            'total_analyzed': len(tickers) - len(failed)
         }
-
-        print(f"[StockAnalyzer] Comparison complete")
-        print("  Rankings:")
-        for comp in comparisons:
-            print(f"    #{comp['rank']}: {comp['ticker']} (score: {comp['score']:.2f})")
+        if latencies is not None:
+            result['fetch_latency'] = latencies
+        result['failed'] = failed
+        result['timestamp'] = datetime.now().isoformat()
+        if self.cache is not None:
+            result['cache'] = self.cache.stats()
+            for name, value in result['cache'].items():
+                self.metrics.set_gauge(f'cache.{name}', value)
+
+        elapsed = time.perf_counter() - start
+        self.metrics.observe('compare', elapsed)
+        result['metrics'] = self.metrics.summary(per_ticker=False)
+        export_path = self.config.get('metrics', {}).get('export_path')
+        if export_path:
+            self.metrics.export(export_path)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[StockAnalyzer] Comparison complete")
+            logger.debug("  Rankings:")
+            for comp in comparisons:
+                logger.debug("    #%d: %s (score: %.2f)", comp['rank'], comp['ticker'], comp['score'])
+
+        self._log_compare_summary(result, elapsed)
 
         return result
 
+    def iter_compare(
+        self,
+        tickers: List[str],
+        rank_by: str = "momentum",
+        indicators: Optional[List[str]] = None,
+        keep_analysis: bool = True,
+        failed: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Score stocks and yield each one as soon as it is ready
+
+        Tickers are processed in chunks of config['fetch']['chunk_size']:
+        each chunk is fetched concurrently (per ticker, or in multi-ticker
+        batches when config['fetch']['mode'] is "bulk") and its indicators
+        computed in one panel pass, then its entries are yielded in input
+        order. Tickers that cannot be fetched are skipped.
+
+        Args:
+            tickers: List of stock symbols
+            rank_by: Ranking method ("momentum", "rsi", "composite")
+            indicators: Indicators to use for comparison
+            keep_analysis: If False, yield only the signal action instead of
+                           the full 'analysis' payload
+            failed: Optional list that collects {'ticker', 'error'} for
+                    every skipped ticker
+
+        Yields:
+            Dict with ticker, score, analysis (or action) and fetch_latency
+
+        Example:
+            >>> for entry in analyzer.iter_compare(GIFT_STOCKS):
+            >>>     print(entry['ticker'], entry['score'])
+        """
+        indicators = indicators or ["RSI", "MACD"]
+        period = "6mo"
+
+        for chunk, frames, latencies in self._fetch_chunks(tickers, period, failed):
+            # Compute indicators for the whole chunk in one panel pass
+            with self.metrics.timer('indicators.panel'):
+                panels = ohlcv_panels(chunk, frames, required_inputs(indicators))
+                errors = {}
+                panel_results = compute_panel(panels, indicators, self._indicator_params(), errors)
+            for name, error in errors.items():
+                logger.warning("  [錯誤] 計算 %s 失敗: %s", name, error)
+
+            for ticker, price_data, indicator_results in zip(chunk, frames, panel_results):
+                # Analyze each stock
+                analysis = self._analyze_data(
+                    ticker, price_data, indicators, period, indicator_results
+                )
+
+                # Calculate ranking score
+                with self.metrics.timer('ranking', ticker.upper()):
+                    score = self._calculate_ranking_score(analysis, rank_by)
+
+                entry = {'ticker': ticker.upper(), 'score': score}
+                if keep_analysis:
+                    entry['analysis'] = analysis
+                else:
+                    entry['action'] = analysis['signal']['action']
+                entry['fetch_latency'] = latencies[ticker.upper()]
+                yield entry
+
+    def sweep(
+        self,
+        tickers: List[str],
+        grid: Union[Dict[str, Dict[str, List[Any]]], List[Dict[str, Dict[str, Any]]]],
+        rank_by: str = "momentum",
+        indicators: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a grid of indicator parameter sets across a universe
+
+        Prices are fetched once; every parameter set is then computed on
+        shared intermediates (see sweep.py) instead of running compare()
+        once per set. Indicators a set does not override use
+        config['indicators'].
+
+        Args:
+            tickers: List of stock symbols
+            grid: {indicator: {param: [values]}} or a list of parameter
+                  sets, see sweep.parameter_grid()
+            rank_by: Ranking method ("momentum", "rsi", "composite")
+            indicators: Indicators feeding the signal and ranking rules
+                        (default: ["RSI", "MACD"])
+
+        Returns:
+            Dict containing:
+                - table: DataFrame with one row per (parameter set, ticker),
+                  ordered by set and rank, see sweep.sweep_panels()
+                - parameter_sets: The expanded parameter sets ('set' indexes
+                  into this list)
+                - ranking_method, total_analyzed, failed, metrics: as in
+                  compare()
+
+        Example:
+            >>> result = analyzer.sweep(GIFT_STOCKS, {'RSI': {'period': [7, 14, 21]}})
+            >>> result['table'].groupby('RSI.period')['action'].value_counts()
+        """
+        indicators = indicators or ["RSI", "MACD"]
+        param_sets = parameter_grid(grid)
+        failed = []
+        tables = []
+
+        with self.metrics.timer('sweep'):
+            for chunk, frames, latencies in self._fetch_chunks(tickers, "6mo", failed):
+                with self.metrics.timer('indicators.panel'):
+                    panels = ohlcv_panels(chunk, frames, required_inputs(indicators))
+                    tables.append(sweep_panels(
+                        panels, chunk, param_sets, indicators, rank_by,
+                        self._indicator_params(), latencies
+                    ))
+
+            if tables:
+                table = pd.concat(tables, ignore_index=True)
+                # Rank across chunks: score descending within each set, NaN last
+                table = table.sort_values(['set', 'score'], ascending=[True, False],
+                                          na_position='last', kind='stable')
+                table['rank'] = table.groupby('set').cumcount() + 1
+                table = table.reset_index(drop=True)
+            else:
+                table = sweep_panels({'Close': pd.DataFrame()}, [], [], indicators)
+
+        logger.info(
+            "[StockAnalyzer] sweep: %d parameter sets x %d tickers ranked by %s",
+            len(param_sets), len(tickers) - len(failed), rank_by
+        )
+        return {
+            'table': table,
+            'parameter_sets': param_sets,
+            'ranking_method': rank_by,
+            'total_analyzed': len(tickers) - len(failed),
+            'failed': failed,
+            'metrics': self.metrics.summary(per_ticker=False)
+        }
+
+    def _fetch_chunks(
+        self,
+        tickers: List[str],
+        period: str,
+        failed: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[Tuple[List[str], List[pd.DataFrame], Dict[str, float]]]:
+        """
+        Fetch tickers chunk by chunk (config['fetch']['chunk_size'])
+
+        Each chunk is fetched concurrently, per ticker or in multi-ticker
+        batches when config['fetch']['mode'] is "bulk". Failed tickers are
+        dropped from the chunk and reported through `failed`.
+
+        Yields:
+            tuple: (fetched tickers, their DataFrames, fetch latency keyed
+                    by upper-cased ticker)
+        """
+        fetch_config = self.config.get('fetch', {})
+        chunk_size = max(1, fetch_config.get('chunk_size', 500))
+        fetch_all = self._fetch_bulk if fetch_config.get('mode') == 'bulk' else self._fetch_all
+
+        for start in range(0, len(tickers), chunk_size):
+            chunk = tickers[start:start + chunk_size]
+
+            # Fetch the chunk concurrently before any indicator work starts
+            frames, latencies, errors = fetch_all(chunk, period)
+            if errors:
+                if failed is not None:
+                    failed.extend(
+                        {'ticker': ticker, 'error': error} for ticker, error in errors.items()
+                    )
+                chunk = [t for t, df in zip(chunk, frames) if df is not None]
+                frames = [df for df in frames if df is not None]
+                if not chunk:
+                    continue
+
+            yield chunk, frames, latencies
+
+    def _iter_records(
+        self,
+        tickers: List[str],
+        rank_by: str,
+        indicators: List[str],
+        failed: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        Compact variant of iter_compare(): yield one scored record array per chunk
+
+        Indicators, signals and ranking scores are computed for the whole
+        chunk with array operations; no per-ticker dicts are built.
+
+        Yields:
+            RESULT_DTYPE arrays (see results.py) in input order
+        """
+        for chunk, frames, latencies in self._fetch_chunks(tickers, "6mo", failed):
+            with self.metrics.timer('indicators.panel'):
+                panels = ohlcv_panels(chunk, frames, required_inputs(indicators))
+                errors = {}
+                arrays = panel_arrays(panels, indicators, self._indicator_params(), errors)
+            for name, error in errors.items():
+                logger.warning("  [錯誤] 計算 %s 失敗: %s", name, error)
+            with self.metrics.timer('signal'):
+                records = build_records(chunk, arrays, latencies, indicators, rank_by)
+            yield records
+
+    def _map_chunks(
+        self,
+        worker: Any,
+        tickers: List[str],
+        args: tuple,
+        failed: List[Dict[str, str]],
+        workers: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run worker(chunk, *args) for chunks of tickers in a process pool
+
+        Each worker process builds its own StockAnalyzer from self.config
+        once, so price data never leaves the worker. Parts are yielded in
+        input order after their failures, metrics and cache counters have
+        been folded into this analyzer's.
+        """
+        workers = max(1, workers or os.cpu_count() or 1)
+        chunk_size = max(1, self.config.get('fetch', {}).get('chunk_size', 500))
+        # A few chunks per worker keeps the pool busy when chunks run unevenly
+        chunk_size = max(1, min(chunk_size, math.ceil(len(tickers) / (workers * 4))))
+        chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+        if not chunks:
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            initializer=_init_process_worker,
+            initargs=(self.config,)
+        ) as pool:
+            columns = [[arg] * len(chunks) for arg in args]
+            for part in pool.map(worker, chunks, *columns):
+                failed.extend(part['failed'])
+                self.metrics.merge(part['metrics'])
+                if self.cache is not None:
+                    for outcome, count in part['cache'].items():
+                        self.cache.record(outcome, count)
+                yield part
+
+    def _iter_compare_processes(
+        self,
+        tickers: List[str],
+        rank_by: str,
+        indicators: List[str],
+        keep_analysis: bool,
+        failed: List[Dict[str, str]],
+        workers: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process-pool variant of iter_compare()
+
+        Workers run iter_compare() on whole chunks and send back compact
+        arrays (tickers, scores, latencies) plus the analysis payloads;
+        entries are yielded in input order.
+        """
+        payload_key = 'analysis' if keep_analysis else 'action'
+        parts = self._map_chunks(
+            _compare_chunk, tickers, (rank_by, indicators, keep_analysis), failed, workers
+        )
+        for part in parts:
+            for ticker, score, latency, payload in zip(
+                part['tickers'], part['scores'], part['latencies'], part['payloads']
+            ):
+                yield {
+                    'ticker': ticker,
+                    'score': float(score),
+                    payload_key: payload,
+                    'fetch_latency': float(latency)
+                }
+
     def monitor(
         self,
         ticker: str,
         condition: str,
-        action: str = "notify"
+        action: str = "notify",
+        warmup_period: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Set up monitoring and alerts for a stock
 
+        The condition is compiled and registered in self.monitor_engine
+        (see monitor.py); feed new bars with
+        self.monitor_engine.on_bar(ticker, close, date) or run().
+
         Args:
             ticker: Stock symbol to monitor
             condition: Alert condition (e.g., "RSI < 30", "MACD crossover")
             action: Action to take when condition met (default: "notify")
+            warmup_period: If set (e.g., "6mo"), fetch this much history to
+                           warm up the indicator state right away
 
         Returns:
             Dict with monitoring configuration
 
+        Raises:
+            ValueError: If the condition cannot be parsed
+
         Example:
             >>> analyzer = StockAnalyzer()
             >>> alert = analyzer.monitor("AAPL", "RSI < 30", "notify")
             >>> print(alert['status'])
             active
         """
-        print(f"\n[StockAnalyzer] Setting up monitoring...")
-        print(f"  - Ticker: {ticker}")
-        print(f"  - Condition: {condition}")
-        print(f"  - Action: {action}")
+        logger.debug("\n[StockAnalyzer] Setting up monitoring...")
+        logger.debug("  - Ticker: %s", ticker)
+        logger.debug("  - Condition: %s", condition)
+        logger.debug("  - Action: %s", action)
 
-        return {
-            'ticker': ticker.upper(),
-            'condition': condition,
-            'action': action,
-            'status': 'active',
-            'created': datetime.now().isoformat()
-        }
+        alert = self.monitor_engine.add_alert(ticker, condition, action)
+
+        if warmup_period:
+            price_data = self._fetch_data(ticker, warmup_period)
+            self.monitor_engine.warm_up(ticker, price_data['Close'])
+
+        return alert.to_dict()
 
     # Private helper methods
 
@@ -210,9 +696,39 @@ class StockAnalyzer:
         """Default configuration for indicators and data sources"""
         return {
             'data_source': 'yahoo_finance',
+            'fetch': {
+                'max_workers': 8,
+                'timeout': 10,
+                'deadline': None,
+                'chunk_size': 500,
+                'mode': 'single',
+                'batch_size': 100,
+                'rate_per_second': 10,
+                'burst': 10,
+                'max_attempts': 3,
+                'backoff_base': 0.5,
+                'backoff_max': 8.0,
+                'breaker_threshold': 10,
+                'breaker_reset': 30.0
+            },
+            'metrics': {
+                'export_path': None
+            },
+            'logging': {
+                'level': None,
+                'quiet': False
+            },
+            'cache': {
+                'enabled': False,
+                'directory': None,
+                'ttl_days': 30,
+                'max_mb': 256,
+                'refresh_minutes': 60
+            },
             'indicators': {
                 'RSI': {
                     'period': 14,
+                    'method': 'sma',
                     'overbought': 70,
                     'oversold': 30
                 },
@@ -224,6 +740,19 @@ class StockAnalyzer:
                 'Bollinger': {
                     'period': 20,
                     'std_dev': 2
+                },
+                'SMA': {
+                    'period': 20
+                },
+                'ATR': {
+                    'period': 14
+                },
+                'KD': {
+                    'period': 9,
+                    'smoothing': 3
+                },
+                'OBV': {
+                    'period': 20
                 }
             },
             'signals': {
@@ -231,159 +760,400 @@ class StockAnalyzer:
             }
         }
 
-    def _fetch_data(self, ticker: str, period: str) -> pd.DataFrame:
+    def _log_compare_summary(self, result: Dict[str, Any], elapsed: float) -> None:
+        """Log the one-line INFO summary of a compare() run"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
+        ranked = result['ranked_stocks']
+        top = f", top {ranked[0]['ticker']} ({ranked[0]['score']:.2f})" if ranked else ""
+        cache = result.get('cache')
+        hit_rate = f", cache hit rate {cache['hit_rate']:.0%}" if cache else ""
+        failed = f", {len(result['failed'])} failed" if result['failed'] else ""
+        logger.info(
+            "[StockAnalyzer] compare: %d tickers ranked by %s in %.2fs%s%s%s",
+            result['total_analyzed'], result['ranking_method'], elapsed, top, hit_rate, failed
+        )
+
+    @staticmethod
+    def _top_k(entries: Iterator[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
         """
-        Fetch real price data using yfinance
+        Keep the k highest-scoring entries with a bounded min-heap
+
+        Ties keep their input order, matching a stable descending sort.
+        """
+        heap = []
+        if k <= 0:
+            return heap
+        for order, entry in enumerate(entries):
+            item = (_rank_key(entry['score']), -order, entry)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+
+        heap.sort(key=lambda item: item[:2], reverse=True)
+        return [entry for _, _, entry in heap]
+
+    def _analyze_data(
+        self,
+        ticker: str,
+        price_data: pd.DataFrame,
+        indicators: List[str],
+        period: str,
+        indicator_results: Optional[Dict[str, Any]] = None,
+        return_series: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run indicator, signal and result assembly on already fetched data
+
+        Args:
+            ticker: Stock symbol
+            price_data: DataFrame with OHLCV data
+            indicators: List of indicators to calculate
+            period: Time period the data was fetched for
+            indicator_results: Precomputed indicator dicts (e.g., from the
+                               panel engine); calculated here if omitted
+            return_series: Compute the full indicator series and include
+                           them under 'series'
+
+        Returns:
+            Same dict as analyze()
+        """
+        # Step 2: Calculate indicators (all of them on one computation graph)
+        series = None
+        if indicator_results is None or return_series:
+            with self.metrics.timer('indicators', ticker.upper()):
+                indicator_results, series = self._calculate_indicators(indicators, price_data)
+
+        # Step 3: Generate trading signal
+        with self.metrics.timer('signal', ticker.upper()):
+            signal = self._generate_signal(ticker, price_data, indicator_results)
+
+        # Step 4: Get current price
+        current_price = float(price_data['Close'].iloc[-1])
+
+        # Step 5: Compile results
+        result = {
+            'ticker': ticker.upper(),
+            'current_price': current_price,
+            'indicators': indicator_results,
+            'signal': signal,
+            'timestamp': datetime.now().isoformat(),
+            'period': period
+        }
+        if return_series:
+            result['series'] = series_frame(series, price_data.index)
+
+        logger.debug("[StockAnalyzer] Analysis complete for %s", ticker)
+        logger.debug("  → Signal: %s (confidence: %s)", signal['action'], signal['confidence'])
+
+        return result
+
+    def _fetch_all(
+        self,
+        tickers: List[str],
+        period: str
+    ) -> Tuple[List[Optional[pd.DataFrame]], Dict[str, float], Dict[str, str]]:
+        """
+        Fetch price data for many tickers on a bounded thread pool
+
+        Concurrency and the per-request timeout come from
+        config['fetch'] ('max_workers', 'timeout'). A failed ticker does
+        not stop the others.
+
+        Args:
+            tickers: List of stock symbols
+            period: Time period passed to _fetch_data
+
+        Returns:
+            tuple: (DataFrames in the same order as tickers, None where
+                    the fetch failed; fetch latency in seconds and error
+                    message of failed fetches, both keyed by upper-cased
+                    ticker)
+        """
+        fetch_config = self.config.get('fetch', {})
+        max_workers = max(1, min(fetch_config.get('max_workers', 8), len(tickers) or 1))
+        timeout = fetch_config.get('timeout', 10)
+
+        def fetch_one(ticker: str) -> Tuple[pd.DataFrame, float]:
+            start = time.perf_counter()
+            df = self._fetch_data(ticker, period, timeout=timeout)
+            return df, time.perf_counter() - start
+
+        frames = []
+        latencies = {}
+        failed = {}
+        start = time.perf_counter()
+        deadline = self._fetch_deadline(len(tickers), max_workers)
+        outcomes = self._run_pool(fetch_one, tickers, max_workers, deadline)
+        for ticker, outcome in zip(tickers, outcomes):
+            if isinstance(outcome, Exception):
+                frames.append(None)
+                failed[ticker.upper()] = str(outcome)
+                continue
+            df, elapsed = outcome
+            frames.append(df)
+            latencies[ticker.upper()] = elapsed
+
+        if latencies:
+            logger.debug(
+                "  [並行下載完成] %d 支 / %d 執行緒, 總耗時 %.2fs, 單支平均 %.2fs, 最慢 %.2fs",
+                len(tickers), max_workers, time.perf_counter() - start,
+                sum(latencies.values()) / len(latencies), max(latencies.values())
+            )
+
+        return frames, latencies, failed
+
+    def _fetch_deadline(self, tasks: int, max_workers: int) -> float:
+        """
+        Overall deadline in seconds for one fetch pool run
+
+        config['fetch']['deadline'] if set; otherwise every wave of
+        max_workers tasks may use the full per-request timeout on each of
+        its max_attempts attempts.
+        """
+        fetch_config = self.config.get('fetch', {})
+        if fetch_config.get('deadline'):
+            return fetch_config['deadline']
+        waves = -(-tasks // max_workers)
+        return fetch_config.get('timeout', 10) * fetch_config.get('max_attempts', 3) * max(1, waves)
+
+    def _run_pool(self, fn, items: List[Any], max_workers: int, deadline: float) -> List[Any]:
+        """
+        Run fn over items on a thread pool, bounded by an overall deadline
+
+        The provider timeout only applies if the provider honours it, so
+        the pool enforces the deadline itself: tasks still queued or
+        running when it passes are abandoned (the pool is shut down
+        without waiting for them) and reported as TimeoutError.
+
+        Returns:
+            list: fn(item) in the order of items, or the exception it raised
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = [executor.submit(fn, item) for item in items]
+        _, pending = wait(futures, timeout=deadline)
+        executor.shutdown(wait=not pending, cancel_futures=True)
+        if pending:
+            self.metrics.incr('fetch.timeouts', len(pending))
+            logger.warning("  [逾時] %d 個下載工作超過 %.0f 秒未完成，已放棄", len(pending), deadline)
+
+        outcomes = []
+        for future in futures:
+            if future in pending:
+                outcomes.append(TimeoutError(f"下載逾時（超過 {deadline:.0f} 秒）"))
+            elif future.exception() is not None:
+                outcomes.append(future.exception())
+            else:
+                outcomes.append(future.result())
+        return outcomes
+
+    def _fetch_bulk(
+        self,
+        tickers: List[str],
+        period: str
+    ) -> Tuple[List[Optional[pd.DataFrame]], Dict[str, float], Dict[str, str]]:
+        """
+        Fetch price data with multi-ticker requests (config['fetch']['mode'] == "bulk")
+
+        Tickers are split into batches of config['fetch']['batch_size'],
+        each downloaded with one provider.fetch_many() call (batches run on
+        the fetch thread pool). Tickers missing from their batch response
+        are requested once more in a single targeted retry batch.
+
+        Args:
+            tickers: List of stock symbols
+            period: Time period passed to the provider
+
+        Returns:
+            tuple: (DataFrames in the same order as tickers, None where
+                    the ticker is still missing after the retry; fetch
+                    latency in seconds, i.e. the duration of the request
+                    that returned the ticker, and error message of failed
+                    tickers, both keyed by upper-cased ticker)
+        """
+        fetch_config = self.config.get('fetch', {})
+        batch_size = max(1, fetch_config.get('batch_size', 100))
+        timeout = fetch_config.get('timeout', 10)
+        batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+        max_workers = max(1, min(fetch_config.get('max_workers', 8), len(batches) or 1))
+
+        errors = {}
+
+        def fetch_batch(batch: List[str]) -> Tuple[Dict[str, pd.DataFrame], float]:
+            start = time.perf_counter()
+            try:
+                with self.metrics.timer('fetch.batch'):
+                    frames = self.provider.fetch_many(batch, period, timeout=timeout)
+            except Exception as e:
+                # The whole batch goes to the retry request
+                logger.warning("  [錯誤] 批次下載失敗 (%d 支): %s", len(batch), e)
+                errors.update({ticker: str(e) for ticker in batch})
+                frames = {}
+            self.metrics.incr('fetch.batches')
+            return frames, time.perf_counter() - start
+
+        found = {}
+        latencies = {}
+
+        def collect(batch: List[str], frames: Dict[str, pd.DataFrame], elapsed: float) -> None:
+            for ticker in batch:
+                df = frames.get(ticker)
+                if df is not None and not df.empty:
+                    found[ticker] = df
+                    latencies[ticker.upper()] = elapsed
+                    self.metrics.observe('fetch', elapsed, ticker.upper())
+
+        start = time.perf_counter()
+        outcomes = self._run_pool(fetch_batch, batches, max_workers,
+                                  self._fetch_deadline(len(batches), max_workers))
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                # Timed-out batches also go to the retry request
+                errors.update({ticker: str(outcome) for ticker in batch})
+                continue
+            collect(batch, *outcome)
+
+        # Targeted retry: one more request for just the tickers that came back empty
+        failed = list(dict.fromkeys(t for t in tickers if t not in found))
+        if failed:
+            logger.debug("  [重試] %d 支股票: %s", len(failed), ', '.join(failed))
+            self.metrics.incr('fetch.retries', len(failed))
+            frames, elapsed = fetch_batch(failed)
+            collect(failed, frames, elapsed)
+
+        missing = {
+            t.upper(): errors.get(t, f"無法獲取 {t} 的數據,請檢查股票代碼是否正確")
+            for t in failed if t not in found
+        }
+        if missing:
+            self.metrics.incr('fetch.failures', len(missing))
+            logger.warning("  [錯誤] 獲取數據失敗: %s", ', '.join(missing))
+
+        logger.debug(
+            "  [批次下載完成] %d 支 / %d 批 (每批 %d), 總耗時 %.2fs",
+            len(tickers), len(batches), batch_size, time.perf_counter() - start
+        )
+        return [found.get(t) for t in tickers], latencies, missing
+
+    def _fetch_data(
+        self,
+        ticker: str,
+        period: str,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Fetch price data from the configured provider
 
         Args:
             ticker: Stock symbol (e.g., "AAPL", "2330.TW")
             period: Time period ("1mo", "3mo", "6mo", "1y", "2y", "5y")
+            timeout: Request timeout in seconds (default: config['fetch']['timeout'])
 
         Returns:
             DataFrame with OHLCV data
         """
+        if timeout is None:
+            timeout = self.config.get('fetch', {}).get('timeout', 10)
+
         try:
-            print(f"  [正在下載 {ticker} 的股價數據...]")
-            stock = yf.Ticker(ticker)
-            df = stock.history(period=period)
+            logger.debug("  [正在下載 %s 的股價數據...]", ticker)
+            with self.metrics.timer('fetch', ticker.upper()):
+                df = self.provider.fetch(ticker, period, timeout=timeout)
 
             if df.empty:
                 raise ValueError(f"無法獲取 {ticker} 的數據,請檢查股票代碼是否正確")
 
-            print(f"  [成功獲取 {len(df)} 筆數據]")
+            logger.debug("  [成功獲取 %d 筆數據]", len(df))
             return df
 
         except Exception as e:
-            print(f"  [錯誤] 獲取數據失敗: {str(e)}")
+            self.metrics.incr('fetch.failures')
+            logger.warning("  [錯誤] 獲取 %s 數據失敗: %s", ticker, e)
             raise
 
+    def _indicator_params(self) -> Dict[str, Dict[str, Any]]:
+        """Per-indicator parameters from config['indicators']"""
+        return self.config.get('indicators', {})
+
+    def _calculate_indicators(
+        self,
+        indicators: List[str],
+        price_data: pd.DataFrame,
+        params: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        Calculate several indicators in one pass over shared intermediates
+
+        Args:
+            indicators: Indicator names (see indicators.INDICATORS)
+            price_data: DataFrame with OHLCV data
+            params: Per-indicator parameters (default: config['indicators'])
+
+        Returns:
+            tuple: ({indicator_name: result dict}, full series from
+                    indicators.indicator_series())
+        """
+        params = self._indicator_params() if params is None else params
+        errors = {}
+        try:
+            series = indicator_series(price_data, indicators, params, errors)
+        except Exception as e:
+            errors = {
+                name: {'error': f'Error calculating {name}: {str(e)}'} if name in INDICATORS
+                else {'error': f'Unknown indicator: {name}'}
+                for name in indicators
+            }
+            return errors, {'price': price_data['Close'].to_numpy(dtype=np.float64)}
+
+        latest = {key: values[-1:] for key, values in series.items()}
+        return results_from_arrays(latest, indicators, 0, params, errors), series
+
     def _calculate_indicator(
         self,
         indicator_name: str,
-        price_data: pd.DataFrame
+        price_data: pd.DataFrame,
+        **overrides: Any
     ) -> Dict[str, Any]:
         """
-        Calculate real technical indicators using pandas
+        Calculate one technical indicator through the indicator registry
+
+        Parameters come from config['indicators'][indicator_name]; keyword
+        arguments that are not None override them.
 
         Args:
-            indicator_name: Name of indicator ("RSI", "MACD", "Bollinger")
+            indicator_name: Name of indicator (e.g. "RSI", "MACD", "Bollinger",
+                            "SMA", "ATR", "KD", "OBV")
             price_data: DataFrame with OHLCV data
+            **overrides: Parameter overrides (e.g. period=7)
 
         Returns:
             Dict with indicator values and interpretation
         """
-        try:
-            if indicator_name == "RSI":
-                return self._calculate_rsi(price_data)
-            elif indicator_name == "MACD":
-                return self._calculate_macd(price_data)
-            elif indicator_name == "Bollinger":
-                return self._calculate_bollinger(price_data)
-            else:
-                return {'error': f'Unknown indicator: {indicator_name}'}
-        except Exception as e:
-            return {'error': f'Error calculating {indicator_name}: {str(e)}'}
-
-    def _calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> Dict[str, Any]:
+        params = self._indicator_params()
+        overrides = {key: value for key, value in overrides.items() if value is not None}
+        if overrides:
+            params = {**params, indicator_name: {**params.get(indicator_name, {}), **overrides}}
+        results, _ = self._calculate_indicators([indicator_name], price_data, params)
+        return results[indicator_name]
+
+    def _calculate_rsi(self, df: pd.DataFrame, period: Optional[int] = None) -> Dict[str, Any]:
         """Calculate RSI (Relative Strength Index)"""
-        close = df['Close']
-        delta = close.diff()
-
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1]
-
-        # Determine signal
-        if current_rsi < 30:
-            signal = 'oversold'
-            interpretation = f'RSI at {current_rsi:.1f} - 超賣訊號,可能反彈'
-        elif current_rsi > 70:
-            signal = 'overbought'
-            interpretation = f'RSI at {current_rsi:.1f} - 超買訊號,可能回調'
-        else:
-            signal = 'neutral'
-            interpretation = f'RSI at {current_rsi:.1f} - 中性區域'
-
-        return {
-            'value': float(current_rsi),
-            'signal': signal,
-            'interpretation': interpretation
-        }
+        return self._calculate_indicator("RSI", df, period=period)
 
     def _calculate_macd(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Calculate MACD (Moving Average Convergence Divergence)"""
-        close = df['Close']
-
-        # Calculate MACD components
-        ema_12 = close.ewm(span=12, adjust=False).mean()
-        ema_26 = close.ewm(span=26, adjust=False).mean()
-        macd_line = ema_12 - ema_26
-        signal_line = macd_line.ewm(span=9, adjust=False).mean()
-        histogram = macd_line - signal_line
-
-        current_macd = float(macd_line.iloc[-1])
-        current_signal = float(signal_line.iloc[-1])
-        current_hist = float(histogram.iloc[-1])
-        prev_hist = float(histogram.iloc[-2])
-
-        # Determine signal
-        if current_hist > 0 and prev_hist <= 0:
-            signal = 'buy'
-            interpretation = 'MACD 黃金交叉 - 看漲訊號'
-        elif current_hist < 0 and prev_hist >= 0:
-            signal = 'sell'
-            interpretation = 'MACD 死亡交叉 - 看跌訊號'
-        elif current_hist > 0:
-            signal = 'bullish'
-            interpretation = 'MACD 在訊號線上方 - 多頭趨勢'
-        else:
-            signal = 'bearish'
-            interpretation = 'MACD 在訊號線下方 - 空頭趨勢'
+        return self._calculate_indicator("MACD", df)
 
-        return {
-            'macd_line': current_macd,
-            'signal_line': current_signal,
-            'histogram': current_hist,
-            'signal': signal,
-            'interpretation': interpretation
-        }
-
-    def _calculate_bollinger(self, df: pd.DataFrame, period: int = 20, std_dev: int = 2) -> Dict[str, Any]:
+    def _calculate_bollinger(
+        self,
+        df: pd.DataFrame,
+        period: Optional[int] = None,
+        std_dev: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Calculate Bollinger Bands"""
-        close = df['Close']
-
-        middle_band = close.rolling(window=period).mean()
-        std = close.rolling(window=period).std()
-        upper_band = middle_band + (std * std_dev)
-        lower_band = middle_band - (std * std_dev)
-
-        current_price = float(close.iloc[-1])
-        current_upper = float(upper_band.iloc[-1])
-        current_middle = float(middle_band.iloc[-1])
-        current_lower = float(lower_band.iloc[-1])
-
-        # Determine position
-        if current_price >= current_upper:
-            position = 'upper'
-            interpretation = '價格觸及上軌 - 可能超買'
-        elif current_price <= current_lower:
-            position = 'lower'
-            interpretation = '價格觸及下軌 - 可能超賣'
-        else:
-            position = 'middle'
-            interpretation = '價格在布林通道內 - 正常波動'
-
-        return {
-            'upper_band': current_upper,
-            'middle_band': current_middle,
-            'lower_band': current_lower,
-            'current_price': current_price,
-            'position': position,
-            'interpretation': interpretation
-        }
+        return self._calculate_indicator("Bollinger", df, period=period, std_dev=std_dev)
 
     def _generate_signal(
         self,
@@ -400,64 +1170,7 @@ class StockAnalyzer:
         - HOLD: Otherwise
         """
         current_price = float(price_data['Close'].iloc[-1])
-        rsi_data = indicators.get('RSI', {})
-        macd_data = indicators.get('MACD', {})
-
-        rsi = rsi_data.get('value', 50)
-        rsi_signal = rsi_data.get('signal', 'neutral')
-        macd_signal = macd_data.get('signal', 'neutral')
-
-        reasoning = []
-        scores = 0  # Positive = bullish, Negative = bearish
-
-        # RSI analysis
-        if rsi_signal == 'oversold':
-            reasoning.append(f"RSI {rsi:.1f} - 超賣,可能反彈")
-            scores += 2
-        elif rsi_signal == 'overbought':
-            reasoning.append(f"RSI {rsi:.1f} - 超買,可能回調")
-            scores -= 2
-        else:
-            reasoning.append(f"RSI {rsi:.1f} - 中性")
-
-        # MACD analysis
-        if macd_signal == 'buy':
-            reasoning.append("MACD 黃金交叉")
-            scores += 3
-        elif macd_signal == 'sell':
-            reasoning.append("MACD 死亡交叉")
-            scores -= 3
-        elif macd_signal == 'bullish':
-            reasoning.append("MACD 多頭排列")
-            scores += 1
-        elif macd_signal == 'bearish':
-            reasoning.append("MACD 空頭排列")
-            scores -= 1
-
-        # Determine final signal
-        if scores >= 3:
-            action = "BUY"
-            confidence = "high"
-        elif scores >= 1:
-            action = "BUY"
-            confidence = "moderate"
-        elif scores <= -3:
-            action = "SELL"
-            confidence = "high"
-        elif scores <= -1:
-            action = "SELL"
-            confidence = "moderate"
-        else:
-            action = "HOLD"
-            confidence = "low"
-
-        return {
-            'action': action,
-            'confidence': confidence,
-            'reasoning': reasoning,
-            'price': current_price,
-            'score': scores
-        }
+        return signal_result(current_price, indicators)
 
     def _calculate_ranking_score(
         self,
@@ -507,6 +1220,83 @@ class StockAnalyzer:
             return (rsi * 0.6) + (macd_hist * 20 * 0.4)
 
 
+# Process-pool workers for compare(executor="process")
+
+_worker_analyzer: Optional[StockAnalyzer] = None
+
+
+def _init_process_worker(config: Dict) -> None:
+    """Build the per-process analyzer once (logging limited to warnings)"""
+    global _worker_analyzer
+    config = copy.deepcopy(config)
+    config.setdefault('logging', {})['level'] = 'WARNING'
+    config.setdefault('metrics', {})['export_path'] = None
+    _worker_analyzer = StockAnalyzer(config)
+
+
+def _run_in_worker(work: Any) -> Dict[str, Any]:
+    """
+    Run work(analyzer, failed) in a worker process and attach bookkeeping
+
+    Returns work's dict plus the chunk's failures, metrics summary and
+    cache counter deltas for _map_chunks() to merge.
+    """
+    analyzer = _worker_analyzer
+    analyzer.metrics.reset()
+    cache = analyzer.cache
+    before = cache.stats() if cache is not None else None
+
+    failed = []
+    part = work(analyzer, failed)
+
+    cache_counts = {}
+    if cache is not None:
+        after = cache.stats()
+        cache_counts = {key: after[key] - before[key] for key in ('hits', 'refreshes', 'misses')}
+
+    part.update({
+        'failed': failed,
+        'metrics': analyzer.metrics.summary(),
+        'cache': cache_counts
+    })
+    return part
+
+
+def _compare_chunk(
+    chunk: List[str],
+    rank_by: str,
+    indicators: List[str],
+    keep_analysis: bool
+) -> Dict[str, Any]:
+    """Fetch, analyze and score one chunk inside a worker process"""
+    payload_key = 'analysis' if keep_analysis else 'action'
+
+    def work(analyzer: StockAnalyzer, failed: List[Dict[str, str]]) -> Dict[str, Any]:
+        entries = list(analyzer.iter_compare(chunk, rank_by, indicators, keep_analysis, failed))
+        return {
+            'tickers': [entry['ticker'] for entry in entries],
+            'scores': np.array([entry['score'] for entry in entries], dtype=np.float64),
+            'latencies': np.array([entry['fetch_latency'] for entry in entries], dtype=np.float64),
+            'payloads': [entry[payload_key] for entry in entries]
+        }
+
+    return _run_in_worker(work)
+
+
+def _compare_chunk_records(
+    chunk: List[str],
+    rank_by: str,
+    indicators: List[str]
+) -> Dict[str, Any]:
+    """Compute one chunk's scored record array inside a worker process"""
+    def work(analyzer: StockAnalyzer, failed: List[Dict[str, str]]) -> Dict[str, Any]:
+        parts = list(analyzer._iter_records(chunk, rank_by, indicators, failed))
+        records = concat_records(parts)
+        return {'records': records}
+
+    return _run_in_worker(work)
+
+
 def main():
     """Demo usage of StockAnalyzer skill"""
     print("=" * 60)
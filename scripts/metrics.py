@@ -0,0 +1,265 @@
+"""
+Pipeline Metrics
+
+A small, dependency-free metrics registry used by StockAnalyzer to record
+per-stage latency histograms (fetch, indicators, signal, ranking, compare,
+report), per-ticker timings, counters (fetch failures / retries) and
+gauges (cache hit rates). Listeners can be attached as callbacks, and the
+collected data can be exported as a JSON summary or in the Prometheus text
+exposition format.
+
+Example Usage:
+    metrics = MetricsRegistry()
+    with metrics.timer('fetch', ticker='2330.TW'):
+        df = provider.fetch('2330.TW', '6mo')
+    metrics.incr('fetch.failures')
+    print(metrics.to_prometheus())
+"""
+
+from typing import List, Dict, Optional, Any, Callable, Iterator
+from contextlib import contextmanager
+import bisect
+import json
+import math
+import re
+import threading
+import time
+
+
+# Latency bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with count/sum/min/max"""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """Add the observations of another histogram's to_dict() output"""
+        previous = 0
+        for i, cumulative in enumerate(data['buckets'].values()):
+            self.counts[i] += cumulative - previous
+            previous = cumulative
+        self.count += data['count']
+        self.sum += data['sum']
+        if data['count']:
+            self.min = min(self.min, data['min'])
+            self.max = max(self.max, data['max'])
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'buckets': buckets
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of stage timings, counters and gauges
+
+    Stage latencies go into one Histogram per stage; when a ticker is
+    given, count/sum/max are also kept per (stage, ticker). Every
+    observation is forwarded to the registered listeners as
+    listener(stage, seconds, ticker).
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.listeners: List[Callable[[str, float, Optional[str]], None]] = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all recorded data (listeners are kept)"""
+        with self._lock:
+            self.stages: Dict[str, Histogram] = {}
+            self.tickers: Dict[str, Dict[str, List[float]]] = {}
+            self.counters: Dict[str, float] = {}
+            self.gauges: Dict[str, float] = {}
+
+    def add_listener(self, listener: Callable[[str, float, Optional[str]], None]) -> None:
+        """Register a callback invoked for every timing observation"""
+        self.listeners.append(listener)
+
+    @contextmanager
+    def timer(self, stage: str, ticker: Optional[str] = None) -> Iterator[None]:
+        """
+        Time a block of code as one observation of a stage
+
+        Args:
+            stage: Stage name (e.g., "fetch", "indicators")
+            ticker: Optional ticker the work belongs to
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, ticker)
+
+    def observe(self, stage: str, seconds: float, ticker: Optional[str] = None) -> None:
+        """Record one latency observation"""
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+            if ticker is not None:
+                stats = self.tickers.setdefault(stage, {}).get(ticker)
+                if stats is None:
+                    self.tickers[stage][ticker] = [1, seconds, seconds]
+                else:
+                    stats[0] += 1
+                    stats[1] += seconds
+                    stats[2] = max(stats[2], seconds)
+
+        for listener in self.listeners:
+            listener(stage, seconds, ticker)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Increase a counter (e.g., "fetch.failures")"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value (e.g., "cache.hit_rate")"""
+        with self._lock:
+            self.gauges[name] = value
+
+    def merge(self, summary: Dict[str, Any]) -> None:
+        """
+        Fold another registry's summary() into this one
+
+        Used to collect the metrics recorded inside worker processes.
+        Histograms and counters are added, gauges overwritten. Both
+        registries must use the same buckets.
+
+        Args:
+            summary: Output of MetricsRegistry.summary()
+        """
+        with self._lock:
+            for stage, data in summary.get('stages', {}).items():
+                histogram = self.stages.get(stage)
+                if histogram is None:
+                    histogram = self.stages[stage] = Histogram(self.buckets)
+                histogram.merge(data)
+
+            for stage, by_ticker in summary.get('tickers', {}).items():
+                for ticker, s in by_ticker.items():
+                    stats = self.tickers.setdefault(stage, {}).get(ticker)
+                    if stats is None:
+                        self.tickers[stage][ticker] = [s['count'], s['sum'], s['max']]
+                    else:
+                        stats[0] += s['count']
+                        stats[1] += s['sum']
+                        stats[2] = max(stats[2], s['max'])
+
+            for name, value in summary.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            self.gauges.update(summary.get('gauges', {}))
+
+    def summary(self, per_ticker: bool = True) -> Dict[str, Any]:
+        """
+        Snapshot of everything recorded so far
+
+        Args:
+            per_ticker: Include per-ticker timings
+
+        Returns:
+            Dict with 'stages' (histograms), 'counters', 'gauges' and,
+            optionally, 'tickers' ({stage: {ticker: {count, sum, max}}})
+        """
+        with self._lock:
+            result = {
+                'stages': {name: h.to_dict() for name, h in self.stages.items()},
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges)
+            }
+            if per_ticker:
+                result['tickers'] = {
+                    stage: {
+                        ticker: {'count': s[0], 'sum': s[1], 'max': s[2]}
+                        for ticker, s in by_ticker.items()
+                    }
+                    for stage, by_ticker in self.tickers.items()
+                }
+        return result
+
+    def to_json(self, per_ticker: bool = True) -> str:
+        """Export summary() as a JSON string"""
+        return json.dumps(self.summary(per_ticker), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = 'stock_analyzer') -> str:
+        """
+        Export in the Prometheus text exposition format
+
+        Stage histograms become <prefix>_stage_seconds{stage=...}, per-ticker
+        timings <prefix>_ticker_seconds_{sum,count}{stage=...,ticker=...},
+        counters <prefix>_<name>_total and gauges <prefix>_<name>.
+        """
+        summary = self.summary()
+        lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+        for stage, h in summary['stages'].items():
+            for bound, count in h['buckets'].items():
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {h["sum"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {h["count"]}')
+
+        if summary['tickers']:
+            lines.append(f"# TYPE {prefix}_ticker_seconds summary")
+            for stage, by_ticker in summary['tickers'].items():
+                for ticker, s in by_ticker.items():
+                    labels = f'stage="{stage}",ticker="{ticker}"'
+                    lines.append(f'{prefix}_ticker_seconds_sum{{{labels}}} {s["sum"]}')
+                    lines.append(f'{prefix}_ticker_seconds_count{{{labels}}} {s["count"]}')
+
+        for name, value in summary['counters'].items():
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        for name, value in summary['gauges'].items():
+            metric = f"{prefix}_{_metric_name(name)}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> str:
+        """
+        Write metrics to a file: Prometheus text for *.prom, JSON otherwise
+
+        Returns:
+            The path written
+        """
+        content = self.to_prometheus() if path.endswith('.prom') else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
@@ -0,0 +1,452 @@
+"""
+Real-time Monitoring Engine
+
+Backs StockAnalyzer.monitor(). Alert conditions are compiled once into
+predicates, stored in a registry indexed by ticker and by indicator, and
+evaluated by MonitorEngine as new bars arrive:
+
+    1. the bar updates the ticker's streaming indicator state (streaming.py)
+    2. only the indicators whose value changed are looked up in the index
+    3. only the alerts depending on those indicators are evaluated
+
+A tick therefore never scans alerts of other tickers or indicators.
+Alerts are edge-triggered: they fire when their condition turns true and
+re-arm once it turns false again.
+
+Condition syntax (case-insensitive, combine with "and" / "or"):
+    RSI < 30                      field <op> number   (<, <=, >, >=, ==)
+    PRICE > BB_UPPER              field <op> field
+    RSI crosses above 30          field crosses above|below number/field
+    MACD crossover                MACD histogram turns positive
+    MACD crossunder               MACD histogram turns negative
+
+Fields: PRICE (CLOSE), RSI, MACD, MACD_SIGNAL, MACD_HIST,
+        BB_UPPER, BB_MIDDLE, BB_LOWER
+
+Example Usage:
+    engine = MonitorEngine()
+    engine.add_alert("2330.TW", "RSI < 30 and MACD crossover")
+    engine.warm_up("2330.TW", df['Close'])
+    events = engine.on_bar("2330.TW", 598.0, "2025-01-02")
+"""
+
+from typing import List, Dict, Optional, Any, Callable, Iterable, Tuple, Set
+from collections import deque
+from datetime import datetime
+import heapq
+import itertools
+import logging
+import math
+import operator
+import re
+
+from streaming import TickerState, STATE_TYPES
+
+logger = logging.getLogger('stock_analyzer.monitor')
+
+PRICE = 'Price'
+
+# field name -> (indicator it depends on, getter on a TickerState)
+FIELDS: Dict[str, Tuple[str, Callable[[TickerState], float]]] = {
+    'PRICE': (PRICE, lambda s: s.last_close),
+    'CLOSE': (PRICE, lambda s: s.last_close),
+    'RSI': ('RSI', lambda s: s.states['RSI'].value),
+    'MACD': ('MACD', lambda s: s.states['MACD'].macd_line),
+    'MACD_SIGNAL': ('MACD', lambda s: _or_nan(s.states['MACD'].signal_line)),
+    'MACD_HIST': ('MACD', lambda s: s.states['MACD'].histogram),
+    'BB_UPPER': ('Bollinger', lambda s: s.states['Bollinger'].middle
+                 + s.states['Bollinger'].std_dev * s.states['Bollinger'].std),
+    'BB_MIDDLE': ('Bollinger', lambda s: s.states['Bollinger'].middle),
+    'BB_LOWER': ('Bollinger', lambda s: s.states['Bollinger'].middle
+                 - s.states['Bollinger'].std_dev * s.states['Bollinger'].std),
+}
+
+OPERATORS = {
+    '<=': operator.le,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '<': operator.lt,
+    '>': operator.gt,
+}
+
+_COMPARE_RE = re.compile(r'^(\w+)\s*(<=|>=|==|<|>)\s*(\S+)$')
+_CROSS_RE = re.compile(r'^(\w+)\s+crosses\s+(above|below)\s+(\S+)$')
+_MACD_CROSS = {
+    'macd crossover': 'above',
+    'macd golden cross': 'above',
+    'macd crossunder': 'below',
+    'macd death cross': 'below',
+}
+
+
+def _or_nan(value: Optional[float]) -> float:
+    return math.nan if value is None else value
+
+
+class Condition:
+    """
+    A compiled alert condition
+
+    Attributes:
+        text: Original condition string
+        fields: Field names the predicate reads
+        indicators: Indicators the predicate depends on
+    """
+
+    def __init__(
+        self,
+        text: str,
+        fields: Set[str],
+        predicate: Callable[[Dict[str, float], Dict[str, float]], bool]
+    ):
+        self.text = text
+        self.fields = fields
+        self.indicators = {FIELDS[f][0] for f in fields}
+        self._predicate = predicate
+
+    def evaluate(self, values: Dict[str, float], previous: Dict[str, float]) -> bool:
+        """
+        Args:
+            values: Current field values of the ticker
+            previous: Field values after the previous bar
+
+        Returns:
+            True if the condition holds (NaN inputs never match)
+        """
+        return bool(self._predicate(values, previous))
+
+    def __repr__(self) -> str:
+        return f"Condition({self.text!r})"
+
+
+def parse_condition(text: str) -> Condition:
+    """
+    Compile a condition string into a Condition
+
+    Args:
+        text: Condition such as "RSI < 30" or "MACD crossover and PRICE > 100"
+
+    Returns:
+        Condition object
+
+    Raises:
+        ValueError: If the condition cannot be parsed
+    """
+    fields: Set[str] = set()
+
+    def operand(token: str) -> Callable[[Dict[str, float]], float]:
+        name = token.upper()
+        if name in FIELDS:
+            fields.add(name)
+            return lambda values: values[name]
+        try:
+            number = float(token)
+        except ValueError:
+            raise ValueError(f"Unknown field in condition: {token}")
+        return lambda values: number
+
+    def clause(part: str) -> Callable[[Dict[str, float], Dict[str, float]], bool]:
+        lowered = ' '.join(part.lower().split())
+
+        if lowered in _MACD_CROSS:
+            part = f"MACD_HIST crosses {_MACD_CROSS[lowered]} 0"
+            lowered = part.lower()
+
+        match = _CROSS_RE.match(lowered)
+        if match:
+            left, direction, right = match.groups()
+            lhs, rhs = operand(left), operand(right)
+            if direction == 'above':
+                return lambda cur, prev: lhs(prev) <= rhs(prev) and lhs(cur) > rhs(cur)
+            return lambda cur, prev: lhs(prev) >= rhs(prev) and lhs(cur) < rhs(cur)
+
+        match = _COMPARE_RE.match(part.strip())
+        if match:
+            left, op, right = match.groups()
+            lhs, rhs, compare = operand(left), operand(right), OPERATORS[op]
+            return lambda cur, prev: compare(lhs(cur), rhs(cur))
+
+        raise ValueError(f"Cannot parse condition: {part.strip()}")
+
+    # "and" binds tighter than "or"
+    any_of = []
+    for or_part in re.split(r'\s+or\s+', text.strip(), flags=re.IGNORECASE):
+        all_of = [clause(p) for p in re.split(r'\s+and\s+', or_part, flags=re.IGNORECASE)]
+        any_of.append(all_of)
+
+    def predicate(cur: Dict[str, float], prev: Dict[str, float]) -> bool:
+        return any(all(c(cur, prev) for c in all_of) for all_of in any_of)
+
+    return Condition(text, fields, predicate)
+
+
+class Alert:
+    """A registered alert and its trigger bookkeeping"""
+
+    def __init__(self, alert_id: int, ticker: str, condition: Condition, action: str):
+        self.id = alert_id
+        self.ticker = ticker
+        self.condition = condition
+        self.action = action
+        self.created = datetime.now().isoformat()
+        self.armed = True
+        self.trigger_count = 0
+        self.last_triggered = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'alert_id': self.id,
+            'ticker': self.ticker,
+            'condition': self.condition.text,
+            'action': self.action,
+            'indicators': sorted(self.condition.indicators),
+            'status': 'active',
+            'created': self.created,
+            'trigger_count': self.trigger_count,
+            'last_triggered': self.last_triggered
+        }
+
+
+class AlertRegistry:
+    """
+    Active alerts indexed by ticker and by indicator
+
+    index[ticker][indicator] maps alert id -> Alert, so the alerts affected
+    by a change of one indicator of one ticker are a single lookup.
+    """
+
+    def __init__(self):
+        self.alerts: Dict[int, Alert] = {}
+        self.index: Dict[str, Dict[str, Dict[int, Alert]]] = {}
+        self._ids = itertools.count(1)
+
+    def add(self, ticker: str, condition: Condition, action: str = "notify") -> Alert:
+        """Register an alert and index it under each indicator it reads"""
+        alert = Alert(next(self._ids), ticker.upper(), condition, action)
+        self.alerts[alert.id] = alert
+        by_indicator = self.index.setdefault(alert.ticker, {})
+        for indicator in condition.indicators:
+            by_indicator.setdefault(indicator, {})[alert.id] = alert
+        return alert
+
+    def remove(self, alert_id: int) -> Optional[Alert]:
+        """Unregister an alert; returns it, or None if unknown"""
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None:
+            return None
+        by_indicator = self.index[alert.ticker]
+        for indicator in alert.condition.indicators:
+            by_indicator[indicator].pop(alert_id, None)
+            if not by_indicator[indicator]:
+                del by_indicator[indicator]
+        if not by_indicator:
+            del self.index[alert.ticker]
+        return alert
+
+    def affected(self, ticker: str, indicators: Iterable[str]) -> List[Alert]:
+        """Alerts of a ticker that read any of the given indicators"""
+        by_indicator = self.index.get(ticker, {})
+        seen = {}
+        for indicator in indicators:
+            seen.update(by_indicator.get(indicator, {}))
+        return list(seen.values())
+
+    def indicators_for(self, ticker: str) -> Set[str]:
+        """Indicators needed by the alerts of a ticker"""
+        return set(self.index.get(ticker, {})) - {PRICE}
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+
+class MonitorEngine:
+    """
+    Incremental alert evaluation over a stream of bars
+
+    Only tickers with at least one alert keep indicator state, and each
+    state only tracks the indicators its alerts need. Bars carrying a date
+    not later than the ticker's last processed date are ignored, so a
+    poller may safely re-deliver the latest bar.
+    """
+
+    def __init__(
+        self,
+        params: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_events: int = 1000
+    ):
+        """
+        Args:
+            params: Constructor arguments per indicator for streaming.py
+                    states, e.g. {'RSI': {'period': 14}}
+            max_events: Number of recent trigger events to keep
+        """
+        self.params = params or {}
+        self.registry = AlertRegistry()
+        self.states: Dict[str, TickerState] = {}
+        self.values: Dict[str, Dict[str, float]] = {}
+        self.events = deque(maxlen=max_events)
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            'notify': self._notify
+        }
+        self.evaluations = 0
+
+    def add_alert(self, ticker: str, condition: str, action: str = "notify") -> Alert:
+        """
+        Compile and register an alert
+
+        Args:
+            ticker: Stock symbol
+            condition: Condition string (see module docstring)
+            action: Handler name run when the alert fires
+
+        Returns:
+            Registered Alert
+
+        Raises:
+            ValueError: If the condition cannot be parsed
+        """
+        alert = self.registry.add(ticker, parse_condition(condition), action)
+        self._ensure_state(alert.ticker)
+        return alert
+
+    def remove_alert(self, alert_id: int) -> Optional[Alert]:
+        """Unregister an alert by id"""
+        return self.registry.remove(alert_id)
+
+    def warm_up(self, ticker: str, closes: Iterable[float]) -> None:
+        """
+        Rebuild a ticker's indicator state from historical closes
+
+        Args:
+            ticker: Stock symbol
+            closes: Close prices, oldest first (pandas Series or list)
+        """
+        ticker = ticker.upper()
+        state = TickerState.from_history(
+            closes, sorted(self.registry.indicators_for(ticker)), self.params
+        )
+        self.states[ticker] = state
+        self.values[ticker] = self._field_values(ticker)
+
+    def on_bar(
+        self,
+        ticker: str,
+        close: float,
+        date: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Process one new bar
+
+        Args:
+            ticker: Stock symbol
+            close: Close (or last trade) price
+            date: Bar date/time; stale or repeated bars are skipped
+
+        Returns:
+            Trigger events produced by this bar
+        """
+        ticker = ticker.upper()
+        state = self.states.get(ticker)
+        if state is None:
+            return []
+        if date is not None and state.last_date is not None and str(date) <= state.last_date:
+            return []
+
+        previous = self.values.get(ticker, {})
+        state.update(float(close), None if date is None else str(date))
+        current = self._field_values(ticker)
+        self.values[ticker] = current
+
+        changed = {
+            FIELDS[name][0] for name, value in current.items()
+            if not _same(value, previous.get(name, math.nan))
+        }
+
+        events = []
+        for alert in self.registry.affected(ticker, changed):
+            self.evaluations += 1
+            if alert.condition.evaluate(current, previous):
+                if alert.armed:
+                    alert.armed = False
+                    events.append(self._fire(alert, close, date))
+            else:
+                alert.armed = True
+        return events
+
+    def run(self, bars: Iterable[Tuple[str, str, float]]) -> List[Dict[str, Any]]:
+        """
+        Scheduler loop: feed a stream of (ticker, date, close) bars
+
+        The stream can be a live poller or a replay (see replay_frames).
+
+        Returns:
+            All trigger events, in order
+        """
+        events = []
+        for ticker, date, close in bars:
+            events.extend(self.on_bar(ticker, close, date))
+        return events
+
+    def _ensure_state(self, ticker: str) -> None:
+        needed = self.registry.indicators_for(ticker)
+        state = self.states.setdefault(ticker, TickerState([], self.params))
+        for name in needed - set(state.states):
+            # Added mid-stream: starts cold and warms up with later bars
+            state.states[name] = STATE_TYPES[name](**self.params.get(name, {}))
+        self.values[ticker] = self._field_values(ticker)
+
+    def _field_values(self, ticker: str) -> Dict[str, float]:
+        state = self.states[ticker]
+        available = set(state.states) | {PRICE}
+        values = {}
+        for name, (indicator, getter) in FIELDS.items():
+            if indicator in available:
+                values[name] = getter(state)
+        return values
+
+    def _fire(self, alert: Alert, close: float, date: Optional[str]) -> Dict[str, Any]:
+        alert.trigger_count += 1
+        alert.last_triggered = date or datetime.now().isoformat()
+        event = {
+            'alert_id': alert.id,
+            'ticker': alert.ticker,
+            'condition': alert.condition.text,
+            'action': alert.action,
+            'price': float(close),
+            'date': date
+        }
+        self.events.append(event)
+        handler = self.handlers.get(alert.action)
+        if handler is not None:
+            handler(event)
+        return event
+
+    @staticmethod
+    def _notify(event: Dict[str, Any]) -> None:
+        logger.warning(
+            "  [警示] %s %s @ %.2f (%s)",
+            event['ticker'], event['condition'], event['price'], event['date']
+        )
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (a != a and b != b)
+
+
+def replay_frames(frames: Dict[str, Any]) -> Iterable[Tuple[str, str, float]]:
+    """
+    Merge per-ticker OHLCV DataFrames into one chronological bar stream
+
+    Args:
+        frames: DataFrame with a 'Close' column keyed by ticker
+
+    Returns:
+        Iterator of (ticker, date, close) ordered by date, then ticker
+    """
+    def bars(ticker: str, df: Any) -> Iterable[Tuple[str, str, float]]:
+        for date, close in df['Close'].items():
+            yield str(date), ticker, float(close)
+
+    streams = [bars(ticker, df) for ticker, df in frames.items()]
+    for date, ticker, close in heapq.merge(*streams):
+        yield ticker, date, close
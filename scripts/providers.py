@@ -0,0 +1,418 @@
+"""
+Price Data Providers
+
+StockAnalyzer reads OHLCV history through a PriceProvider selected by
+config['data_source']. Besides the live Yahoo Finance backend, two offline
+backends are available so the analyzer can run (and be benchmarked
+repeatably) without network access:
+
+    - LocalDirectoryProvider: one CSV/Parquet file per ticker in a directory
+    - SyntheticProvider: deterministic random-walk prices per ticker
+
+Example Usage:
+    analyzer = StockAnalyzer({**config, 'data_source': 'synthetic'})
+    analyzer = StockAnalyzer({**config, 'data_source': {
+        'type': 'local', 'directory': 'data/prices'
+    }})
+"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Any, Union, Callable
+import os
+import zlib
+
+from lazy import lazy_import
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def period_start(period: str, end: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """
+    Translate a yfinance-style period into the first date it covers
+
+    Args:
+        period: Time period ("5d", "1mo", "6mo", "1y", "ytd", "max", ...)
+        end: Last date of the window
+
+    Returns:
+        First date of the window, or None for "max"
+    """
+    period = period.lower()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=end.year, month=1, day=1, tz=end.tz)
+
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return end - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+
+    raise ValueError(f"Unsupported period: {period}")
+
+
+class PriceProvider:
+    """
+    Interface for OHLCV price sources
+
+    Subclasses implement fetch() and return a DataFrame indexed by date with
+    at least a 'Close' column (Open/High/Low/Volume when available).
+    """
+
+    name = 'base'
+    # Whether results are worth persisting in the on-disk OHLCV cache
+    cacheable = False
+    # Whether requests go over the network (rate limited and retried)
+    remote = False
+
+    def fetch(
+        self,
+        ticker: str,
+        period: str,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Fetch price history for one ticker
+
+        Args:
+            ticker: Stock symbol (e.g., "2330.TW")
+            period: Time period ("1mo", "3mo", "6mo", "1y", "2y", "5y")
+            timeout: Request timeout in seconds, for network backends
+
+        Returns:
+            DataFrame with OHLCV data (empty if the ticker is unknown)
+        """
+        raise NotImplementedError
+
+    def fetch_since(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Fetch the bars dated on or after start (used for incremental refresh)
+
+        Args:
+            ticker: Stock symbol
+            start: First date to include
+            timeout: Request timeout in seconds, for network backends
+
+        Returns:
+            DataFrame with OHLCV data
+        """
+        raise NotImplementedError
+
+    def fetch_many(
+        self,
+        tickers: List[str],
+        period: str,
+        timeout: Optional[float] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch price history for several tickers in one request
+
+        Backends with a multi-ticker endpoint override this; the default
+        simply calls fetch() per ticker.
+
+        Args:
+            tickers: Stock symbols
+            period: Time period ("1mo", "3mo", "6mo", "1y", "2y", "5y")
+            timeout: Request timeout in seconds, for network backends
+
+        Returns:
+            DataFrame keyed by ticker (empty or missing for failed tickers)
+        """
+        return {ticker: self.fetch(ticker, period, timeout=timeout) for ticker in tickers}
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+def yf_download(tickers: List[str], period: str, timeout: Optional[float] = None) -> pd.DataFrame:
+    """Multi-ticker yf.download() grouped by ticker (the default bulk downloader)"""
+    import yfinance as yf
+
+    return yf.download(
+        tickers,
+        period=period,
+        group_by='ticker',
+        auto_adjust=True,
+        progress=False,
+        timeout=timeout or 10
+    )
+
+
+def split_download(raw: Optional[pd.DataFrame], tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Reshape a grouped multi-ticker download into per-ticker frames
+
+    Args:
+        raw: DataFrame with (ticker, field) MultiIndex columns, as returned
+             by yf.download(group_by='ticker'); single-level columns are
+             accepted when only one ticker was requested
+        tickers: Requested tickers
+
+    Returns:
+        DataFrame per ticker with the OHLCV columns and only the rows where
+        that ticker traded (tickers absent from the response are left out)
+    """
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+
+    if not isinstance(raw.columns, pd.MultiIndex):
+        raw = pd.concat({tickers[0]: raw}, axis=1) if len(tickers) == 1 else raw
+
+    available = set(raw.columns.get_level_values(0))
+    for ticker in tickers:
+        if ticker not in available:
+            continue
+        df = raw[ticker]
+        df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].dropna(how='all')
+        if not df.empty:
+            df.columns.name = None
+            frames[ticker] = df
+    return frames
+
+
+class YahooProvider(PriceProvider):
+    """
+    Live prices from Yahoo Finance via yfinance
+
+    fetch() uses one Ticker.history() call per ticker; fetch_many() issues
+    one grouped download for the whole batch. The bulk downloader can be
+    replaced (e.g., to point at a recorded stand-in in tests); it receives
+    (tickers, period, timeout) and returns a DataFrame shaped like
+    yf.download(group_by='ticker').
+    """
+
+    name = 'yahoo_finance'
+    cacheable = True
+    remote = True
+
+    def __init__(
+        self,
+        downloader: Optional[Callable[[List[str], str, Optional[float]], pd.DataFrame]] = None
+    ):
+        self.downloader = downloader or yf_download
+
+    def fetch(
+        self,
+        ticker: str,
+        period: str,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        return stock.history(period=period, timeout=timeout or 10)
+
+    def fetch_since(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        return stock.history(start=start.strftime('%Y-%m-%d'), timeout=timeout or 10)
+
+    def fetch_many(
+        self,
+        tickers: List[str],
+        period: str,
+        timeout: Optional[float] = None
+    ) -> Dict[str, pd.DataFrame]:
+        return split_download(self.downloader(list(tickers), period, timeout), list(tickers))
+
+
+class LocalDirectoryProvider(PriceProvider):
+    """
+    Prices read from a directory of per-ticker files
+
+    Each ticker is stored as "<ticker>.parquet" or "<ticker>.csv" with the
+    date as the first column. The period window is measured back from the
+    last row of the file, so results do not depend on the current date.
+    """
+
+    name = 'local'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path_for(self, ticker: str, ext: str = 'csv') -> str:
+        """Return the file path used for a ticker"""
+        return os.path.join(self.directory, f"{ticker}.{ext}")
+
+    def fetch(
+        self,
+        ticker: str,
+        period: str,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        parquet_path = self.path_for(ticker, 'parquet')
+        csv_path = self.path_for(ticker, 'csv')
+
+        if os.path.exists(parquet_path):
+            df = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        else:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        if df.empty:
+            return df
+
+        start = period_start(period, df.index[-1])
+        return df if start is None else df[df.index > start]
+
+    def fetch_since(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        df = self.fetch(ticker, 'max')
+        return df[df.index >= start]
+
+    def write(self, ticker: str, df: pd.DataFrame, fmt: str = 'csv') -> str:
+        """
+        Store a ticker's history in the directory (e.g., to build fixtures)
+
+        Args:
+            ticker: Stock symbol
+            df: DataFrame with OHLCV data indexed by date
+            fmt: "csv" or "parquet"
+
+        Returns:
+            Path of the written file
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(ticker, fmt)
+        if fmt == 'parquet':
+            df.to_parquet(path)
+        else:
+            df.to_csv(path)
+        return path
+
+    def __repr__(self) -> str:
+        return f"{self.name}:{self.directory}"
+
+
+class SyntheticProvider(PriceProvider):
+    """
+    Deterministic geometric random-walk prices
+
+    Every ticker gets its own random stream derived from (seed, ticker).
+    The walk always starts at a fixed origin date and runs forward, so a
+    longer period or a later end date extends the same series instead of
+    changing it, just like real history.
+    """
+
+    name = 'synthetic'
+
+    def __init__(
+        self,
+        seed: int = 0,
+        end: str = '2024-12-31',
+        origin: str = '2015-01-01',
+        volatility: float = 0.02,
+        drift: float = 0.0003
+    ):
+        self.seed = seed
+        self.end = pd.Timestamp(end)
+        self.origin = pd.Timestamp(origin)
+        self.volatility = volatility
+        self.drift = drift
+        self._calendar = {}
+
+    def fetch(
+        self,
+        ticker: str,
+        period: str,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        start = period_start(period, self.end)
+        df = self._generate(ticker)
+        return df if start is None else df[df.index > start]
+
+    def fetch_since(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        df = self._generate(ticker)
+        return df[df.index >= start]
+
+    def _generate(self, ticker: str) -> pd.DataFrame:
+        """Generate the business-day walk from self.origin through self.end"""
+        key = (self.origin, self.end)
+        if key not in self._calendar:
+            # bdate_range is slow; the calendar is shared by every ticker
+            self._calendar[key] = pd.bdate_range(self.origin, self.end)
+        index = self._calendar[key]
+
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode('utf-8'))])
+        first_price = 20 + 480 * rng.random()
+        draws = rng.standard_normal((len(index), 4))
+
+        returns = self.drift + self.volatility * draws[:, 0]
+        close = first_price * np.exp(np.cumsum(returns))
+
+        open_ = close * np.exp(-0.5 * self.volatility * draws[:, 1])
+        high = np.maximum(open_, close) * np.exp(0.5 * self.volatility * np.abs(draws[:, 2]))
+        low = np.minimum(open_, close) * np.exp(-0.5 * self.volatility * np.abs(draws[:, 3]))
+        volume = np.round(1_000_000 * np.exp(0.3 * draws[:, 1] * draws[:, 2]))
+
+        return pd.DataFrame(
+            {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+            index=index
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.name}(seed={self.seed})"
+
+
+PROVIDERS = {
+    'yahoo_finance': YahooProvider,
+    'yahoo': YahooProvider,
+    'local': LocalDirectoryProvider,
+    'synthetic': SyntheticProvider,
+}
+
+
+def create_provider(spec: Union[str, Dict[str, Any], PriceProvider]) -> PriceProvider:
+    """
+    Build a PriceProvider from config['data_source']
+
+    Args:
+        spec: Provider name ("yahoo_finance", "synthetic"), a dict with a
+              'type' key plus constructor arguments, or a PriceProvider
+
+    Returns:
+        PriceProvider instance
+
+    Example:
+        >>> create_provider({'type': 'local', 'directory': 'data/prices'})
+        local:data/prices
+    """
+    if isinstance(spec, PriceProvider):
+        return spec
+
+    if isinstance(spec, str):
+        spec = {'type': spec}
+
+    options = dict(spec)
+    provider_type = options.pop('type', None)
+    if provider_type not in PROVIDERS:
+        raise ValueError(f"Unknown data source: {provider_type}")
+
+    return PROVIDERS[provider_type](**options)
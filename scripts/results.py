@@ -0,0 +1,491 @@
+"""
+Compact Comparison Results
+
+compare(..., compact=True) returns its ranking as a CompareResults batch: a
+NumPy structured array with one fixed-width record per ticker (ticker,
+price, RSI, MACD line/signal/histogram, Bollinger bands, signal score,
+action, confidence, ranking score, rank, fetch latency) instead of one
+nested dict per ticker. Signals and ranking scores are computed for the
+whole batch with array operations; the Chinese interpretation strings and
+reasoning lists are only built when a record is converted back to the
+legacy dict format.
+
+Example Usage:
+    result = analyzer.compare(universe, compact=True)
+    batch = result['ranked_stocks']
+    print(batch['ticker'][:10], batch['score'][:10])
+    legacy = batch.to_dicts()            # same shape as compare()
+    batch.to_parquet('ranking.parquet')  # requires pyarrow
+    export_results(batch, 'docs/data')   # JSON / CSV / Parquet, partitioned by date
+    prune_partitions('docs/data', keep=30)
+"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Any, Iterator
+import functools
+import json
+import os
+import shutil
+
+from lazy import lazy_import
+from indicators import results_from_arrays, signal_result, signal_points, ranking_scores
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+
+# Record layout; the NumPy dtype is built on first use, see result_dtype().
+# The ticker field is sized to the longest ticker of a batch (at least
+# TICKER_WIDTH characters), so long symbols are never truncated
+TICKER_WIDTH = 16
+RESULT_FIELDS = [
+    ('ticker', f'U{TICKER_WIDTH}'),
+    ('price', 'f8'),
+    ('rsi', 'f8'),
+    ('macd_line', 'f8'),
+    ('macd_signal', 'f8'),
+    ('macd_hist', 'f8'),
+    ('macd_prev_hist', 'f8'),
+    ('bb_upper', 'f8'),
+    ('bb_middle', 'f8'),
+    ('bb_lower', 'f8'),
+    ('signal_score', 'i1'),
+    ('action', 'U4'),
+    ('confidence', 'U8'),
+    ('score', 'f8'),
+    ('rank', 'i4'),
+    ('fetch_latency', 'f8'),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def result_dtype(ticker_width: int = TICKER_WIDTH) -> np.dtype:
+    """
+    Structured dtype of the compact records (RESULT_DTYPE)
+
+    Args:
+        ticker_width: Characters of the ticker field (default TICKER_WIDTH)
+    """
+    width = max(ticker_width, TICKER_WIDTH)
+    return np.dtype([('ticker', f'U{width}')] + RESULT_FIELDS[1:])
+
+
+def _ticker_dtype(tickers: List[str]) -> np.dtype:
+    """Record dtype wide enough for every ticker in `tickers`"""
+    return result_dtype(max((len(ticker) for ticker in tickers), default=0))
+
+
+def __getattr__(name: str) -> Any:
+    # RESULT_DTYPE is resolved lazily so importing this module does not import numpy
+    if name == 'RESULT_DTYPE':
+        return result_dtype()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Version of the exported JSON / CSV / Parquet layout; bump when columns
+# are renamed, removed or change meaning (adding columns is compatible)
+EXPORT_SCHEMA_VERSION = 1
+EXPORT_FORMATS = ('json', 'csv', 'parquet')
+
+INDICATOR_FIELDS = {
+    'RSI': ('rsi',),
+    'MACD': ('macd_line', 'macd_signal', 'macd_hist', 'macd_prev_hist'),
+    'Bollinger': ('bb_upper', 'bb_middle', 'bb_lower'),
+}
+
+
+def score_records(records: np.ndarray, indicators: List[str], rank_by: str) -> None:
+    """
+    Fill signal_score, action, confidence and score for a batch in place
+
+    Uses the vectorized rules in indicators.py (signal_points(),
+    ranking_scores()), which match signal_result() and
+    StockAnalyzer._calculate_ranking_score().
+
+    Args:
+        records: RESULT_DTYPE array with the indicator columns filled
+        indicators: Indicators that were computed
+        rank_by: Ranking method ("momentum", "rsi", "composite")
+    """
+    rsi = records['rsi'] if "RSI" in indicators else None
+    hist = records['macd_hist'] if "MACD" in indicators else None
+    prev_hist = records['macd_prev_hist'] if "MACD" in indicators else None
+    if rsi is None and hist is None:
+        rsi = np.full(len(records), 50.0)
+
+    points = signal_points(rsi, hist, prev_hist) * np.ones(len(records), dtype=int)
+    records['signal_score'] = points
+    records['action'] = np.select([points >= 1, points <= -1], ['BUY', 'SELL'], default='HOLD')
+    records['confidence'] = np.select(
+        [np.abs(points) >= 3, np.abs(points) >= 1], ['high', 'moderate'], default='low'
+    )
+    records['score'] = ranking_scores(rank_by, rsi, hist, prev_hist)
+
+
+def build_records(
+    tickers: List[str],
+    arrays: Dict[str, np.ndarray],
+    latencies: Dict[str, float],
+    indicators: List[str],
+    rank_by: str
+) -> np.ndarray:
+    """
+    Assemble and score one chunk of records from panel_arrays() output
+
+    Args:
+        tickers: Tickers in panel column order
+        arrays: Output of indicators.panel_arrays()
+        latencies: Fetch latency keyed by upper-cased ticker
+        indicators: Indicators that were computed
+        rank_by: Ranking method
+
+    Returns:
+        RESULT_DTYPE array (rank not yet assigned)
+    """
+    dtype = _ticker_dtype(tickers)
+    records = np.zeros(len(tickers), dtype=dtype)
+    for name in dtype.names:
+        if dtype[name].kind == 'f':
+            records[name] = np.nan
+    records['ticker'] = [t.upper() for t in tickers]
+    records['fetch_latency'] = [latencies[t.upper()] for t in tickers]
+    for key, column in arrays.items():
+        if key in dtype.names:
+            records[key] = column
+    score_records(records, indicators, rank_by)
+    return records
+
+
+class CompareResults:
+    """
+    Ranked comparison results stored as one NumPy structured array
+
+    Indexing with a column name returns that column as an array, with an
+    integer or slice the records. Records are kept in rank order.
+    """
+
+    __slots__ = ('records', 'indicators', 'ranking_method', 'period', 'timestamp')
+
+    def __init__(
+        self,
+        records: np.ndarray,
+        indicators: List[str],
+        ranking_method: str,
+        period: str,
+        timestamp: str
+    ):
+        self.records = records
+        self.indicators = list(indicators)
+        self.ranking_method = ranking_method
+        self.period = period
+        self.timestamp = timestamp
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def __iter__(self) -> Iterator[np.void]:
+        return iter(self.records)
+
+    def __repr__(self) -> str:
+        return f"CompareResults({len(self)} tickers, ranked by {self.ranking_method})"
+
+    def columns(self) -> List[str]:
+        """Columns that carry data for the computed indicators"""
+        skip = {field for name, fields in INDICATOR_FIELDS.items()
+                if name not in self.indicators for field in fields}
+        return [name for name in result_dtype().names if name not in skip]
+
+    def analysis(self, i: int) -> Dict[str, Any]:
+        """
+        Rebuild the legacy analysis dict of the i-th record
+
+        This is where interpretation strings and signal reasoning are
+        produced, so only the records that are actually displayed pay for
+        them.
+        """
+        record = self.records[i:i + 1]
+        dtype = result_dtype()
+        arrays = {name: record[name] for name in dtype.names if dtype[name].kind == 'f'}
+        indicator_results = results_from_arrays(arrays, self.indicators, 0)
+        for name in self.indicators:
+            if name not in INDICATOR_FIELDS and 'error' in indicator_results[name]:
+                indicator_results[name] = {'error': f'{name} is not stored in compact results'}
+        price = float(record['price'][0])
+        return {
+            'ticker': str(record['ticker'][0]),
+            'current_price': price,
+            'indicators': indicator_results,
+            'signal': signal_result(price, indicator_results),
+            'timestamp': self.timestamp,
+            'period': self.period
+        }
+
+    def to_dicts(self, with_analysis: bool = True) -> List[Dict[str, Any]]:
+        """
+        Convert to the legacy compare()['ranked_stocks'] format
+
+        Args:
+            with_analysis: Include the full 'analysis' payload (otherwise
+                           only ticker, score, rank and action)
+
+        Returns:
+            List of dicts in rank order
+        """
+        entries = []
+        for i, record in enumerate(self.records):
+            entry = {'ticker': str(record['ticker']), 'score': float(record['score'])}
+            if with_analysis:
+                entry['analysis'] = self.analysis(i)
+            else:
+                entry['action'] = str(record['action'])
+            entry['rank'] = int(record['rank'])
+            entries.append(entry)
+        return entries
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the records as a DataFrame (one row per ticker)"""
+        return pd.DataFrame({name: self.records[name] for name in self.columns()})
+
+    def to_arrow(self):
+        """
+        Return the records as a pyarrow.Table
+
+        Batch metadata (indicators, ranking method, period, timestamp) is
+        stored in the schema metadata.
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        pa = _import_pyarrow()
+        table = pa.table({name: self.records[name] for name in self.columns()})
+        return table.replace_schema_metadata({
+            'schema_version': str(EXPORT_SCHEMA_VERSION),
+            'indicators': ','.join(self.indicators),
+            'ranking_method': self.ranking_method,
+            'period': self.period,
+            'timestamp': self.timestamp
+        })
+
+    def to_parquet(self, path: str) -> str:
+        """
+        Write the records to a Parquet file (requires pyarrow)
+
+        Returns:
+            The path written
+        """
+        table = self.to_arrow()
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+        return path
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """
+        Serialize the records as compact JSON
+
+        The document carries the schema version and batch metadata, a
+        'columns' list and one 'rows' array per ticker (NaN as null).
+
+        Args:
+            path: Also write the document to this file
+
+        Returns:
+            The JSON text
+        """
+        columns = self.columns()
+        values = []
+        for name in columns:
+            column = self.records[name].tolist()
+            if self.records.dtype[name].kind == 'f':
+                column = [None if value != value else value for value in column]
+            values.append(column)
+
+        text = json.dumps({
+            'schema_version': EXPORT_SCHEMA_VERSION,
+            'indicators': self.indicators,
+            'ranking_method': self.ranking_method,
+            'period': self.period,
+            'timestamp': self.timestamp,
+            'columns': columns,
+            'rows': [list(row) for row in zip(*values)]
+        }, ensure_ascii=False, separators=(',', ':'))
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+    @classmethod
+    def from_json(cls, text: str) -> 'CompareResults':
+        """Rebuild a batch from to_json() output"""
+        data = json.loads(text)
+        tickers = []
+        if 'ticker' in data['columns']:
+            position = data['columns'].index('ticker')
+            tickers = [row[position] for row in data['rows']]
+        dtype = _ticker_dtype(tickers)
+        records = np.zeros(len(data['rows']), dtype=dtype)
+        for name in dtype.names:
+            if dtype[name].kind == 'f':
+                records[name] = np.nan
+        for j, name in enumerate(data['columns']):
+            if name in dtype.names:
+                column = [row[j] for row in data['rows']]
+                if dtype[name].kind == 'f':
+                    column = [np.nan if value is None else value for value in column]
+                records[name] = column
+        return cls(records, data['indicators'], data['ranking_method'],
+                   data['period'], data['timestamp'])
+
+    def to_csv(self, path: str) -> str:
+        """
+        Write the records to a CSV file (one row per ticker, header row)
+
+        Returns:
+            The path written
+        """
+        self.to_frame().to_csv(path, index=False)
+        return path
+
+    @classmethod
+    def from_arrow(cls, table) -> 'CompareResults':
+        """Rebuild a batch from to_arrow() output or a Parquet file's table"""
+        meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        tickers = table.column('ticker').to_pylist() if 'ticker' in table.column_names else []
+        dtype = _ticker_dtype(tickers)
+        records = np.zeros(table.num_rows, dtype=dtype)
+        for name in dtype.names:
+            if name in table.column_names:
+                records[name] = table.column(name).to_numpy(zero_copy_only=False)
+            elif dtype[name].kind == 'f':
+                records[name] = np.nan
+        indicators = [name for name in meta.get('indicators', '').split(',') if name]
+        return cls(records, indicators, meta.get('ranking_method', ''),
+                   meta.get('period', ''), meta.get('timestamp', ''))
+
+
+def export_results(
+    batch: CompareResults,
+    directory: str,
+    date: Optional[str] = None,
+    formats: tuple = EXPORT_FORMATS
+) -> List[str]:
+    """
+    Write a ranking as machine-readable files with a daily history
+
+    Each format gets its own tree of Hive-style date partitions (so e.g.
+    the whole Parquet history reads as one dataset with pyarrow.dataset or
+    pd.read_parquet), and the files are copied to latest.<format> for
+    consumers that only want the newest run:
+
+        <directory>/schema.json
+        <directory>/latest.json|csv|parquet
+        <directory>/<format>/date=YYYY-MM-DD/ranking.<format>
+
+    schema.json records the schema version and the column names, which
+    CSV files cannot carry themselves.
+
+    Args:
+        batch: compare(..., compact=True)['ranked_stocks']
+        directory: Output root (e.g. "docs/data")
+        date: Partition date (default: the date of batch.timestamp)
+        formats: Any of "json", "csv", "parquet" (Parquet requires pyarrow)
+
+    Returns:
+        Paths written
+    """
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {sorted(unknown)} (expected {EXPORT_FORMATS})")
+
+    date = date or batch.timestamp[:10]
+    writers = {'json': batch.to_json, 'csv': batch.to_csv, 'parquet': batch.to_parquet}
+    paths = []
+    for fmt in formats:
+        partition = os.path.join(directory, fmt, f"date={date}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"ranking.{fmt}")
+        writers[fmt](path)
+        latest = os.path.join(directory, f"latest.{fmt}")
+        shutil.copyfile(path, latest)
+        paths += [path, latest]
+
+    schema_path = os.path.join(directory, 'schema.json')
+    dtype = result_dtype()
+    with open(schema_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'schema_version': EXPORT_SCHEMA_VERSION,
+            'partitioning': '<format>/date=YYYY-MM-DD',
+            'columns': {name: 'string' if dtype[name].kind == 'U' else dtype[name].name
+                        for name in batch.columns()}
+        }, f, indent=2)
+    paths.append(schema_path)
+    return paths
+
+
+def prune_partitions(directory: str, keep: int) -> List[str]:
+    """
+    Remove all but the newest `keep` date partitions of every export format
+
+    Args:
+        directory: Output root passed to export_results()
+        keep: Number of dates to keep per format (0 removes them all)
+
+    Returns:
+        Partition directories removed
+    """
+    removed = []
+    for fmt in EXPORT_FORMATS:
+        root = os.path.join(directory, fmt)
+        if not os.path.isdir(root):
+            continue
+        # date=YYYY-MM-DD sorts chronologically as a string
+        partitions = sorted(name for name in os.listdir(root) if name.startswith('date='))
+        for name in partitions[:max(len(partitions) - keep, 0)]:
+            path = os.path.join(root, name)
+            shutil.rmtree(path)
+            removed.append(path)
+    return removed
+
+
+def concat_records(parts: List[np.ndarray]) -> np.ndarray:
+    """Concatenate record batches (an empty RESULT_DTYPE array for none)"""
+    if not parts:
+        return np.zeros(0, dtype=result_dtype())
+    # Batches may have different ticker widths; widen to the largest
+    dtype = result_dtype(max(part.dtype['ticker'].itemsize // 4 for part in parts))
+    return np.concatenate([part.astype(dtype, copy=False) for part in parts])
+
+
+def rank_records(records: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Sort records by score (highest first, ties keep input order) and assign ranks
+
+    Args:
+        records: Scored RESULT_DTYPE array
+        top_k: Keep only the best N records
+
+    Returns:
+        New array in rank order
+    """
+    # NaN scores are ranked as -inf, i.e. last (ties keep input order);
+    # compare() ranks dict entries with the same key, see main._rank_key()
+    order = np.argsort(-np.nan_to_num(records['score'], nan=-np.inf), kind='stable')
+    if top_k is not None:
+        order = order[:max(0, top_k)]
+    ranked = records[order]
+    ranked['rank'] = np.arange(1, len(ranked) + 1)
+    return ranked
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Arrow/Parquet export requires pyarrow: pip install pyarrow"
+        ) from e
+    return pyarrow
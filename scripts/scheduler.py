@@ -0,0 +1,295 @@
+"""
+Fetch Scheduler
+
+Resilience layer for network price providers:
+
+    - TokenBucket: caps the request rate (with a configurable burst)
+    - CircuitBreaker: stops calling upstream after repeated errors and
+      probes again after a cool-down
+    - FetchScheduler: runs one request under the rate limit, retrying
+      failures with exponential backoff and full jitter until the per-call
+      failure budget (max_attempts) is spent
+    - ResilientProvider: PriceProvider wrapper that sends every upstream
+      request through a FetchScheduler
+
+StockAnalyzer places ResilientProvider directly around remote providers
+(beneath the OHLCV cache), so cache hits are never rate limited.
+
+Example Usage:
+    scheduler = FetchScheduler(rate=5, burst=10, max_attempts=4)
+    provider = ResilientProvider(YahooProvider(), scheduler)
+    df = provider.fetch('2330.TW', '6mo')
+"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Any, Callable
+import random
+import threading
+import time
+
+from lazy import lazy_import
+from providers import PriceProvider
+
+pd = lazy_import('pandas')
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling upstream while the circuit breaker is open"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` saved"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting until one is available
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After `threshold` upstream errors in a row the circuit opens and calls
+    fail fast for `reset_seconds`. Then one trial call is let through
+    (half-open) while the others keep failing fast: success closes the
+    circuit, failure keeps it open for another `reset_seconds`.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 10,
+        reset_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'"""
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> None:
+        """
+        Check that a call may go upstream
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half_open':
+                # Let this call through as the trial; restart the open
+                # period so concurrent callers keep failing fast meanwhile
+                self.opened_at = self.clock()
+                return
+        raise CircuitOpenError(
+            f"circuit open after {self.failures} consecutive upstream errors"
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = self.clock()
+
+
+class FetchScheduler:
+    """
+    Rate-limited, retrying executor for upstream requests
+
+    Every attempt takes a token from the bucket (when a rate is set) and
+    passes the circuit breaker. The n-th retry waits
+    uniform(0, min(backoff_max, backoff_base * 2 ** (n - 1))) seconds
+    ("full jitter", which spreads retries of concurrent workers apart)
+    until max_attempts attempts have been made.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        breaker_threshold: int = 10,
+        breaker_reset: float = 30.0,
+        on_retry: Optional[Callable[[], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            rate: Requests per second (None disables rate limiting)
+            burst: Token bucket capacity (default: max(1, rate))
+            max_attempts: Failure budget per call, including the first try
+            backoff_base: Backoff ceiling of the first retry in seconds
+            backoff_max: Upper bound of the backoff ceiling
+            breaker_threshold: Consecutive upstream errors that open the circuit
+            breaker_reset: Seconds before an open circuit lets a trial through
+            on_retry: Callback invoked before every retry (e.g., a counter)
+            clock: Monotonic clock, injectable for tests
+            sleep: Sleep function, injectable for tests
+            seed: Seed for the jitter random generator
+        """
+        self.bucket = TokenBucket(rate, burst, clock, sleep) if rate else None
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset, clock)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.on_retry = on_retry
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retry number `attempt` (1-based)"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        with self._lock:
+            return self._random.uniform(0, ceiling)
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        final_if: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Run fn() under the rate limit with retries
+
+        Args:
+            fn: The upstream request
+            final_if: Optional predicate on a successful result marking a
+                      final answer that says nothing about upstream health
+                      (e.g., an empty frame for an unknown or delisted
+                      ticker): it is returned without retrying and neither
+                      resets nor counts toward the circuit breaker
+
+        Returns:
+            fn()'s result
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            Exception: The last upstream error once the budget is spent
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                if self.on_retry is not None:
+                    self.on_retry()
+                self.sleep(self.backoff(attempt - 1))
+
+            self.breaker.allow()
+            if self.bucket is not None:
+                self.bucket.acquire()
+
+            try:
+                result = fn()
+            except Exception:
+                self.breaker.record_failure()
+                if attempt == self.max_attempts:
+                    raise
+                continue
+
+            if final_if is None or not final_if(result):
+                self.breaker.record_success()
+            return result
+
+
+class ResilientProvider(PriceProvider):
+    """
+    PriceProvider wrapper that sends every request through a FetchScheduler
+
+    Only raised errors are retried and count toward the circuit breaker.
+    An empty frame means an unknown or delisted ticker: it is returned as
+    a final result, so a few bad symbols in the universe cannot open the
+    circuit for all the valid ones.
+    """
+
+    def __init__(self, provider: PriceProvider, scheduler: FetchScheduler):
+        self.provider = provider
+        self.scheduler = scheduler
+        self.name = provider.name
+        self.cacheable = provider.cacheable
+        self.remote = provider.remote
+
+    def fetch(
+        self,
+        ticker: str,
+        period: str,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        return self.scheduler.call(
+            lambda: self.provider.fetch(ticker, period, timeout=timeout),
+            final_if=lambda df: df.empty
+        )
+
+    def fetch_since(
+        self,
+        ticker: str,
+        start: pd.Timestamp,
+        timeout: Optional[float] = None
+    ) -> pd.DataFrame:
+        return self.scheduler.call(
+            lambda: self.provider.fetch_since(ticker, start, timeout=timeout),
+            final_if=lambda df: df.empty
+        )
+
+    def fetch_many(
+        self,
+        tickers: List[str],
+        period: str,
+        timeout: Optional[float] = None
+    ) -> Dict[str, pd.DataFrame]:
+        return self.scheduler.call(
+            lambda: self.provider.fetch_many(tickers, period, timeout=timeout)
+        )
+
+    def __repr__(self) -> str:
+        return repr(self.provider)
@@ -0,0 +1,474 @@
+"""
+Streaming Indicator State
+
+Stateful versions of the RSI, MACD and Bollinger calculations in main.py.
+Each state object keeps only what the next bar needs (EMA values, rolling
+window contents and running sums), so update() costs O(1) per bar and
+gives the same values as the batch _calculate_* methods. The running sums
+of the rolling windows are recomputed from the window every `period` bars,
+so floating-point drift stays bounded by the rounding of one window's worth
+of add/remove steps however long the stream runs. States serialize
+to plain dicts, and a whole universe can be saved to / loaded from a JSON
+state file between runs.
+
+Example Usage:
+    state = TickerState.from_history(df['Close'])
+    state.update(612.0)                      # one new bar
+    print(state.results()['RSI']['value'])
+    save_states('.cache/state.json', {'2330.TW': state})
+"""
+
+from typing import List, Dict, Optional, Any, Iterable
+from collections import deque
+import json
+import math
+import os
+
+from indicators import RSI_METHODS, rsi_result, macd_result, bollinger_result
+
+
+class RSIState:
+    """
+    RSI over close-to-close moves: rolling means of the last `period` moves
+    (method "sma") or Wilder smoothing (method "wilder", same recursion as
+    indicators.wilder_rsi)
+    """
+
+    name = 'RSI'
+
+    def __init__(self, period: int = 14, method: str = 'sma'):
+        if method not in RSI_METHODS:
+            raise ValueError(f"Unknown RSI method: {method} (expected one of {RSI_METHODS})")
+        self.period = period
+        self.method = method
+        self.prev_close = None
+        self.gains = deque(maxlen=period)
+        self.losses = deque(maxlen=period)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        # Nonzero moves in the window, and bars since the last exact re-sum
+        self.gain_count = 0
+        self.loss_count = 0
+        self.updates = 0
+        # Wilder smoothing state
+        self.moves = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, close: float) -> float:
+        """Add one bar and return the current RSI (NaN until warmed up)"""
+        if self.method == 'wilder':
+            return self._update_wilder(close)
+
+        # The first bar has no previous close and counts as a zero move,
+        # matching delta.where(...) filling the leading NaN with 0
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+
+        if len(self.gains) == self.period:
+            self.gain_sum -= self.gains[0]
+            self.loss_sum -= self.losses[0]
+            self.gain_count -= self.gains[0] > 0
+            self.loss_count -= self.losses[0] > 0
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.gain_sum += gain
+        self.loss_sum += loss
+        self.gain_count += gain > 0
+        self.loss_count += loss > 0
+
+        self.updates += 1
+        if self.updates == self.period:
+            self.updates = 0
+            self.gain_sum = math.fsum(self.gains)
+            self.loss_sum = math.fsum(self.losses)
+        # A window without gains (losses) sums to exactly zero, not to the
+        # add/remove residue, so the RSI 0 / 100 edge cases stay exact
+        if not self.gain_count:
+            self.gain_sum = 0.0
+        if not self.loss_count:
+            self.loss_sum = 0.0
+
+        return self.value
+
+    def _update_wilder(self, close: float) -> float:
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            return self.value
+
+        delta = close - prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if self.moves < self.period:
+            # Seed with the plain mean of the first `period` moves
+            self.gain_sum += gain
+            self.loss_sum += loss
+            self.moves += 1
+            self.avg_gain = self.gain_sum / self.period
+            self.avg_loss = self.loss_sum / self.period
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.method == 'wilder':
+            if self.moves < self.period:
+                return math.nan
+            gain, loss = self.avg_gain, self.avg_loss
+        else:
+            if len(self.gains) < self.period:
+                return math.nan
+            gain = self.gain_sum / self.period
+            loss = self.loss_sum / self.period
+        if loss == 0:
+            return 100.0 if gain > 0 else math.nan
+        return 100 - (100 / (1 + gain / loss))
+
+    def result(self) -> Dict[str, Any]:
+        return rsi_result(self.value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': self.name,
+            'period': self.period,
+            'method': self.method,
+            'prev_close': self.prev_close,
+            'gains': list(self.gains),
+            'losses': list(self.losses),
+            'gain_sum': self.gain_sum,
+            'loss_sum': self.loss_sum,
+            'updates': self.updates,
+            'moves': self.moves,
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RSIState':
+        state = cls(data['period'], data.get('method', 'sma'))
+        state.prev_close = data['prev_close']
+        state.gains.extend(data['gains'])
+        state.losses.extend(data['losses'])
+        state.gain_sum = data['gain_sum']
+        state.loss_sum = data['loss_sum']
+        state.gain_count = sum(gain > 0 for gain in state.gains)
+        state.loss_count = sum(loss > 0 for loss in state.losses)
+        state.updates = data.get('updates', 0)
+        state.moves = data.get('moves', 0)
+        state.avg_gain = data.get('avg_gain', 0.0)
+        state.avg_loss = data.get('avg_loss', 0.0)
+        return state
+
+
+class MACDState:
+    """Recursive EMA(fast) - EMA(slow) with an EMA(signal) signal line"""
+
+    name = 'MACD'
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self.ema_fast = None
+        self.ema_slow = None
+        self.signal_line = None
+        self.histogram = math.nan
+        self.prev_histogram = math.nan
+        self.count = 0
+
+    @staticmethod
+    def _ema(prev: Optional[float], value: float, span: int) -> float:
+        # Same arithmetic as pandas ewm(span, adjust=False)
+        if prev is None:
+            return value
+        alpha = 2.0 / (span + 1)
+        return (1 - alpha) * prev + alpha * value
+
+    def update(self, close: float) -> float:
+        """Add one bar and return the current histogram"""
+        self.ema_fast = self._ema(self.ema_fast, close, self.fast)
+        self.ema_slow = self._ema(self.ema_slow, close, self.slow)
+        macd_line = self.ema_fast - self.ema_slow
+        self.signal_line = self._ema(self.signal_line, macd_line, self.signal)
+        self.prev_histogram = self.histogram
+        self.histogram = macd_line - self.signal_line
+        self.count += 1
+        return self.histogram
+
+    @property
+    def macd_line(self) -> float:
+        if self.ema_fast is None:
+            return math.nan
+        return self.ema_fast - self.ema_slow
+
+    def result(self) -> Dict[str, Any]:
+        if self.count < 2:
+            return {'error': 'Error calculating MACD: not enough data'}
+        return macd_result(self.macd_line, self.signal_line, self.histogram, self.prev_histogram)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': self.name,
+            'fast': self.fast,
+            'slow': self.slow,
+            'signal': self.signal,
+            'ema_fast': self.ema_fast,
+            'ema_slow': self.ema_slow,
+            'signal_line': self.signal_line,
+            'histogram': self.histogram,
+            'prev_histogram': self.prev_histogram,
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MACDState':
+        state = cls(data['fast'], data['slow'], data['signal'])
+        for key in ('ema_fast', 'ema_slow', 'signal_line', 'histogram', 'prev_histogram', 'count'):
+            setattr(state, key, data[key])
+        return state
+
+
+class BollingerState:
+    """Rolling mean / sample std over the last `period` closes"""
+
+    name = 'Bollinger'
+
+    def __init__(self, period: int = 20, std_dev: float = 2):
+        self.period = period
+        self.std_dev = std_dev
+        self.window = deque(maxlen=period)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    def update(self, close: float) -> float:
+        """Add one bar and return the current middle band"""
+        if len(self.window) < self.period:
+            # Welford growth phase
+            self.window.append(close)
+            delta = close - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (close - self.mean)
+        else:
+            # Sliding Welford update: replace the oldest value
+            oldest = self.window[0]
+            self.window.append(close)
+            old_mean = self.mean
+            self.mean += (close - oldest) / self.period
+            self.m2 += (close - oldest) * (close - self.mean + oldest - old_mean)
+            self.updates += 1
+            if self.updates == self.period:
+                # Exact two-pass recomputation once per window
+                self.updates = 0
+                self.mean = math.fsum(self.window) / self.period
+                self.m2 = math.fsum((value - self.mean) ** 2 for value in self.window)
+        return self.middle
+
+    @property
+    def middle(self) -> float:
+        return self.mean if len(self.window) == self.period else math.nan
+
+    @property
+    def std(self) -> float:
+        if len(self.window) < self.period:
+            return math.nan
+        # Between re-sums m2 is off by at most a few ulps of the window's
+        # squared deviations; a (nearly) constant window can leave it a hair
+        # below zero, which is zero variance
+        return math.sqrt(max(self.m2, 0.0) / (self.period - 1))
+
+    def result(self) -> Dict[str, Any]:
+        price = self.window[-1] if self.window else math.nan
+        band = self.std * self.std_dev
+        return bollinger_result(price, self.middle + band, self.middle, self.middle - band)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': self.name,
+            'period': self.period,
+            'std_dev': self.std_dev,
+            'window': list(self.window),
+            'mean': self.mean,
+            'm2': self.m2,
+            'updates': self.updates
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BollingerState':
+        state = cls(data['period'], data['std_dev'])
+        state.window.extend(data['window'])
+        state.mean = data['mean']
+        state.m2 = data['m2']
+        state.updates = data.get('updates', 0)
+        return state
+
+
+STATE_TYPES = {
+    'RSI': RSIState,
+    'MACD': MACDState,
+    'Bollinger': BollingerState,
+}
+
+# config['indicators'] parameter name -> state constructor argument
+CONFIG_KEYS = {
+    'RSI': {'period': 'period', 'method': 'method'},
+    'MACD': {'fast_period': 'fast', 'slow_period': 'slow', 'signal_period': 'signal'},
+    'Bollinger': {'period': 'period', 'std_dev': 'std_dev'},
+}
+
+
+def state_params(indicator_config: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Map config['indicators'] onto state constructor arguments
+
+    Args:
+        indicator_config: Parameters per indicator as in StockAnalyzer
+                          config, e.g. {'MACD': {'fast_period': 12}}
+
+    Returns:
+        Constructor arguments per streaming indicator, e.g.
+        {'MACD': {'fast': 12}}; parameters the states do not use
+        (thresholds, other indicators) are left out
+    """
+    params = {}
+    for name, keys in CONFIG_KEYS.items():
+        config = indicator_config.get(name, {})
+        params[name] = {arg: config[key] for key, arg in keys.items() if key in config}
+    return params
+
+
+class TickerState:
+    """
+    Streaming state of several indicators for one ticker
+
+    Holds one state object per indicator, feeds every new close to all of
+    them, and returns results in the same shape analyze() uses under
+    'indicators'.
+    """
+
+    def __init__(
+        self,
+        indicators: Optional[List[str]] = None,
+        params: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            indicators: Indicator names (default: ["RSI", "MACD"])
+            params: Optional constructor arguments per indicator, e.g.
+                    {'RSI': {'period': 14}}
+        """
+        indicators = ["RSI", "MACD"] if indicators is None else indicators
+        params = params or {}
+        self.states = {
+            name: STATE_TYPES[name](**params.get(name, {}))
+            for name in indicators
+        }
+        self.last_close = math.nan
+        self.last_date = None
+
+    @classmethod
+    def from_history(
+        cls,
+        closes: Iterable[float],
+        indicators: Optional[List[str]] = None,
+        params: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> 'TickerState':
+        """
+        Warm up a state from historical closes (one O(n) pass)
+
+        Args:
+            closes: Close prices, oldest first (a pandas Series also records
+                    its last index value as last_date)
+            indicators: Indicator names
+            params: Constructor arguments per indicator
+
+        Returns:
+            TickerState positioned after the last close
+        """
+        state = cls(indicators, params)
+        for close in closes:
+            state.update(float(close))
+        # A pandas Series has an index attribute (a list has an index() method)
+        index = getattr(closes, 'index', None)
+        if index is not None and not callable(index) and len(index):
+            state.last_date = str(index[-1])
+        return state
+
+    def update(self, close: float, date: Optional[str] = None) -> Dict[str, float]:
+        """
+        Feed one new bar to every indicator
+
+        Args:
+            close: Close price of the new bar
+            date: Optional bar date, stored for bookkeeping
+
+        Returns:
+            Dict of the primary value per indicator after the update
+        """
+        self.last_close = close
+        if date is not None:
+            self.last_date = date
+        return {name: state.update(close) for name, state in self.states.items()}
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """Return indicator result dicts shaped like analyze()['indicators']"""
+        return {name: state.result() for name, state in self.states.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'last_close': self.last_close,
+            'last_date': self.last_date,
+            'states': {name: state.to_dict() for name, state in self.states.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TickerState':
+        state = cls([])
+        state.states = {
+            name: STATE_TYPES[item['type']].from_dict(item)
+            for name, item in data['states'].items()
+        }
+        state.last_close = data['last_close']
+        state.last_date = data['last_date']
+        return state
+
+
+def save_states(path: str, states: Dict[str, TickerState]) -> None:
+    """
+    Persist per-ticker streaming states to a JSON file
+
+    Args:
+        path: Output file path
+        states: TickerState keyed by ticker
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({ticker: state.to_dict() for ticker, state in states.items()}, f)
+    os.replace(tmp_path, path)
+
+
+def load_states(path: str) -> Dict[str, TickerState]:
+    """
+    Load per-ticker streaming states written by save_states()
+
+    Args:
+        path: State file path
+
+    Returns:
+        TickerState keyed by ticker (empty if the file does not exist)
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    return {ticker: TickerState.from_dict(item) for ticker, item in data.items()}
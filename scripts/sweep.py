@@ -0,0 +1,119 @@
+"""
+Indicator Parameter Sweep
+
+Evaluates a grid of indicator parameter sets (RSI periods, MACD spans,
+Bollinger widths, ...) across a universe in one batched pass. The prices
+are fetched once and stacked into panels, and every parameter set is
+computed on the same indicators.SeriesGraph, so the building blocks that
+sets have in common (close diffs, gain/loss windows, EMAs of a span,
+rolling windows) are computed once for the whole sweep. Signals and
+ranking scores use the vectorized rules of results.py.
+
+Example Usage:
+    grid = {'RSI': {'period': [7, 14, 21]}, 'MACD': {'fast_period': [8, 12]}}
+    table = analyzer.sweep(GIFT_STOCKS, grid)['table']
+    print(table.groupby('set')['score'].mean())
+"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Any, Union
+import copy
+import itertools
+
+from lazy import lazy_import
+from indicators import SeriesGraph, panel_series
+from results import build_records, concat_records, rank_records
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+
+SWEEP_COLUMNS = ['ticker', 'price', 'rsi', 'macd_hist', 'signal_score', 'action',
+                 'confidence', 'score', 'rank']
+
+
+def parameter_grid(
+    grid: Union[Dict[str, Dict[str, List[Any]]], List[Dict[str, Dict[str, Any]]]]
+) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Expand a parameter grid into a list of parameter sets
+
+    Args:
+        grid: {indicator: {param: [values]}} (every combination is
+              produced), or an explicit list of {indicator: {param: value}}
+
+    Returns:
+        List of parameter sets shaped like config['indicators']
+
+    Example:
+        >>> parameter_grid({'RSI': {'period': [7, 14]}, 'MACD': {'fast_period': [12]}})
+        [{'RSI': {'period': 7}, 'MACD': {'fast_period': 12}},
+         {'RSI': {'period': 14}, 'MACD': {'fast_period': 12}}]
+    """
+    if isinstance(grid, list):
+        return [copy.deepcopy(params) for params in grid]
+
+    axes = [(name, param, list(values))
+            for name, params in grid.items() for param, values in params.items()]
+    sets = []
+    for combination in itertools.product(*(values for _, _, values in axes)):
+        params = {}
+        for (name, param, _), value in zip(axes, combination):
+            params.setdefault(name, {})[param] = value
+        sets.append(params)
+    return sets
+
+
+def sweep_panels(
+    panels: Dict[str, pd.DataFrame],
+    tickers: List[str],
+    param_sets: List[Dict[str, Dict[str, Any]]],
+    indicators: List[str],
+    rank_by: str = "momentum",
+    base_params: Optional[Dict[str, Dict[str, Any]]] = None,
+    latencies: Optional[Dict[str, float]] = None
+) -> pd.DataFrame:
+    """
+    Score every ticker of a set of price panels under each parameter set
+
+    Args:
+        panels: OHLCV panels, see indicators.ohlcv_panels()
+        tickers: Tickers in panel column order
+        param_sets: Parameter sets, see parameter_grid()
+        indicators: Indicators feeding the signal and ranking rules
+        rank_by: Ranking method ("momentum", "rsi", "composite")
+        base_params: Parameters of the indicators a set does not override
+                     (e.g. config['indicators'])
+        latencies: Fetch latency keyed by upper-cased ticker
+
+    Returns:
+        DataFrame with one row per (parameter set, ticker): 'set' (index
+        into param_sets), one '<indicator>.<param>' column per swept
+        parameter, then ticker, price, rsi, macd_hist, signal_score,
+        action, confidence, score and rank (within the set)
+    """
+    graph = SeriesGraph(panels)
+    latencies = latencies or {t.upper(): np.nan for t in tickers}
+    swept = list(dict.fromkeys((name, param) for params in param_sets
+                               for name, values in params.items() for param in values))
+
+    # Collect per-set records and build the table once at the end
+    parts = []
+    for overrides in param_sets:
+        params = copy.deepcopy(base_params or {})
+        for name, values in overrides.items():
+            params.setdefault(name, {}).update(values)
+
+        series = panel_series(panels, indicators, params, graph=graph)
+        arrays = {key: values[-1] for key, values in series.items()}
+        parts.append(rank_records(build_records(tickers, arrays, latencies, indicators, rank_by)))
+
+    records = concat_records(parts)
+    sets = np.repeat(np.arange(len(parts)), len(tickers))
+    columns = {'set': sets}
+    for name, param in swept:
+        values = [overrides.get(name, {}).get(param) for overrides in param_sets]
+        columns[f"{name}.{param}"] = np.asarray(values)[sets]
+    columns.update({column: records[column] for column in SWEEP_COLUMNS})
+    return pd.DataFrame(columns)
@@ -1,48 +1,408 @@
 """
 台股清單載入模組
-從 data/stocks.json 讀取股票清單
+從 data/stocks.json（以及 data/universes/*.json）讀取股票清單
+
+清單在第一次使用時才讀取並快取（import 本模組不會開檔），
+GIFT_STOCKS、STOCK_NAMES、TOP_20、TOP_10 透過模組層級 __getattr__ 延遲載入。
+GIFT_STOCKS 只含 data/stocks.json 的清單，STOCK_NAMES 則涵蓋所有股票池
+（含 data/universes/ 的自訂股票池）的名稱，報告中任何股票池的個股都查得到名稱。
+
+股票池（StockUniverse）：
+- 具名股票池：data/stocks.json 的清單為 GIFT，依市場（.TW → TWSE、
+  .TWO → TPEx，或個股的 market 欄位）自動分組，data/universes/ 下每個
+  JSON 檔是一個自訂股票池（例如全市場清單或自選股）
+- 個股可有 sector（產業）與 tags（標籤）欄位
+- 代碼前綴查詢（排序後二分搜尋）與名稱查詢（含中文，以字元索引縮小範圍）
+- 解析結果與索引以 JSON 快取在 .cache/universe.json（純資料，不會執行程式碼），
+  來源檔案未變動時直接載入，不重新解析、建立索引；數萬支股票也能即時查詢
 """
+import bisect
+import functools
+import glob
 import json
 import os
-from typing import List, Dict
+from array import array
+from typing import List, Dict, Optional, Any
 
 # 取得專案根目錄
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 STOCKS_JSON_PATH = os.path.join(ROOT_DIR, 'data', 'stocks.json')
+# 自訂股票池：每個 JSON 檔一個股票池，名稱為檔案的 name 欄位或檔名
+UNIVERSE_DIR = os.path.join(ROOT_DIR, 'data', 'universes')
+UNIVERSE_CACHE_PATH = os.path.join(ROOT_DIR, '.cache', 'universe.json')
+UNIVERSE_CACHE_VERSION = 2
 
+# data/stocks.json 的清單
+DEFAULT_UNIVERSE = 'GIFT'
+# 代碼後綴 -> 市場（個股沒有 market 欄位時使用）
+MARKET_SUFFIXES = {'.TW': 'TWSE', '.TWO': 'TPEx'}
 
-def load_stocks() -> tuple[List[str], Dict[str, str]]:
+
+class StockUniverse:
+    """
+    所有股票的基本資料、具名股票池與查詢索引
+
+    內部以欄位式狀態保存（代碼、名稱、產業編號、位置陣列與字元索引），
+    快取只存這份狀態，查詢用的 dict 在第一次使用時才展開。
+
+    Attributes:
+        tickers: 所有股票代碼（依首次出現的順序）
+        names: 代碼 -> 名稱（只列代碼的自選股沒有名稱）
+        sectors: 代碼 -> 產業
+        tags: 代碼 -> 標籤 tuple
+        universes: 股票池名稱 -> 代碼 tuple
+    """
+
+    def __init__(self, stocks: List[Dict[str, Any]], universes: Dict[str, List[str]]):
+        """
+        Args:
+            stocks: 個股資料 dict（ticker、name，選填 sector、tags、market），
+                    同一代碼出現多次時以後出現的非空欄位為準
+            universes: 股票池名稱 -> 代碼列表（依列表順序）
+        """
+        info = {}
+        for stock in stocks:
+            entry = info.setdefault(stock['ticker'], {})
+            entry.update({key: value for key, value in stock.items() if value})
+
+        tickers = list(info)
+        positions = {ticker: position for position, ticker in enumerate(tickers)}
+        names = [entry.get('name', '') for entry in info.values()]
+        sectors = list(dict.fromkeys(entry['sector'] for entry in info.values() if 'sector' in entry))
+        sector_ids = {sector: index for index, sector in enumerate(sectors)}
+
+        # 市場股票池接在同名的自訂股票池之後
+        members = {name: list(dict.fromkeys(tickers)) for name, tickers in universes.items()}
+        for ticker, entry in info.items():
+            market = entry.get('market') or _market(ticker)
+            if market:
+                members.setdefault(market, []).append(ticker)
+
+        chars = {}
+        for position, name in enumerate(names):
+            for char in set(name.casefold()):
+                chars.setdefault(char, []).append(position)
+
+        sector_ids = [sector_ids.get(entry.get('sector'), -1) for entry in info.values()]
+        tags = {positions[ticker]: tuple(entry['tags'])
+                for ticker, entry in info.items() if 'tags' in entry}
+        universes = {name: [positions[ticker] for ticker in dict.fromkeys(listed)]
+                     for name, listed in members.items()}
+        # 代碼前綴：依大寫代碼排序的位置；名稱：字元 -> 含有該字元的股票位置
+        code_order = sorted(range(len(tickers)), key=lambda position: tickers[position].upper())
+
+        self.__setstate__({
+            'tickers': tickers,
+            'names': names,
+            'sectors': sectors,
+            'sector_ids': array('i', sector_ids),
+            'tags': tags,
+            'universes': {name: array('I', listed) for name, listed in universes.items()},
+            'code_order': array('I', code_order),
+            'chars': {char: array('I', positions) for char, positions in chars.items()},
+        })
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self._state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self._state = state
+        self.tickers = state['tickers']
+
+    def to_json(self) -> Dict[str, Any]:
+        """欄位式狀態轉為 JSON 可表示的 dict（陣列轉為列表，位置鍵轉為字串）"""
+        state = self._state
+        return {
+            'tickers': state['tickers'],
+            'names': state['names'],
+            'sectors': state['sectors'],
+            'sector_ids': state['sector_ids'].tolist(),
+            'tags': {str(position): list(tags) for position, tags in state['tags'].items()},
+            'universes': {name: positions.tolist() for name, positions in state['universes'].items()},
+            'code_order': state['code_order'].tolist(),
+            'chars': {char: positions.tolist() for char, positions in state['chars'].items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'StockUniverse':
+        """由 to_json() 的輸出還原（不重新建立索引）"""
+        universe = cls.__new__(cls)
+        universe.__setstate__({
+            'tickers': list(data['tickers']),
+            'names': list(data['names']),
+            'sectors': list(data['sectors']),
+            'sector_ids': array('i', data['sector_ids']),
+            'tags': {int(position): tuple(tags) for position, tags in data['tags'].items()},
+            'universes': {name: array('I', positions) for name, positions in data['universes'].items()},
+            'code_order': array('I', data['code_order']),
+            'chars': {char: array('I', positions) for char, positions in data['chars'].items()},
+        })
+        return universe
+
+    # 查詢用的 dict 與列表在第一次使用時才由欄位式狀態展開，
+    # 從快取載入時只需還原狀態本身
+    @functools.cached_property
+    def names(self) -> Dict[str, str]:
+        return {ticker: name for ticker, name in zip(self.tickers, self._state['names']) if name}
+
+    @functools.cached_property
+    def sectors(self) -> Dict[str, str]:
+        labels = self._state['sectors']
+        return {ticker: labels[index] for ticker, index in zip(self.tickers, self._state['sector_ids'])
+                if index >= 0}
+
+    @functools.cached_property
+    def tags(self) -> Dict[str, tuple]:
+        return {self.tickers[position]: tags for position, tags in self._state['tags'].items()}
+
+    @functools.cached_property
+    def universes(self) -> Dict[str, tuple]:
+        return {name: tuple(map(self.tickers.__getitem__, positions))
+                for name, positions in self._state['universes'].items()}
+
+    @functools.cached_property
+    def _positions(self) -> Dict[str, int]:
+        return dict(zip(self.tickers, range(len(self.tickers))))
+
+    @functools.cached_property
+    def _codes(self) -> List[str]:
+        return [self.tickers[position].upper() for position in self._state['code_order']]
+
+    @functools.cached_property
+    def _folded(self) -> List[str]:
+        return [name.casefold() for name in self._state['names']]
+
+    @functools.cached_property
+    def _by_sector(self) -> Dict[str, List[str]]:
+        by_sector = {}
+        for ticker, sector in self.sectors.items():
+            by_sector.setdefault(sector, []).append(ticker)
+        return by_sector
+
+    @functools.cached_property
+    def _by_tag(self) -> Dict[str, List[str]]:
+        by_tag = {}
+        for ticker, tags in self.tags.items():
+            for tag in tags:
+                by_tag.setdefault(tag, []).append(ticker)
+        return by_tag
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._positions
+
+    def universe(self, name: str = DEFAULT_UNIVERSE) -> List[str]:
+        """取得具名股票池的代碼列表"""
+        if name not in self.universes:
+            raise ValueError(f"未知的股票池: {name}（可用: {', '.join(self.universes)}）")
+        return list(self.universes[name])
+
+    def by_sector(self, sector: str) -> List[str]:
+        """某產業的股票（依清單順序）"""
+        return list(self._by_sector.get(sector, ()))
+
+    def by_tag(self, tag: str) -> List[str]:
+        """有某標籤的股票（依清單順序）"""
+        return list(self._by_tag.get(tag, ()))
+
+    def info(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """個股資料：ticker、name、sector、tags 與所屬股票池；不存在時回傳 None"""
+        if ticker not in self._positions:
+            return None
+        return {
+            'ticker': ticker,
+            'name': self.names.get(ticker),
+            'sector': self.sectors.get(ticker),
+            'tags': list(self.tags.get(ticker, ())),
+            'universes': [name for name, tickers in self.universes.items() if ticker in tickers],
+        }
+
+    def match_prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """
+        代碼前綴查詢（不分大小寫），依代碼排序
+
+        Example:
+            >>> universe.match_prefix('23')
+            ['2303.TW', '2330.TW', ...]
+        """
+        prefix = prefix.upper()
+        order = self._state['code_order']
+        matches = []
+        for index in range(bisect.bisect_left(self._codes, prefix), len(self._codes)):
+            if not self._codes[index].startswith(prefix) or len(matches) == limit:
+                break
+            matches.append(self.tickers[order[index]])
+        return matches
+
+    def match_name(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        名稱查詢（包含 query 即符合，不分大小寫），依清單順序
+
+        Example:
+            >>> universe.match_name('積電')
+            ['2330.TW']
+        """
+        query = query.casefold()
+        if not query:
+            return []
+        # 只檢查含有 query 中最少見字元的股票
+        chars = self._state['chars']
+        candidates = min((chars.get(char, ()) for char in set(query)), key=len)
+        matches = []
+        for position in candidates:
+            if query in self._folded[position]:
+                matches.append(self.tickers[position])
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[str]:
+        """代碼前綴符合者在前，其後為名稱符合者"""
+        matches = dict.fromkeys(self.match_prefix(query.strip(), limit))
+        if len(matches) < limit:
+            matches.update(dict.fromkeys(self.match_name(query.strip(), limit + len(matches))))
+        return list(matches)[:limit]
+
+
+def _market(ticker: str) -> Optional[str]:
+    """依代碼後綴判斷市場（無法判斷時為 None）"""
+    for suffix, market in MARKET_SUFFIXES.items():
+        if ticker.upper().endswith(suffix):
+            return market
+    return None
+
+
+def universe_sources(stocks_path: str = STOCKS_JSON_PATH,
+                     universe_dir: Optional[str] = UNIVERSE_DIR) -> List[str]:
+    """股票池的來源檔案：stocks.json 與 universe_dir 下的 *.json（依檔名排序）"""
+    if not universe_dir:
+        return [stocks_path]
+    return [stocks_path] + sorted(glob.glob(os.path.join(universe_dir, '*.json')))
+
+
+def parse_universe(paths: List[str]) -> StockUniverse:
+    """
+    解析來源 JSON 檔案
+
+    第一個檔案為預設清單（股票池 GIFT）；其餘每個檔案為一個股票池，
+    可列出個股資料（stocks）或只列代碼（tickers，例如自選股）。
     """
-    從 JSON 檔案載入股票清單
+    stocks, universes = [], {}
+    for index, path in enumerate(paths):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data.get('stocks', []) + [{'ticker': ticker} for ticker in data.get('tickers', [])]
+        if index == 0:
+            name = DEFAULT_UNIVERSE
+        else:
+            name = data.get('name') or os.path.splitext(os.path.basename(path))[0]
+        stocks.extend(entries)
+        universes.setdefault(name, []).extend(entry['ticker'] for entry in entries)
+    return StockUniverse(stocks, universes)
+
+
+def load_universe(stocks_path: str = STOCKS_JSON_PATH, universe_dir: Optional[str] = UNIVERSE_DIR,
+                  cache_path: Optional[str] = UNIVERSE_CACHE_PATH) -> StockUniverse:
+    """
+    載入股票池，來源檔案未變動時直接讀取 JSON 快取
+
+    快取以各來源檔案的 (路徑, 修改時間, 大小) 判斷是否過期；快取只含資料
+    （不用 pickle），損壞或格式不符時重新解析來源。快取目錄無法寫入時只略過快取。
+
+    Args:
+        stocks_path: 預設清單（data/stocks.json）
+        universe_dir: 自訂股票池目錄；None 表示不讀取
+        cache_path: 快取檔路徑；None 表示不使用快取
 
     Returns:
-        tuple: (股票代碼列表, 股票名稱對照字典)
+        StockUniverse
+    """
+    paths = universe_sources(stocks_path, universe_dir)
+    # JSON 沒有 tuple，以列表比較
+    sources = [[os.path.abspath(path), stat.st_mtime_ns, stat.st_size]
+               for path, stat in ((path, os.stat(path)) for path in paths)]
+
+    if cache_path:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == UNIVERSE_CACHE_VERSION and cached.get('sources') == sources:
+                return StockUniverse.from_json(cached['state'])
+        except (OSError, ValueError, TypeError, AttributeError, KeyError, OverflowError):
+            pass
+
+    universe = parse_universe(paths)
+    if cache_path:
+        try:
+            os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                cached = {'version': UNIVERSE_CACHE_VERSION, 'sources': sources, 'state': universe.to_json()}
+                json.dump(cached, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return universe
+
+
+@functools.lru_cache(maxsize=None)
+def default_universe() -> StockUniverse:
+    """專案的股票池（只載入一次，之後使用快取）"""
+    return load_universe()
+
+
+@functools.lru_cache(maxsize=None)
+def load_stocks() -> tuple[List[str], Dict[str, str]]:
     """
-    with open(STOCKS_JSON_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    載入股票清單（只讀取一次，之後使用快取）
 
-    tickers = [stock['ticker'] for stock in data['stocks']]
-    names = {stock['ticker']: stock['name'] for stock in data['stocks']}
+    Returns:
+        tuple: (GIFT 股票池的代碼列表, 名稱對照字典)；名稱涵蓋所有股票池，
+               不只 GIFT（自訂股票池與上櫃股票也查得到名稱）
+    """
+    universe = default_universe()
+    return universe.universe(DEFAULT_UNIVERSE), universe.names
 
-    return tickers, names
 
+# 延遲載入的模組屬性（名稱 -> 取值函式）
+_LAZY_ATTRIBUTES = {
+    'GIFT_STOCKS': lambda: load_stocks()[0],
+    # 所有股票池的名稱（不只 GIFT_STOCKS）
+    'STOCK_NAMES': lambda: load_stocks()[1],
+    # 便利的子集
+    'TOP_20': lambda: load_stocks()[0][:20],
+    'TOP_10': lambda: load_stocks()[0][:10],
+}
 
-# 載入股票資料
-GIFT_STOCKS, STOCK_NAMES = load_stocks()
 
-# 便利的子集
-TOP_20 = GIFT_STOCKS[:20]
-TOP_10 = GIFT_STOCKS[:10]
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = _LAZY_ATTRIBUTES[name]()
+        globals()[name] = value  # 之後直接從模組字典取得
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_stock_name(ticker: str) -> str:
     """取得股票名稱"""
-    return STOCK_NAMES.get(ticker, "未知")
+    return load_stocks()[1].get(ticker, "未知")
 
 
 def get_stock_count() -> int:
     """取得股票總數"""
-    return len(GIFT_STOCKS)
+    return len(load_stocks()[0])
+
+
+def get_universe(name: str = DEFAULT_UNIVERSE) -> List[str]:
+    """取得具名股票池（GIFT、TWSE、TPEx 或 data/universes/ 的自訂股票池）"""
+    return default_universe().universe(name)
+
+
+def search_stocks(query: str, limit: int = 20) -> List[str]:
+    """以代碼前綴或名稱（含中文）查詢股票"""
+    return default_universe().search(query, limit)
 
 
 # 使用範例
@@ -54,12 +414,16 @@ if __name__ == "__main__":
     print(f"總股票數: {get_stock_count()} 支")
     print(f"資料狀態: 全部可用")
 
+    print(f"\n股票池:")
+    for name, tickers in default_universe().universes.items():
+        print(f"  {name:<12} {len(tickers)} 支")
+
     print(f"\n前 10 支股票:")
-    for i, ticker in enumerate(TOP_10, 1):
+    for i, ticker in enumerate(load_stocks()[0][:10], 1):
         print(f"  {i:2d}. {ticker:<12} {get_stock_name(ticker)}")
 
     print(f"\n使用範例:")
     print("  from stock_list import GIFT_STOCKS, STOCK_NAMES")
     print("  from stock_list import TOP_20, TOP_10")
-    print("  from stock_list import get_stock_name")
+    print("  from stock_list import get_stock_name, get_universe, search_stocks")
     print("\n" + "=" * 60)
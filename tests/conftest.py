@@ -0,0 +1,11 @@
+"""
+pytest 共用設定：讓測試可以直接 import scripts/ 與專案根目錄的模組
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (os.path.join(ROOT_DIR, 'scripts'), ROOT_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,83 @@
+"""
+回測測試：規則與 compare() 一致、沒有偷看未來資料、可從快取或本機目錄載入
+"""
+import numpy as np
+import pytest
+
+from backtest import load_closes, run_backtest, strategy_scores
+from cache import OHLCVCache
+from main import StockAnalyzer
+from providers import LocalDirectoryProvider, SyntheticProvider
+
+TICKERS = [f"{4000 + i}.TW" for i in range(30)]
+
+
+def synthetic_closes(period='2y'):
+    return load_closes(SyntheticProvider(), TICKERS, period)
+
+
+@pytest.mark.parametrize("rank_by", ["momentum", "rsi", "composite"])
+def test_last_day_matches_compare(rank_by):
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    result = StockAnalyzer(config).compare(TICKERS, rank_by=rank_by, indicators=["RSI", "MACD"])
+    closes = synthetic_closes('6mo')  # 與 compare() 相同的資料區間
+
+    scores = strategy_scores(closes, rank_by)[-1]
+    points = strategy_scores(closes, 'signal')[-1]
+
+    column = {t: j for j, t in enumerate(closes.columns)}
+    for stock in result['ranked_stocks']:
+        j = column[stock['ticker']]
+        assert scores[j] == pytest.approx(stock['score'])
+        action = stock['analysis']['signal']['action']
+        assert action == ('BUY' if points[j] >= 1 else 'SELL' if points[j] <= -1 else 'HOLD')
+
+
+@pytest.mark.parametrize("strategy", ["signal", "momentum"])
+def test_no_lookahead(strategy):
+    closes = synthetic_closes()
+    cutoff = closes.index[300]
+    changed = closes.copy()
+    changed.loc[changed.index > cutoff] *= np.linspace(0.5, 2.0, len(TICKERS))
+
+    original = run_backtest(closes, strategy, top_n=5)['returns']
+    perturbed = run_backtest(changed, strategy, top_n=5)['returns']
+
+    # 截止日（含）之前的報酬不受之後價格影響
+    np.testing.assert_allclose(original[:cutoff], perturbed[:cutoff])
+    assert not np.allclose(original[cutoff:], perturbed[cutoff:])
+
+
+def test_positions_turnover_and_costs():
+    closes = synthetic_closes()
+
+    free = run_backtest(closes, 'composite', top_n=5, rebalance=5)
+    costly = run_backtest(closes, 'composite', top_n=5, rebalance=5, cost_bps=10)
+
+    assert 4.5 < free['summary']['avg_positions'] <= 5  # 指標暖身期間空手
+    # 只在每 5 個交易日調整持股，其餘日子周轉為 0
+    turnover = free['turnover'].to_numpy()
+    assert (turnover[np.arange(len(turnover)) % 5 != 0] == 0).all()
+    np.testing.assert_allclose(free['returns'] - costly['returns'], free['turnover'] * 2 * 10 / 10000)
+    assert 0 <= free['summary']['hit_rate'] <= 1
+    assert free['summary']['days'] == len(closes) - 1
+
+
+def test_load_closes_from_cache_and_directory(tmp_path):
+    provider = SyntheticProvider()
+    cache = OHLCVCache(str(tmp_path / 'ohlcv'))
+    local = LocalDirectoryProvider(str(tmp_path / 'prices'))
+    for ticker in TICKERS[:3]:
+        df = provider.fetch(ticker, '1y')
+        cache.store(ticker, df, covers_from=df.index[0])
+        # 本機檔案少一個交易日，仍須依日期對齊
+        local.write(ticker, df.drop(df.index[100]) if ticker == TICKERS[0] else df)
+
+    from_cache = load_closes(str(tmp_path / 'ohlcv'))
+    from_directory = load_closes(str(tmp_path / 'prices'))
+
+    assert list(from_cache.columns) == TICKERS[:3]
+    assert from_cache.index.equals(from_directory.index)
+    np.testing.assert_allclose(from_directory.fillna(from_cache), from_cache)
+    assert from_directory[TICKERS[0]].isna().sum() == 1
@@ -0,0 +1,27 @@
+"""
+基準測試工具的冒煙測試：確保 benchmarks/bench_pipeline.py 可以執行並輸出可比較的結果
+"""
+import importlib.util
+import json
+import os
+
+from conftest import ROOT_DIR
+
+spec = importlib.util.spec_from_file_location(
+    'bench_pipeline', os.path.join(ROOT_DIR, 'benchmarks', 'bench_pipeline.py')
+)
+bench_pipeline = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_pipeline)
+
+
+def test_run_benchmarks_smoke():
+    report = bench_pipeline.run_benchmarks(sizes=[5], repeat=1)
+
+    stages = set(report['results'])
+    assert {'fetch.provider', 'indicator.rsi', 'indicator.macd', 'indicator.bollinger',
+            'signal.generate', 'ranking.momentum', 'compare.5', 'report.html_5'} <= stages
+    assert all(stats['median'] > 0 for stats in report['results'].values())
+    json.dumps(report)
+
+    rows = bench_pipeline.compare_results(report, report)
+    assert rows and not any(row['regression'] for row in rows)
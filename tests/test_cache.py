@@ -0,0 +1,110 @@
+"""
+OHLCV 快取測試：增量更新、命中統計與淘汰機制
+"""
+import os
+import time
+
+import pandas as pd
+
+from cache import CachedProvider, OHLCVCache
+from providers import SyntheticProvider
+
+
+class CountingProvider(SyntheticProvider):
+    """記錄上游實際回傳的 K 棒數量"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.full_fetches = 0
+        self.bars_fetched = 0
+
+    def fetch(self, ticker, period, timeout=None):
+        self.full_fetches += 1
+        df = super().fetch(ticker, period, timeout)
+        self.bars_fetched += len(df)
+        return df
+
+    def fetch_since(self, ticker, start, timeout=None):
+        df = super().fetch_since(ticker, start, timeout)
+        self.bars_fetched += len(df)
+        return df
+
+
+def test_hit_then_incremental_refresh(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    upstream = CountingProvider(end='2024-12-30')
+    provider = CachedProvider(upstream, cache, refresh_seconds=3600)
+
+    first = provider.fetch('2330.TW', '1y')
+    second = provider.fetch('2330.TW', '6mo')
+    assert upstream.full_fetches == 1
+    pd.testing.assert_frame_equal(second, first[first.index > pd.Timestamp('2024-06-30')],
+                                  check_freq=False, check_index_type=False)
+
+    # 隔一個交易日：只下載最後一根與新的一根
+    upstream.end = pd.Timestamp('2024-12-31')
+    upstream.bars_fetched = 0
+    provider.refresh_seconds = 0
+    refreshed = provider.fetch('2330.TW', '1y')
+
+    expected = SyntheticProvider(end='2024-12-31').fetch('2330.TW', '1y')
+    assert upstream.full_fetches == 1
+    assert upstream.bars_fetched == 2
+    assert refreshed.index[-1] == pd.Timestamp('2024-12-31')
+    assert refreshed['Close'].tolist() == expected['Close'].tolist()
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['refreshes'], stats['misses']) == (1, 1, 1)
+    assert stats['hit_rate'] == 2 / 3
+
+
+def test_longer_period_than_cached_is_a_miss(tmp_path):
+    upstream = CountingProvider()
+    provider = CachedProvider(upstream, OHLCVCache(str(tmp_path)))
+    provider.fetch('2330.TW', '6mo')
+    provider.fetch('2330.TW', '2y')
+    assert upstream.full_fetches == 2
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = OHLCVCache(str(tmp_path), ttl_seconds=60)
+    df = SyntheticProvider().fetch('1101.TW', '1y')
+    for ticker in ['1101.TW', '1102.TW', '1103.TW']:
+        cache.store(ticker, df, df.index[0])
+
+    stale = time.time() - 120
+    os.utime(cache.path_for('1101.TW'), (stale, stale))
+    assert cache.evict() == 1
+    assert cache.load('1101.TW') is None
+
+    # 1103 剛被讀取，空間不足時應先淘汰 1102
+    older = time.time() - 30
+    os.utime(cache.path_for('1102.TW'), (older, older))
+    cache.load('1103.TW')
+    cache.max_bytes = os.path.getsize(cache.path_for('1103.TW')) + 1
+    cache.evict()
+    assert cache.load('1102.TW') is None
+    assert cache.load('1103.TW') is not None
+
+
+def test_round_trip_preserves_timezone(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    df = SyntheticProvider().fetch('2330.TW', '1mo')
+    df.index = df.index.tz_localize('Asia/Taipei')
+    cache.store('2330.TW', df, df.index[0])
+
+    loaded, meta = cache.load('2330.TW')
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False, check_index_type=False)
+    assert meta['covers_from'] == df.index[0]
+
+
+def test_disk_cache_is_opt_in(tmp_path, monkeypatch):
+    from main import StockAnalyzer
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert StockAnalyzer().cache is None
+
+    # 未指定目錄時使用使用者快取目錄，不寫到目前工作目錄
+    config = StockAnalyzer()._default_config()
+    config['cache']['enabled'] = True
+    assert StockAnalyzer(config).cache.directory == str(tmp_path / 'stock-analyzer' / 'ohlcv')
@@ -0,0 +1,75 @@
+"""
+排名測試：top_k 部分排序、串流產出與精簡結果
+"""
+from main import StockAnalyzer
+
+TICKERS = [f"{5000 + i}.TW" for i in range(30)]
+
+
+def offline_analyzer(chunk_size=500):
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    config['fetch']['chunk_size'] = chunk_size
+    return StockAnalyzer(config)
+
+
+def test_top_k_matches_full_sort():
+    analyzer = offline_analyzer()
+    full = analyzer.compare(TICKERS, rank_by="momentum")
+    top = analyzer.compare(TICKERS, rank_by="momentum", top_k=5)
+
+    assert [(s['ticker'], s['score'], s['rank']) for s in top['ranked_stocks']] == \
+        [(s['ticker'], s['score'], s['rank']) for s in full['ranked_stocks'][:5]]
+    assert top['total_analyzed'] == len(TICKERS)
+    assert analyzer.compare(TICKERS, top_k=0)['ranked_stocks'] == []
+
+
+def test_top_k_ties_keep_input_order():
+    entries = [{'ticker': t, 'score': s} for t, s in
+               [('A', 1.0), ('B', 3.0), ('C', 1.0), ('D', 3.0), ('E', 2.0)]]
+    expected = sorted(entries, key=lambda x: x['score'], reverse=True)[:4]
+    assert StockAnalyzer._top_k(iter(entries), 4) == expected
+
+
+def test_iter_compare_streams_by_chunk():
+    analyzer = offline_analyzer(chunk_size=10)
+    fetched = []
+    original = analyzer._fetch_data
+
+    def counting_fetch(ticker, period, timeout=None):
+        fetched.append(ticker)
+        return original(ticker, period, timeout)
+
+    analyzer._fetch_data = counting_fetch
+    stream = analyzer.iter_compare(TICKERS, keep_analysis=False)
+    first = next(stream)
+
+    assert first['ticker'] == TICKERS[0]
+    assert len(fetched) == 10
+    assert set(first) == {'ticker', 'score', 'action', 'fetch_latency'}
+    assert len(list(stream)) == len(TICKERS) - 1
+
+
+def test_chunking_and_lightweight_results_keep_ranking():
+    full = offline_analyzer().compare(TICKERS)
+    light = offline_analyzer(chunk_size=7).compare(TICKERS, keep_analysis=False)
+
+    assert [s['ticker'] for s in light['ranked_stocks']] == \
+        [s['ticker'] for s in full['ranked_stocks']]
+    assert all('analysis' not in s for s in light['ranked_stocks'])
+    assert [s['action'] for s in light['ranked_stocks']] == \
+        [s['analysis']['signal']['action'] for s in full['ranked_stocks']]
+
+
+def test_process_executor_matches_thread_executor():
+    analyzer = offline_analyzer(chunk_size=4)
+    threaded = analyzer.compare(TICKERS, rank_by="composite")
+    processed = analyzer.compare(TICKERS, rank_by="composite", workers=2, executor="process")
+
+    assert [(s['ticker'], s['score'], s['rank']) for s in processed['ranked_stocks']] == \
+        [(s['ticker'], s['score'], s['rank']) for s in threaded['ranked_stocks']]
+    assert processed['ranked_stocks'][0]['analysis']['indicators'] == \
+        threaded['ranked_stocks'][0]['analysis']['indicators']
+    assert set(processed['fetch_latency']) == set(threaded['fetch_latency'])
+    # Metrics recorded in the workers are merged back
+    assert analyzer.metrics.summary()['stages']['fetch']['count'] == 2 * len(TICKERS)
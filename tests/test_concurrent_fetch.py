@@ -0,0 +1,87 @@
+"""
+並行下載測試：compare() 的並行抓取結果必須與逐支抓取一致
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from main import StockAnalyzer
+
+TICKERS = [f"{1000 + i}.TW" for i in range(12)]
+
+
+class FakeFetchAnalyzer(StockAnalyzer):
+    """以固定隨機走勢取代網路下載，並記錄同時進行的下載數"""
+
+    def __init__(self, config, delay=0.05):
+        super().__init__(config)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.hung = set()
+        self.release = threading.Event()
+
+    def _fetch_data(self, ticker, period, timeout=None):
+        if ticker in self.hung:
+            # 不理會 timeout 的上游呼叫
+            self.release.wait()
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            rng = np.random.default_rng(int(ticker.split('.')[0]))
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 120)))
+            index = pd.bdate_range('2024-01-01', periods=len(close))
+            return pd.DataFrame({'Close': close}, index=index)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def make_config(max_workers):
+    config = StockAnalyzer()._default_config()
+    config['fetch']['max_workers'] = max_workers
+    return config
+
+
+def test_concurrent_compare_matches_serial():
+    serial = FakeFetchAnalyzer(make_config(1)).compare(TICKERS)
+    concurrent = FakeFetchAnalyzer(make_config(6)).compare(TICKERS)
+
+    assert [s['ticker'] for s in concurrent['ranked_stocks']] == \
+        [s['ticker'] for s in serial['ranked_stocks']]
+    assert [s['score'] for s in concurrent['ranked_stocks']] == \
+        [s['score'] for s in serial['ranked_stocks']]
+
+
+def test_concurrency_is_bounded_and_latency_reported():
+    analyzer = FakeFetchAnalyzer(make_config(4))
+    start = time.perf_counter()
+    result = analyzer.compare(TICKERS)
+    elapsed = time.perf_counter() - start
+
+    assert analyzer.peak == 4
+    assert elapsed < len(TICKERS) * analyzer.delay
+    assert set(result['fetch_latency']) == set(TICKERS)
+    assert all(latency >= analyzer.delay for latency in result['fetch_latency'].values())
+
+
+def test_hung_fetch_is_abandoned_at_the_deadline():
+    config = make_config(4)
+    config['fetch']['deadline'] = 0.5
+    analyzer = FakeFetchAnalyzer(config, delay=0)
+    analyzer.hung = {TICKERS[3]}
+    start = time.perf_counter()
+    try:
+        result = analyzer.compare(TICKERS)
+    finally:
+        analyzer.release.set()
+
+    assert time.perf_counter() - start < 5
+    assert [f['ticker'] for f in result['failed']] == [TICKERS[3]]
+    assert '逾時' in result['failed'][0]['error']
+    assert len(result['ranked_stocks']) == len(TICKERS) - 1
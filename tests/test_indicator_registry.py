@@ -0,0 +1,133 @@
+"""
+指標註冊表測試：新指標與參考公式一致、設定參數生效、中間序列共用
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import StockAnalyzer
+from indicators import (SeriesGraph, compute_panel, ohlcv_panels, panel_series, required_inputs,
+                        wilder_rsi)
+from providers import SyntheticProvider
+from streaming import RSIState
+
+NEW_INDICATORS = ["SMA", "ATR", "KD", "OBV"]
+
+
+def offline_analyzer(indicator_config=None):
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    for name, params in (indicator_config or {}).items():
+        config['indicators'][name].update(params)
+    return StockAnalyzer(config)
+
+
+def test_new_indicators_match_reference_formulas():
+    df = SyntheticProvider().fetch('2330.TW', '6mo')
+    results = offline_analyzer().analyze('2330.TW', NEW_INDICATORS, period='6mo')['indicators']
+    close, high, low = df['Close'], df['High'], df['Low']
+
+    assert results['SMA']['value'] == pytest.approx(close.tail(20).mean())
+
+    true_range = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()],
+                           axis=1).max(axis=1)
+    assert results['ATR']['value'] == pytest.approx(
+        true_range.ewm(alpha=1 / 14, adjust=False).mean().iloc[-1])
+
+    rsv = (close - low.rolling(9).min()) / (high.rolling(9).max() - low.rolling(9).min()) * 100
+    k = rsv.ewm(alpha=1 / 3, adjust=False).mean()
+    assert results['KD']['k'] == pytest.approx(k.iloc[-1])
+    assert results['KD']['d'] == pytest.approx(k.ewm(alpha=1 / 3, adjust=False).mean().iloc[-1])
+
+    obv = (np.sign(close.diff()).fillna(0) * df['Volume']).cumsum()
+    assert results['OBV']['value'] == pytest.approx(obv.iloc[-1])
+    assert results['OBV']['signal'] == ('bullish' if obv.iloc[-1] > obv.tail(20).mean() else 'bearish')
+
+
+def test_config_parameters_are_used():
+    df = SyntheticProvider().fetch('2330.TW', '6mo')
+    analyzer = offline_analyzer({'RSI': {'period': 7}, 'Bollinger': {'std_dev': 3}})
+
+    results = analyzer.analyze('2330.TW', ["RSI", "Bollinger"], period='6mo')['indicators']
+
+    delta = df['Close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(7).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(7).mean()
+    assert results['RSI']['value'] == pytest.approx((100 - 100 / (1 + gain / loss)).iloc[-1])
+    width = results['Bollinger']['upper_band'] - results['Bollinger']['middle_band']
+    assert width == pytest.approx(3 * df['Close'].tail(20).std())
+
+
+def test_panel_matches_per_ticker_for_ohlcv_indicators():
+    analyzer = offline_analyzer()
+    provider = SyntheticProvider()
+    tickers = [f"{5000 + i}.TW" for i in range(6)]
+    frames = [provider.fetch(t, '6mo').iloc[i * 5:] for i, t in enumerate(tickers)]
+
+    panels = ohlcv_panels(tickers, frames, required_inputs(NEW_INDICATORS))
+    results = compute_panel(panels, NEW_INDICATORS, analyzer.config['indicators'])
+
+    for df, panel_result in zip(frames, results):
+        for name in NEW_INDICATORS:
+            assert panel_result[name] == pytest.approx(analyzer._calculate_indicator(name, df))
+
+    # 只有收盤價時，需要高低價的指標回報錯誤而非中斷
+    close_only = compute_panel(panels['Close'], ["ATR"])
+    assert close_only[0]['ATR'] == {'error': 'Error calculating ATR: requires High, Low, Close data'}
+
+
+def test_graph_shares_intermediates():
+    panel = ohlcv_panels(['2330.TW'], [SyntheticProvider().fetch('2330.TW', '1y')])['Close']
+    graph = SeriesGraph({'Close': panel})
+
+    panel_series(panel, ["RSI", "MACD", "Bollinger", "SMA"], graph=graph)
+    nodes = len(graph.nodes)
+    # 其他 MACD 慢線參數只需新增慢線 EMA、MACD 線與訊號線，快線 EMA 沿用
+    panel_series(panel, ["MACD", "SMA"], {'MACD': {'slow_period': 30}}, graph=graph)
+
+    assert ('mean', 'Close', 20) in graph.nodes  # SMA(20) 與布林通道共用
+    assert len(graph.nodes) == nodes + 3
+
+
+def reference_wilder_rsi(close, period):
+    """Wilder RSI 參考實作：前 period 筆漲跌幅平均作為起點，之後以 alpha=1/period 平滑"""
+    delta = close.diff().iloc[1:]
+    gain, loss = delta.clip(lower=0), (-delta).clip(lower=0)
+    seed = lambda s: pd.concat([pd.Series([s.iloc[:period].mean()], index=[s.index[period - 1]]),
+                                s.iloc[period:]])
+    avg_gain = seed(gain).ewm(alpha=1 / period, adjust=False).mean()
+    avg_loss = seed(loss).ewm(alpha=1 / period, adjust=False).mean()
+    return (100 - 100 / (1 + avg_gain / avg_loss)).reindex(close.index)
+
+
+def test_wilder_rsi_matches_reference_and_streaming():
+    close = SyntheticProvider().fetch('2330.TW', '1y')['Close']
+
+    values = wilder_rsi(close.to_numpy(), 14)
+    np.testing.assert_allclose(values, reference_wilder_rsi(close, 14).to_numpy(), equal_nan=True)
+    assert np.isnan(values[:14]).all() and not np.isnan(values[14:]).any()
+
+    state = RSIState(14, method='wilder')
+    streamed = [state.update(price) for price in close]
+    np.testing.assert_allclose(streamed, values, equal_nan=True)
+    restored = RSIState.from_dict(state.to_dict())
+    assert restored.update(600.0) == pytest.approx(state.update(600.0))
+
+
+def test_wilder_rsi_panel_matches_per_ticker():
+    provider = SyntheticProvider()
+    tickers = [f"{6000 + i}.TW" for i in range(12)]  # 寬面板走跨欄位向量化路徑
+    frames = [provider.fetch(t, '6mo').iloc[i * 3:] for i, t in enumerate(tickers)]
+    panel = ohlcv_panels(tickers, frames)['Close']
+
+    results = compute_panel(panel, ["RSI"], {'RSI': {'method': 'wilder'}})
+    analyzer = offline_analyzer({'RSI': {'method': 'wilder'}})
+    for df, panel_result in zip(frames, results):
+        assert panel_result['RSI']['value'] == pytest.approx(analyzer._calculate_rsi(df)['value'])
+
+    columns = wilder_rsi(panel.to_numpy(), 14)
+    for j in range(len(tickers)):
+        np.testing.assert_array_equal(columns[:, j], wilder_rsi(panel.iloc[:, j].to_numpy(), 14))
+
+    with pytest.raises(ValueError):
+        compute_panel(panel, ["RSI"], {'RSI': {'method': 'ema'}})
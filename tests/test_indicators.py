@@ -0,0 +1,147 @@
+"""
+指標引擎測試：向量化面板計算必須與逐支計算結果一致
+"""
+import numpy as np
+import pytest
+
+from main import StockAnalyzer
+from indicators import bollinger_result, close_panel, compute_panel, macd_result, rsi_result
+from providers import SyntheticProvider
+
+INDICATORS = ["RSI", "MACD", "Bollinger"]
+
+
+# 參考實作：直接以 pandas rolling/ewm 計算，與指標引擎互相獨立
+def reference_rsi(df, period=14):
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rsi = 100 - (100 / (1 + gain / loss))
+    return rsi_result(rsi.iloc[-1])
+
+
+def reference_macd(df, fast=12, slow=26, signal=9):
+    close = df['Close']
+    macd_line = close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean()
+    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    histogram = macd_line - signal_line
+    return macd_result(macd_line.iloc[-1], signal_line.iloc[-1], histogram.iloc[-1], histogram.iloc[-2])
+
+
+def reference_bollinger(df, period=20, std_dev=2):
+    close = df['Close']
+    middle = close.rolling(window=period).mean()
+    std = close.rolling(window=period).std()
+    return bollinger_result(close.iloc[-1], (middle + std * std_dev).iloc[-1], middle.iloc[-1],
+                            (middle - std * std_dev).iloc[-1])
+
+
+REFERENCE = {"RSI": reference_rsi, "MACD": reference_macd, "Bollinger": reference_bollinger}
+
+
+def assert_same_result(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value, rel=1e-12, nan_ok=True)
+        else:
+            assert actual[key] == value
+
+
+def offline_analyzer():
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    return StockAnalyzer(config)
+
+
+def test_panel_matches_per_ticker_calculation():
+    analyzer = offline_analyzer()
+    provider = SyntheticProvider()
+    tickers = [f"{3000 + i}.TW" for i in range(25)]
+    # 不同長度的歷史資料，驗證靠右對齊不影響結果
+    frames = [provider.fetch(t, '1y').iloc[i * 7:] for i, t in enumerate(tickers)]
+
+    results = compute_panel(close_panel(tickers, frames), INDICATORS)
+
+    for df, panel_result in zip(frames, results):
+        for name in INDICATORS:
+            expected = REFERENCE[name](df)
+            assert_same_result(panel_result[name], expected)
+            assert_same_result(analyzer._calculate_indicator(name, df), expected)
+
+
+def test_period_arguments_are_forwarded():
+    analyzer = offline_analyzer()
+    df = SyntheticProvider().fetch('2330.TW', '1y')
+
+    assert_same_result(analyzer._calculate_rsi(df, period=7), reference_rsi(df, period=7))
+    assert_same_result(analyzer._calculate_bollinger(df, period=10, std_dev=3),
+                       reference_bollinger(df, period=10, std_dev=3))
+    assert_same_result(analyzer._calculate_macd(df), reference_macd(df))
+
+
+def test_short_history_and_unknown_indicator():
+    provider = SyntheticProvider()
+    frames = [provider.fetch('1101.TW', '1mo').tail(5), provider.fetch('1102.TW', '6mo')]
+    results = compute_panel(close_panel(['1101.TW', '1102.TW'], frames), ["RSI", "KD"])
+
+    assert np.isnan(results[0]['RSI']['value'])
+    assert not np.isnan(results[1]['RSI']['value'])
+    # KD 已註冊，但只有收盤價面板時缺少 High/Low
+    assert results[1]['KD'] == {'error': 'Error calculating KD: requires High, Low, Close data'}
+
+    results = compute_panel(close_panel(['1102.TW'], frames[1:]), ["RSI", "Ichimoku"])
+    assert results[0]['Ichimoku'] == {'error': 'Unknown indicator: Ichimoku'}
+
+
+def test_bad_indicator_config_yields_error_entries():
+    analyzer = offline_analyzer()
+    analyzer.config['indicators']['RSI']['method'] = 'bogus'
+    tickers = [f"{5000 + i}.TW" for i in range(4)]
+
+    result = analyzer.compare(tickers, indicators=["RSI", "MACD"])
+
+    assert len(result['ranked_stocks']) == len(tickers)
+    for stock in result['ranked_stocks']:
+        indicators = stock['analysis']['indicators']
+        assert indicators['RSI']['error'].startswith('Error calculating RSI: Unknown RSI method: bogus')
+        assert 'error' not in indicators['MACD']
+
+
+def test_compare_matches_analyze():
+    analyzer = offline_analyzer()
+    tickers = [f"{4000 + i}.TW" for i in range(10)]
+    compared = analyzer.compare(tickers, indicators=INDICATORS)
+
+    for stock in compared['ranked_stocks']:
+        single = analyzer.analyze(stock['ticker'], INDICATORS, period="6mo")
+        assert stock['analysis']['indicators'] == single['indicators']
+        assert stock['analysis']['signal'] == single['signal']
+
+
+def test_return_series_matches_latest_values():
+    analyzer = offline_analyzer()
+
+    plain = analyzer.analyze("2330.TW", INDICATORS)
+    with_series = analyzer.analyze("2330.TW", INDICATORS, return_series=True)
+    frame = analyzer.indicator_frame("2330.TW")
+
+    series = with_series.pop('series')
+    for result in (plain, with_series):
+        result.pop('timestamp')
+    assert with_series['signal'] == plain['signal']
+    for name in INDICATORS:
+        for key, value in plain['indicators'][name].items():
+            if isinstance(value, float):
+                assert with_series['indicators'][name][key] == pytest.approx(value, rel=1e-12)
+            else:
+                assert with_series['indicators'][name][key] == value
+
+    assert list(frame.columns) == ['Close', 'RSI', 'MACD', 'MACD_signal', 'MACD_hist',
+                                   'BB_upper', 'BB_middle', 'BB_lower']
+    assert frame.index.equals(series.index)
+    np.testing.assert_allclose(series.to_numpy(), frame.to_numpy(), equal_nan=True)
+    # 暖身期間為 NaN，之後每一列都有值
+    assert frame['RSI'].isna().sum() == 13
+    assert frame['BB_middle'].isna().sum() == 19
+    assert frame['RSI'].iloc[-1] == pytest.approx(plain['indicators']['RSI']['value'])
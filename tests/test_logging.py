@@ -0,0 +1,45 @@
+"""
+日誌測試：預設輸出逐支進度，quiet 模式每次 compare() 只輸出一行摘要
+"""
+import logging
+
+from main import StockAnalyzer
+
+TICKERS = ["2330.TW", "2317.TW", "2454.TW"]
+
+
+def offline_analyzer(**logging_config):
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    config['logging'].update(logging_config)
+    return StockAnalyzer(config)
+
+
+def test_default_mode_keeps_progress_output(capsys):
+    offline_analyzer().compare(TICKERS)
+
+    out = capsys.readouterr().out
+    assert "[成功獲取" in out
+    assert "#1:" in out
+    assert out.count("[StockAnalyzer] compare:") == 1
+
+
+def test_quiet_mode_prints_one_summary_line(capsys):
+    analyzer = offline_analyzer(quiet=True)
+    capsys.readouterr()
+
+    analyzer.compare(TICKERS)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith("[StockAnalyzer] compare: 3 tickers ranked by momentum")
+
+
+def test_explicit_level_overrides_quiet(capsys):
+    analyzer = offline_analyzer(quiet=True, level="WARNING")
+    capsys.readouterr()
+
+    analyzer.compare(TICKERS)
+
+    assert capsys.readouterr().out == ""
+    assert logging.getLogger('stock_analyzer').level == logging.WARNING
@@ -0,0 +1,57 @@
+"""
+效能指標測試：直方圖、匯出格式與 compare() 各階段計時
+"""
+import json
+
+from main import StockAnalyzer
+from metrics import MetricsRegistry, Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        histogram.observe(value)
+
+    data = histogram.to_dict()
+    assert data['buckets'] == {'0.1': 1, '1.0': 3, '+Inf': 4}
+    assert data['count'] == 4
+    assert data['min'] == 0.05 and data['max'] == 2.0
+
+
+def test_registry_export_formats(tmp_path):
+    metrics = MetricsRegistry()
+    seen = []
+    metrics.add_listener(lambda stage, seconds, ticker: seen.append((stage, ticker)))
+
+    with metrics.timer('fetch', '2330.TW'):
+        pass
+    metrics.incr('fetch.failures')
+    metrics.set_gauge('cache.hit_rate', 0.5)
+
+    assert seen == [('fetch', '2330.TW')]
+    summary = metrics.summary()
+    assert summary['tickers']['fetch']['2330.TW']['count'] == 1
+    assert summary['counters'] == {'fetch.failures': 1}
+
+    text = metrics.to_prometheus()
+    assert 'stock_analyzer_stage_seconds_count{stage="fetch"} 1' in text
+    assert 'stock_analyzer_fetch_failures_total 1' in text
+    assert 'stock_analyzer_cache_hit_rate 0.5' in text
+
+    path = metrics.export(str(tmp_path / 'metrics.json'))
+    assert json.load(open(path, encoding='utf-8'))['gauges'] == {'cache.hit_rate': 0.5}
+
+
+def test_compare_records_stages(tmp_path):
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    config['metrics']['export_path'] = str(tmp_path / 'metrics.prom')
+    analyzer = StockAnalyzer(config)
+
+    result = analyzer.compare(["2330.TW", "2317.TW", "2454.TW"])
+
+    stages = result['metrics']['stages']
+    assert {'fetch', 'indicators.panel', 'signal', 'ranking', 'compare'} <= set(stages)
+    assert stages['fetch']['count'] == 3
+    assert set(analyzer.metrics.summary()['tickers']['signal']) == {"2330.TW", "2317.TW", "2454.TW"}
+    assert (tmp_path / 'metrics.prom').read_text().startswith('# TYPE')
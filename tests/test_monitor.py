@@ -0,0 +1,115 @@
+"""
+監控引擎測試：條件解析、索引式評估與本地 K 棒重播
+"""
+import pandas as pd
+import pytest
+
+from main import StockAnalyzer
+from monitor import MonitorEngine, parse_condition, replay_frames
+from providers import SyntheticProvider
+
+
+def batch_rsi(close, period=14):
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def fired_dates(condition, start):
+    """新的警示在 start 首次評估時即可觸發，之後只在條件由假轉真時觸發"""
+    condition = condition.fillna(False).astype(bool)
+    edges = condition & ~condition.shift(1, fill_value=False)
+    edges.iloc[start] = condition.iloc[start]
+    return [str(d) for d in edges.index[start:][edges.iloc[start:]]]
+
+
+def test_parse_condition():
+    condition = parse_condition("RSI < 30 and MACD crossover")
+    assert condition.indicators == {'RSI', 'MACD'}
+    assert condition.evaluate({'RSI': 25, 'MACD_HIST': 0.1}, {'RSI': 28, 'MACD_HIST': -0.1})
+    assert not condition.evaluate({'RSI': 25, 'MACD_HIST': 0.1}, {'RSI': 28, 'MACD_HIST': 0.2})
+
+    either = parse_condition("price > bb_upper or RSI crosses below 70")
+    assert either.indicators == {'Price', 'Bollinger', 'RSI'}
+    assert either.evaluate({'PRICE': 10, 'BB_UPPER': 11, 'RSI': 69}, {'RSI': 71})
+    assert not either.evaluate({'PRICE': 10, 'BB_UPPER': float('nan'), 'RSI': 72}, {'RSI': 71})
+
+    for bad in ("RSI <", "VOLUME > 3", "MACD sideways"):
+        with pytest.raises(ValueError):
+            parse_condition(bad)
+
+
+def test_replay_matches_batch_signals():
+    provider = SyntheticProvider(seed=11)
+    frames = {t: provider.fetch(t, '1y') for t in ['2330.TW', '2603.TW', '3481.TW']}
+    warm = 60
+
+    engine = MonitorEngine()
+    expected = []
+    for ticker, df in frames.items():
+        engine.add_alert(ticker, "RSI < 40")
+        engine.add_alert(ticker, "MACD crossover")
+        engine.warm_up(ticker, df['Close'].iloc[:warm])
+
+        rsi = batch_rsi(df['Close'])
+        expected += [(ticker, "RSI < 40", d) for d in fired_dates(rsi < 40, warm)]
+
+        macd = df['Close'].ewm(span=12, adjust=False).mean() - \
+            df['Close'].ewm(span=26, adjust=False).mean()
+        hist = macd - macd.ewm(span=9, adjust=False).mean()
+        cross = (hist > 0) & (hist.shift(1) <= 0)
+        expected += [(ticker, "MACD crossover", d) for d in fired_dates(cross, warm)]
+
+    replay = {t: df.iloc[warm:] for t, df in frames.items()}
+    events = engine.run(replay_frames(replay))
+
+    actual = [(e['ticker'], e['condition'], e['date']) for e in events]
+    assert sorted(actual) == sorted(expected)
+    assert [e['date'] for e in events] == sorted(e['date'] for e in events)
+
+
+def test_only_affected_alerts_are_evaluated():
+    engine = MonitorEngine()
+    for i in range(500):
+        engine.add_alert(f"{1000 + i}.TW", "RSI < 30")
+    engine.add_alert("2330.TW", "PRICE > 600")
+
+    engine.on_bar("2330.TW", 610.0, "2025-01-02")
+    assert engine.evaluations == 1
+    assert [e['condition'] for e in engine.events] == ["PRICE > 600"]
+
+    # 重複送出同一根 K 棒不會重複更新或觸發
+    assert engine.on_bar("2330.TW", 620.0, "2025-01-02") == []
+    assert engine.on_bar("9999.TW", 10.0, "2025-01-02") == []
+
+
+def test_analyzer_monitor_registers_alert():
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    analyzer = StockAnalyzer(config)
+
+    alert = analyzer.monitor("2330.TW", "RSI < 30", warmup_period="6mo")
+    assert alert['status'] == 'active'
+    assert alert['indicators'] == ['RSI']
+    assert len(analyzer.monitor_engine.registry) == 1
+    assert analyzer.monitor_engine.states['2330.TW'].states['RSI'].value == pytest.approx(
+        analyzer.analyze("2330.TW", ["RSI"], period="6mo")['indicators']['RSI']['value']
+    )
+
+
+def test_monitor_uses_configured_indicator_parameters():
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    config['indicators']['RSI'].update(period=7, method='wilder')
+    config['indicators']['MACD'].update(fast_period=5, slow_period=20, signal_period=4)
+    analyzer = StockAnalyzer(config)
+
+    analyzer.monitor("2330.TW", "RSI < 30 and MACD crossover", warmup_period="6mo")
+    states = analyzer.monitor_engine.states['2330.TW'].states
+    assert (states['RSI'].period, states['RSI'].method) == (7, 'wilder')
+    assert (states['MACD'].fast, states['MACD'].slow, states['MACD'].signal) == (5, 20, 4)
+
+    expected = analyzer.analyze("2330.TW", ["RSI", "MACD"], period="6mo")['indicators']
+    assert states['RSI'].value == pytest.approx(expected['RSI']['value'])
+    assert states['MACD'].histogram == pytest.approx(expected['MACD']['histogram'])
@@ -0,0 +1,212 @@
+"""
+HTML 報告測試：逐列輸出的內容、compact 結果、分頁、增量生成與互動表格
+"""
+import contextlib
+import copy
+import io
+import json
+import os
+import re
+
+import pytest
+
+from generate_report import data_export_due, generate_html_report, load_manifest, page_paths, table_data
+from main import StockAnalyzer
+
+TICKERS = [f"{3000 + i}.TW" for i in range(40)]
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    return StockAnalyzer(config)
+
+
+def render(result, path, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_html_report(result, str(path), **kwargs)
+    return path.read_text(encoding='utf-8')
+
+
+def column_rows(html, action):
+    """取出某一欄的 (名次, 代碼) 列"""
+    column = html.split(f'<!-- {action} 欄位 -->')[1].split('</tbody>')[0]
+    return re.findall(r'<td class="rank">(\d+)</td>\s*<td class="stock"><span class="ticker">([^<]+)</span>',
+                      column)
+
+
+def test_report_rows_follow_ranking(analyzer, tmp_path):
+    result = analyzer.compare(TICKERS, indicators=["RSI", "MACD"])
+    html = render(result, tmp_path / 'index.html')
+
+    for action in ("BUY", "SELL"):
+        expected = [s['ticker'].replace('.TW', '') for s in result['ranked_stocks']
+                    if s['analysis']['signal']['action'] == action]
+        rows = column_rows(html, action)
+        assert [ticker for _, ticker in rows] == expected
+        assert [int(rank) for rank, _ in rows] == list(range(1, len(expected) + 1))
+        assert f'{len(expected)} 支' in html
+    assert '<span class="name">未知</span>' in html  # 不在股票清單中
+    assert html.rstrip().endswith('</html>')
+
+
+def test_tickers_are_escaped(analyzer, tmp_path):
+    result = analyzer.compare(TICKERS[:10], indicators=["RSI", "MACD"])
+    stock = next(s for s in result['ranked_stocks'] if s['analysis']['signal']['action'] in ('BUY', 'SELL'))
+    stock['ticker'] = '<b>X&Y</b>.TW'
+
+    html = render(result, tmp_path / 'index.html')
+    assert '<span class="ticker">&lt;b&gt;X&amp;Y&lt;/b&gt;</span>' in html
+    assert '<b>X&Y</b>' not in html
+
+
+def test_compact_results_render_the_same_page(analyzer, tmp_path):
+    legacy = analyzer.compare(TICKERS, indicators=["RSI", "MACD"])
+    compact = analyzer.compare(TICKERS, indicators=["RSI", "MACD"], compact=True)
+
+    without_time = lambda html: re.sub(r'\d{4}-\d\d-\d\d \d\d:\d\d:\d\d', '', html)
+    assert without_time(render(compact, tmp_path / 'compact.html')) == \
+        without_time(render(legacy, tmp_path / 'legacy.html'))
+
+
+def test_pagination_splits_rows_across_files(analyzer, tmp_path):
+    result = analyzer.compare(TICKERS, indicators=["RSI", "MACD"])
+    single = render(result, tmp_path / 'all.html')
+    output = tmp_path / 'index.html'
+    render(result, output, page_size=4)
+
+    largest = max(len(column_rows(single, action)) for action in ("BUY", "SELL"))
+    paths = page_paths(str(output), -(-largest // 4))
+    assert paths[1] == str(tmp_path / 'index-2.html')
+    pages = [open(path, encoding='utf-8').read() for path in paths]
+    assert not (tmp_path / f'index-{len(paths) + 1}.html').exists()
+
+    for action in ("BUY", "SELL"):
+        paged = [column_rows(page, action) for page in pages]
+        assert all(len(rows) <= 4 for rows in paged)
+        # 名次在頁面間接續，合併後與單頁報告相同
+        assert sum(paged, []) == column_rows(single, action)
+    assert '<a href="index-2.html">2</a>' in pages[0]
+    assert '<span>2</span>' in pages[1]
+
+
+def test_manifest_skips_unchanged_pages(analyzer, tmp_path):
+    result = analyzer.compare(TICKERS, indicators=["RSI", "MACD"])
+    output, manifest = tmp_path / 'index.html', tmp_path / '.report-manifest.json'
+    generate = lambda res, **kwargs: render(res, output, manifest_path=str(manifest),
+                                            config=analyzer.config, **kwargs)
+
+    generate(result, page_size=4)
+    paths = page_paths(str(output), len(json.loads(manifest.read_text())['pages']))
+    assert len(paths) > 2
+    marker = '<!-- 未重新生成 -->'
+    for path in paths:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(marker)
+
+    # 輸入完全相同：不寫任何檔案
+    generate(copy.deepcopy(result), page_size=4)
+    assert all(open(path, encoding='utf-8').read().endswith(marker) for path in paths)
+
+    # 只有第 2 頁的一支股票價格變動：只重新生成第 2 頁
+    changed = copy.deepcopy(result)
+    buys = [s for s in changed['ranked_stocks'] if s['analysis']['signal']['action'] == 'BUY']
+    buys[4]['analysis']['current_price'] += 1
+    generate(changed, page_size=4)
+    rewritten = [not open(path, encoding='utf-8').read().endswith(marker) for path in paths]
+    assert rewritten == [i == 1 for i in range(len(paths))]
+
+    # 設定改變時全部重新生成；頁數變少時移除多出的舊頁面
+    generate(changed, page_size=100)
+    assert output.read_text(encoding='utf-8').rstrip().endswith('</html>')
+    assert [os.path.exists(path) for path in paths] == [True] + [False] * (len(paths) - 1)
+    assert len(json.loads(manifest.read_text())['tickers']) == len(TICKERS)
+
+
+def embedded_data(html):
+    """取出互動表格內嵌的欄位式資料"""
+    blob = re.search(r'<script type="application/json" id="report-data">(.*?)</script>', html, re.S)
+    return json.loads(blob.group(1))
+
+
+def test_table_layout_embeds_every_ticker(analyzer, tmp_path):
+    legacy = analyzer.compare(TICKERS, indicators=["RSI", "MACD"])
+    compact = analyzer.compare(TICKERS, indicators=["RSI", "MACD"], compact=True)
+    # 有一支 HOLD 也要出現在表格中（雙欄版面不列出 HOLD）
+    legacy['ranked_stocks'][3]['analysis']['signal']['action'] = 'HOLD'
+
+    page = render(legacy, tmp_path / 'table.html', layout='table')
+    data = embedded_data(page)
+    # 前端程式在 </body> 之前，頁面以 </html> 結束
+    assert page.rindex('<script>') < page.index('</body>')
+    assert page.rstrip().endswith('</html>')
+    assert data['ticker'] == [s['ticker'] for s in legacy['ranked_stocks']]
+    assert data['actions'][data['action'][3]] == 'HOLD'
+    assert data['price'][0] == round(legacy['ranked_stocks'][0]['analysis']['current_price'], 2)
+    assert data['name'][TICKERS.index('3000.TW')] == ''  # 不在股票清單中
+
+    # compact 結果的資料與 legacy 相同（HOLD 修改前）
+    assert table_data(compact['ranked_stocks'])['ticker'] == data['ticker']
+    assert table_data(compact['ranked_stocks'])['score'] == data['score']
+
+
+def test_table_layout_is_smaller_than_columns(analyzer, tmp_path):
+    result = analyzer.compare(TICKERS, indicators=["RSI", "MACD"], compact=True)
+    columns = render(result, tmp_path / 'columns.html')
+    table = render(result, tmp_path / 'table.html', layout='table')
+
+    assert '<tr>' in columns and '<tr>' not in table
+    # 每支股票只佔內嵌資料的一小段，而不是一整列 HTML
+    per_ticker = lambda html, base: (len(html) - len(base)) / len(TICKERS)
+    empty = analyzer.compare([], indicators=["RSI", "MACD"], compact=True)
+    assert per_ticker(table, render(empty, tmp_path / 't0.html', layout='table')) * 5 < \
+        per_ticker(columns, render(empty, tmp_path / 'c0.html'))
+
+    with pytest.raises(ValueError):
+        render(result, tmp_path / 'x.html', layout='cards')
+
+
+def test_manifest_directory_is_created(analyzer, tmp_path):
+    result = analyzer.compare(TICKERS[:5], indicators=["RSI", "MACD"])
+    manifest = tmp_path / 'state' / 'nested' / 'manifest.json'
+
+    render(result, tmp_path / 'index.html', manifest_path=str(manifest), config=analyzer.config)
+    assert json.loads(manifest.read_text())['pages']
+
+
+def test_data_export_follows_the_manifest(analyzer, tmp_path):
+    result = analyzer.compare(TICKERS[:5], indicators=["RSI", "MACD"])
+    output, manifest, data_dir = tmp_path / 'index.html', tmp_path / 'manifest.json', tmp_path / 'data'
+
+    def run(res):
+        previous = load_manifest(str(manifest))
+        render(res, output, manifest_path=str(manifest), config=analyzer.config)
+        return data_export_due(previous, str(manifest), str(data_dir))
+
+    assert run(result)
+    data_dir.mkdir()
+    (data_dir / 'latest.json').write_text('{}')
+    # 內容未變動：即使沒有當日分區（CI 不保留分區）也不重新輸出
+    assert not run(copy.deepcopy(result))
+    result['ranked_stocks'][0]['score'] += 1
+    assert run(result)
+
+
+def test_table_layout_uses_the_manifest(analyzer, tmp_path):
+    result = analyzer.compare(TICKERS, indicators=["RSI", "MACD"])
+    output, manifest = tmp_path / 'index.html', tmp_path / '.report-manifest.json'
+    generate = lambda res, **kwargs: render(res, output, manifest_path=str(manifest),
+                                            config=analyzer.config, **kwargs)
+
+    generate(result, page_size=4)
+    assert (tmp_path / 'index-2.html').exists()
+    # 改為表格版面：單頁（忽略 page_size），移除雙欄的分頁檔案
+    generate(result, page_size=4, layout='table')
+    assert not (tmp_path / 'index-2.html').exists()
+    assert len(json.loads(manifest.read_text())['pages']) == 1
+
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write('<!-- 未重新生成 -->')
+    generate(copy.deepcopy(result), layout='table')
+    assert output.read_text(encoding='utf-8').endswith('<!-- 未重新生成 -->')
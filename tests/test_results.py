@@ -0,0 +1,145 @@
+"""
+精簡結果測試：CompareResults 與原本 dict 格式一致，並可轉換為 Arrow/Parquet、JSON、CSV
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import StockAnalyzer
+from results import (EXPORT_SCHEMA_VERSION, CompareResults, export_results, prune_partitions, rank_records,
+                     result_dtype)
+
+TICKERS = [f"{3000 + i}.TW" for i in range(40)]
+
+
+def offline_analyzer():
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    config['fetch']['chunk_size'] = 16
+    return StockAnalyzer(config)
+
+
+def strip_timestamps(entries):
+    for entry in entries:
+        entry['analysis'].pop('timestamp', None)
+    return entries
+
+
+@pytest.mark.parametrize("rank_by", ["momentum", "rsi", "composite"])
+def test_compact_matches_legacy_ranking(rank_by):
+    analyzer = offline_analyzer()
+    indicators = ["RSI", "MACD", "Bollinger"]
+    legacy = analyzer.compare(TICKERS, rank_by=rank_by, indicators=indicators)
+    compact = analyzer.compare(TICKERS, rank_by=rank_by, indicators=indicators, compact=True)
+
+    batch = compact['ranked_stocks']
+    assert isinstance(batch, CompareResults)
+    assert list(batch['ticker']) == [s['ticker'] for s in legacy['ranked_stocks']]
+    np.testing.assert_allclose(batch['score'], [s['score'] for s in legacy['ranked_stocks']])
+    assert list(batch['action']) == \
+        [s['analysis']['signal']['action'] for s in legacy['ranked_stocks']]
+
+    # 轉回舊格式時才產生解讀文字，內容與原本完全相同
+    assert strip_timestamps(batch.to_dicts()) == strip_timestamps(legacy['ranked_stocks'])
+
+
+def test_compact_top_k_and_without_analysis():
+    analyzer = offline_analyzer()
+    full = analyzer.compare(TICKERS, compact=True)['ranked_stocks']
+    top = analyzer.compare(TICKERS, compact=True, top_k=5)['ranked_stocks']
+
+    assert list(top['ticker']) == list(full['ticker'][:5])
+    assert list(top['rank']) == [1, 2, 3, 4, 5]
+    assert top.to_dicts(with_analysis=False)[0] == {
+        'ticker': str(full['ticker'][0]),
+        'score': float(full['score'][0]),
+        'action': str(full['action'][0]),
+        'rank': 1
+    }
+
+
+def test_compact_process_executor():
+    analyzer = offline_analyzer()
+    threaded = analyzer.compare(TICKERS, compact=True)['ranked_stocks']
+    processed = analyzer.compare(TICKERS, compact=True, workers=2, executor="process")['ranked_stocks']
+
+    assert list(processed['ticker']) == list(threaded['ticker'])
+    np.testing.assert_array_equal(processed['score'], threaded['score'])
+
+
+def test_arrow_round_trip(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    batch = offline_analyzer().compare(TICKERS[:10], compact=True)['ranked_stocks']
+
+    path = batch.to_parquet(str(tmp_path / "ranking.parquet"))
+    import pyarrow.parquet as pq
+    restored = CompareResults.from_arrow(pq.read_table(path))
+
+    assert isinstance(batch.to_arrow(), pa.Table)
+    assert list(restored['ticker']) == list(batch['ticker'])
+    assert restored.indicators == ["RSI", "MACD"]
+    assert restored.to_dicts()[0]['analysis']['signal'] == batch.to_dicts()[0]['analysis']['signal']
+
+
+def test_json_round_trip_and_dated_exports(tmp_path):
+    batch = offline_analyzer().compare(TICKERS[:10], indicators=["RSI"], compact=True)['ranked_stocks']
+    batch.records['rsi'][3] = np.nan
+
+    restored = CompareResults.from_json(batch.to_json())
+    assert restored.columns() == batch.columns()
+    for name in batch.columns():
+        np.testing.assert_array_equal(restored[name], batch[name])
+    assert json.loads(batch.to_json())['rows'][3][batch.columns().index('rsi')] is None
+
+    paths = export_results(batch, str(tmp_path), date='2026-01-02', formats=('json', 'csv'))
+    assert os.listdir(tmp_path / 'csv' / 'date=2026-01-02') == ['ranking.csv']
+    assert os.listdir(tmp_path / 'json' / 'date=2026-01-02') == ['ranking.json']
+    assert str(tmp_path / 'latest.csv') in paths
+
+    frame = pd.read_csv(tmp_path / 'latest.csv')
+    assert list(frame.columns) == batch.columns()  # 未計算的 MACD / 布林欄位不輸出
+    np.testing.assert_allclose(frame['score'], batch['score'])
+    schema = json.loads((tmp_path / 'schema.json').read_text())
+    assert schema['schema_version'] == EXPORT_SCHEMA_VERSION
+    assert schema['columns']['ticker'] == 'string' and schema['columns']['rank'] == 'int32'
+
+    with pytest.raises(ValueError):
+        export_results(batch, str(tmp_path), formats=('xlsx',))
+
+
+def test_prune_keeps_the_newest_partitions(tmp_path):
+    batch = offline_analyzer().compare(TICKERS[:3], indicators=["RSI"], compact=True)['ranked_stocks']
+    for day in ('2026-01-05', '2026-01-02', '2026-01-06'):
+        export_results(batch, str(tmp_path), date=day, formats=('json', 'csv'))
+
+    removed = prune_partitions(str(tmp_path), keep=2)
+
+    assert sorted(removed) == [str(tmp_path / fmt / 'date=2026-01-02') for fmt in ('csv', 'json')]
+    assert sorted(os.listdir(tmp_path / 'json')) == ['date=2026-01-05', 'date=2026-01-06']
+    assert (tmp_path / 'latest.json').exists()
+
+
+def test_long_tickers_are_not_truncated():
+    # 代碼長度不同的 chunk（chunk_size 16）合併時取最寬的欄位
+    tickers = TICKERS[:20] + ["VERY-LONG-SYMBOL-NAME-0001.TWO", "ANOTHER-VERY-LONG-SYMBOL.TWO"]
+    batch = offline_analyzer().compare(tickers, indicators=["RSI"], compact=True)['ranked_stocks']
+
+    assert sorted(batch['ticker'].tolist()) == sorted(tickers)
+    assert sorted(entry['ticker'] for entry in batch.to_dicts()) == sorted(tickers)
+    assert sorted(CompareResults.from_json(batch.to_json())['ticker'].tolist()) == sorted(tickers)
+
+
+def test_nan_scores_rank_last_in_both_paths():
+    scores = [1.0, np.nan, 3.0, np.nan, 2.0]
+    records = np.zeros(len(scores), dtype=result_dtype())
+    records['ticker'] = ['A', 'B', 'C', 'D', 'E']
+    records['score'] = scores
+
+    expected = ['C', 'E', 'A', 'B', 'D']  # NaN 排最後，彼此維持輸入順序
+    assert rank_records(records)['ticker'].tolist() == expected
+    assert rank_records(records, top_k=4)['ticker'].tolist() == expected[:4]
+    entries = [{'ticker': ticker, 'score': score} for ticker, score in zip('ABCDE', scores)]
+    assert [e['ticker'] for e in StockAnalyzer._top_k(iter(entries), 4)] == expected[:4]
@@ -0,0 +1,131 @@
+"""
+抓取排程測試：限流、退避重試、斷路器，以及 compare() 回傳部分結果
+"""
+import pandas as pd
+import pytest
+
+from main import StockAnalyzer
+from providers import SyntheticProvider
+from scheduler import CircuitOpenError, FetchScheduler, TokenBucket
+
+
+class FakeClock:
+    """可手動推進的時鐘，sleep 只會推進時間"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_caps_rate_after_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert clock.now == pytest.approx(1.5)
+
+
+def test_retries_with_bounded_backoff_until_success():
+    clock = FakeClock()
+    retries = []
+    scheduler = FetchScheduler(max_attempts=3, backoff_base=1.0, on_retry=lambda: retries.append(1),
+                               clock=clock, sleep=clock.sleep, seed=1)
+    outcomes = iter([IOError("503"), IOError("503"), "ok"])
+
+    def flaky():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert scheduler.call(flaky) == "ok"
+    assert len(retries) == 2
+    assert 0 <= clock.now <= 1.0 + 2.0  # 第 1、2 次重試的上限分別為 1s、2s
+
+    def down():
+        raise IOError("down")
+
+    with pytest.raises(IOError):
+        scheduler.call(down)
+
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = FakeClock()
+    scheduler = FetchScheduler(max_attempts=1, breaker_threshold=3, breaker_reset=30,
+                               clock=clock, sleep=clock.sleep)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise IOError("upstream error")
+
+    for _ in range(3):
+        with pytest.raises(IOError):
+            scheduler.call(failing)
+    with pytest.raises(CircuitOpenError):
+        scheduler.call(failing)
+    assert len(calls) == 3  # 斷路時不再呼叫上游
+
+    clock.now += 30
+    assert scheduler.call(lambda: "ok") == "ok"  # 半開試探成功後恢復
+    assert scheduler.breaker.state == 'closed'
+
+
+class FlakyProvider(SyntheticProvider):
+    """模擬網路資料源：BAD.TW 永遠失敗，FLAKY.TW 第一次失敗，GONE* 回傳空資料"""
+
+    remote = True
+
+    def __init__(self):
+        super().__init__()
+        self.calls = {}
+
+    def fetch(self, ticker, period, timeout=None):
+        self.calls[ticker] = self.calls.get(ticker, 0) + 1
+        if ticker.startswith("GONE"):
+            return pd.DataFrame()  # 未知或已下市
+        if ticker == "BAD.TW" or (ticker == "FLAKY.TW" and self.calls[ticker] == 1):
+            raise ConnectionError(f"HTTP 503 for {ticker}")
+        return super().fetch(ticker, period, timeout)
+
+
+def test_compare_returns_partial_results_and_failures():
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = FlakyProvider()
+    config['fetch'].update({'backoff_base': 0.001, 'rate_per_second': None})
+    analyzer = StockAnalyzer(config)
+
+    result = analyzer.compare(["2330.TW", "BAD.TW", "FLAKY.TW", "2317.TW"])
+
+    assert {s['ticker'] for s in result['ranked_stocks']} == {"2330.TW", "FLAKY.TW", "2317.TW"}
+    assert [f['ticker'] for f in result['failed']] == ["BAD.TW"]
+    assert "503" in result['failed'][0]['error']
+    assert result['total_analyzed'] == 3
+    # FLAKY.TW 重試 1 次，BAD.TW 用完 3 次額度（重試 2 次）
+    assert result['metrics']['counters']['fetch.retries'] == 3
+
+
+def test_unknown_tickers_do_not_trip_the_breaker():
+    config = StockAnalyzer()._default_config()
+    provider = FlakyProvider()
+    config['data_source'] = provider
+    config['fetch'].update({'backoff_base': 0.001, 'rate_per_second': None,
+                            'breaker_threshold': 2, 'max_workers': 1})
+    analyzer = StockAnalyzer(config)
+
+    gone = [f"GONE{i}.TW" for i in range(5)]
+    result = analyzer.compare(gone + ["2330.TW", "2317.TW"])
+
+    # 空資料不重試、不計入斷路器：有效股票照常下載
+    assert {s['ticker'] for s in result['ranked_stocks']} == {"2330.TW", "2317.TW"}
+    assert [f['ticker'] for f in result['failed']] == gone
+    assert all(provider.calls[ticker] == 1 for ticker in gone)
+    assert analyzer.scheduler.breaker.state == 'closed'
+    assert analyzer.scheduler.breaker.failures == 0
@@ -0,0 +1,70 @@
+"""
+啟動時間測試：import 入口模組時不載入 pandas / numpy / yfinance，也不讀取股票清單
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'yfinance', 'numba')
+
+
+def import_times(statement):
+    """以 python -X importtime 執行，回傳 {模組: 累計微秒}"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(ROOT_DIR, 'scripts'), ROOT_DIR]))
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                               cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times, completed.stdout
+
+
+@pytest.mark.parametrize("module", ["main", "generate_report", "stock_list"])
+def test_entry_points_defer_heavy_imports(module):
+    times, _ = import_times(f"import {module}")
+
+    assert module in times
+    assert not [name for name in times if name.split('.')[0] in HEAVY_MODULES]
+
+
+def test_main_imports_only_stdlib_and_project_modules():
+    # 以載入的模組集合判斷，不量測牆鐘時間
+    _, output = import_times(
+        "import sys\n"
+        "before = set(sys.modules)\n"
+        "import main\n"
+        "for name in sorted(set(sys.modules) - before):\n"
+        "    print(name, getattr(sys.modules[name], '__file__', None) or '')"
+    )
+    loaded = dict(line.partition(' ')[::2] for line in output.splitlines())
+
+    assert 'main' in loaded
+    assert 'stock_list' not in loaded
+    assert not [name for name, path in loaded.items()
+                if 'site-packages' in path or 'dist-packages' in path]
+
+
+def test_stock_list_is_loaded_lazily():
+    _, output = import_times(
+        "import stock_list\n"
+        "print(stock_list.load_stocks.cache_info().currsize)\n"
+        "print(len(stock_list.TOP_10), stock_list.GIFT_STOCKS[0] in stock_list.STOCK_NAMES)\n"
+        "print(stock_list.load_stocks.cache_info().hits > 0)"
+    )
+    assert output.split('\n')[:3] == ['0', '10 True', 'True']
+
+
+def test_first_use_imports_the_real_modules():
+    import results
+    from lazy import LazyModule, lazy_import
+
+    assert lazy_import('json') is sys.modules['json']
+    assert results.RESULT_DTYPE is results.result_dtype()
+    proxy = LazyModule('colorsys')
+    assert proxy.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
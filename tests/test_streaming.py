@@ -0,0 +1,75 @@
+"""
+串流指標測試：逐根更新的結果必須與批次計算一致
+"""
+import pandas as pd
+import pytest
+
+from main import StockAnalyzer
+from providers import SyntheticProvider
+from streaming import TickerState, load_states, save_states
+
+INDICATORS = ["RSI", "MACD", "Bollinger"]
+
+
+def assert_results_match(actual, expected):
+    for name in INDICATORS:
+        for key, value in expected[name].items():
+            if isinstance(value, float):
+                assert actual[name][key] == pytest.approx(value, rel=1e-9), (name, key)
+            elif key != 'interpretation':
+                assert actual[name][key] == value, (name, key)
+
+
+def test_incremental_updates_match_batch():
+    analyzer = StockAnalyzer()
+    df = SyntheticProvider(seed=3).fetch('2330.TW', '1y')
+    split = len(df) - 40
+
+    state = TickerState.from_history(df['Close'].iloc[:split], INDICATORS)
+    for i in range(split, len(df)):
+        state.update(float(df['Close'].iloc[i]))
+        window = df.iloc[:i + 1]
+        expected = {name: analyzer._calculate_indicator(name, window) for name in INDICATORS}
+        assert_results_match(state.results(), expected)
+
+
+def test_state_file_round_trip(tmp_path):
+    df = SyntheticProvider().fetch('2603.TW', '6mo')
+    state = TickerState.from_history(df['Close'].iloc[:-1], INDICATORS)
+
+    path = str(tmp_path / 'state.json')
+    save_states(path, {'2603.TW': state})
+    restored = load_states(path)['2603.TW']
+    assert restored.last_date == str(df.index[-2])
+
+    state.update(float(df['Close'].iloc[-1]))
+    restored.update(float(df['Close'].iloc[-1]))
+    assert restored.results() == state.results()
+    assert load_states(str(tmp_path / 'missing.json')) == {}
+
+
+def test_warm_up_period():
+    state = TickerState(["RSI", "MACD"])
+    state.update(100.0)
+    assert 'error' in state.results()['MACD']
+    state.update(101.0)
+    assert state.results()['MACD']['signal'] in ('buy', 'bullish')
+
+
+def test_long_stream_does_not_drift():
+    analyzer = StockAnalyzer()
+    df = SyntheticProvider(seed=5).fetch('2330.TW', '1y')
+    # 約 4 萬根 K 棒，結尾 40 根價格不變（RSI 無漲跌、標準差 0 的邊界）
+    closes = pd.Series(df['Close'].tolist() * 160)
+    closes.iloc[-40:] = closes.iloc[-41]
+
+    for end in (len(closes) - 45, len(closes)):
+        state = TickerState.from_history(closes.iloc[:end], ["RSI", "Bollinger"])
+        window = pd.DataFrame({'Close': closes.iloc[end - 300:end]})
+        expected = {name: analyzer._calculate_indicator(name, window) for name in ["RSI", "Bollinger"]}
+        actual = state.results()
+        for name, result in expected.items():
+            for key, value in result.items():
+                if isinstance(value, float):
+                    assert actual[name][key] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), \
+                        (end, name, key)
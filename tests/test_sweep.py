@@ -0,0 +1,59 @@
+"""
+參數掃描測試：每組參數的結果與以該參數執行 compare() 相同
+"""
+import numpy as np
+import pytest
+
+from main import StockAnalyzer
+from sweep import parameter_grid
+
+TICKERS = [f"{6000 + i}.TW" for i in range(20)]
+GRID = {'RSI': {'period': [9, 14]}, 'MACD': {'fast_period': [8, 12], 'slow_period': [26]}}
+
+
+def offline_config():
+    config = StockAnalyzer()._default_config()
+    config['data_source'] = 'synthetic'
+    return config
+
+
+def test_parameter_grid_expands_combinations():
+    sets = parameter_grid(GRID)
+
+    assert len(sets) == 4
+    assert sets[0] == {'RSI': {'period': 9}, 'MACD': {'fast_period': 8, 'slow_period': 26}}
+    assert parameter_grid([{'RSI': {'period': 7}}]) == [{'RSI': {'period': 7}}]
+
+
+@pytest.mark.parametrize("rank_by", ["momentum", "composite"])
+def test_sweep_matches_compare_per_parameter_set(rank_by):
+    result = StockAnalyzer(offline_config()).sweep(TICKERS, GRID, rank_by=rank_by)
+    table = result['table']
+
+    assert len(table) == len(TICKERS) * 4
+    assert list(table.columns[:4]) == ['set', 'RSI.period', 'MACD.fast_period', 'MACD.slow_period']
+
+    for number, params in enumerate(result['parameter_sets']):
+        config = offline_config()
+        for name, values in params.items():
+            config['indicators'][name].update(values)
+        expected = StockAnalyzer(config).compare(TICKERS, rank_by=rank_by)['ranked_stocks']
+
+        rows = table[table['set'] == number]
+        assert list(rows['ticker']) == [s['ticker'] for s in expected]
+        np.testing.assert_allclose(rows['score'], [s['score'] for s in expected])
+        assert list(rows['action']) == [s['analysis']['signal']['action'] for s in expected]
+        assert list(rows['rank']) == list(range(1, len(TICKERS) + 1))
+
+    # metrics 摘要與 compare() 同一形狀（不含每支股票的耗時）
+    compared = StockAnalyzer(offline_config()).compare(TICKERS, rank_by=rank_by)
+    assert set(result['metrics']) == set(compared['metrics']) == {'stages', 'counters', 'gauges'}
+
+
+def test_sweep_ranks_across_chunks():
+    single = StockAnalyzer(offline_config()).sweep(TICKERS, GRID)['table']
+    config = offline_config()
+    config['fetch']['chunk_size'] = 6
+    chunked = StockAnalyzer(config).sweep(TICKERS, GRID)['table']
+
+    assert chunked[['set', 'ticker', 'rank']].equals(single[['set', 'ticker', 'rank']])
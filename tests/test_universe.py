@@ -0,0 +1,94 @@
+"""
+股票池測試：具名股票池、產業與標籤、代碼 / 名稱查詢與 JSON 快取
+"""
+import json
+import os
+
+import pytest
+
+import stock_list
+from stock_list import DEFAULT_UNIVERSE, load_universe
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """預設清單 + data/universes/ 下的上櫃清單與自選股"""
+    universe_dir = tmp_path / 'universes'
+    universe_dir.mkdir()
+    write_json(tmp_path / 'stocks.json', {'stocks': [
+        {'ticker': '2330.TW', 'name': '台積電', 'sector': '半導體', 'tags': ['權值股']},
+        {'ticker': '2303.TW', 'name': '聯電', 'sector': '半導體'},
+        {'ticker': '2603.TW', 'name': '長榮', 'sector': '航運', 'tags': ['權值股']},
+    ]})
+    write_json(universe_dir / 'tpex.json', {'name': 'TPEx', 'stocks': [
+        {'ticker': '6488.TWO', 'name': '環球晶', 'sector': '半導體'},
+        {'ticker': '8069.TWO', 'name': 'E Ink 元太', 'sector': '光電'},
+    ]})
+    write_json(universe_dir / 'watchlist.json', {'tickers': ['8069.TWO', '2330.TW']})
+    return {'stocks_path': str(tmp_path / 'stocks.json'), 'universe_dir': str(universe_dir),
+            'cache_path': str(tmp_path / 'cache' / 'universe.json')}
+
+
+def test_named_universes_sectors_and_tags(sources):
+    universe = load_universe(**sources)
+
+    assert universe.universe(DEFAULT_UNIVERSE) == ['2330.TW', '2303.TW', '2603.TW']
+    assert universe.universe('TWSE') == ['2330.TW', '2303.TW', '2603.TW']
+    assert universe.universe('TPEx') == ['6488.TWO', '8069.TWO']
+    assert universe.universe('watchlist') == ['8069.TWO', '2330.TW']  # 名稱取自檔名
+    assert universe.by_sector('半導體') == ['2330.TW', '2303.TW', '6488.TWO']
+    assert universe.by_tag('權值股') == ['2330.TW', '2603.TW']
+    # 自選股只列代碼，不覆蓋原有的名稱
+    assert universe.info('8069.TWO')['name'] == 'E Ink 元太'
+    assert universe.info('8069.TWO')['universes'] == ['TPEx', 'watchlist']
+    assert universe.info('9999.TW') is None
+    with pytest.raises(ValueError):
+        universe.universe('NASDAQ')
+
+
+def test_prefix_and_name_lookup(sources):
+    universe = load_universe(**sources)
+
+    assert universe.match_prefix('23') == ['2303.TW', '2330.TW']
+    assert universe.match_prefix('8069.two') == ['8069.TWO']
+    assert universe.match_name('積電') == ['2330.TW']
+    assert universe.match_name('e ink') == ['8069.TWO']
+    assert universe.match_name('聯發') == []
+    # 代碼前綴符合者在前
+    assert universe.search('6') == ['6488.TWO']
+    assert universe.search('電') == ['2330.TW', '2303.TW']
+    assert universe.search('2', limit=2) == ['2303.TW', '2330.TW']
+
+
+def test_cache_is_reused_until_sources_change(sources, monkeypatch):
+    first = load_universe(**sources)
+    assert os.path.exists(sources['cache_path'])
+
+    # 快取有效時不解析來源檔案
+    monkeypatch.setattr(stock_list, 'parse_universe', lambda paths: pytest.fail("不應重新解析來源"))
+    cached = load_universe(**sources)
+    assert cached.universes == first.universes and cached.names == first.names
+    assert cached.search('電') == first.search('電')
+    monkeypatch.undo()
+
+    # 新增股票池檔案後重新解析
+    write_json(os.path.join(sources['universe_dir'], 'etf.json'), {'tickers': ['0050.TW']})
+    assert load_universe(**sources).universe('etf') == ['0050.TW']
+
+
+def test_corrupt_or_foreign_cache_is_ignored(sources):
+    first = load_universe(**sources)
+    os.makedirs(os.path.dirname(sources['cache_path']), exist_ok=True)
+
+    # 快取為純 JSON 資料：格式不符或損壞時重新解析來源並覆寫快取
+    for content in (b'\x80\x04K\x01.', b'{"version": 2, "sources": [], "state": {}}', b'[1, 2'):
+        with open(sources['cache_path'], 'wb') as f:
+            f.write(content)
+        assert load_universe(**sources).universes == first.universes
+    with open(sources['cache_path'], encoding='utf-8') as f:
+        assert json.load(f)['state']['tickers'] == first.tickers